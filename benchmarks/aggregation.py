@@ -0,0 +1,117 @@
+"""Time and peak RSS of AGGREGATE BY x reduced while reading against the raw path.
+
+A CSV file with category keys repeated over many rows is loaded three ways:
+``raw`` loads every row as a BAR chart without AGGREGATE gets them, ``after``
+loads every row then reduces with `Aggregate.reduce`, and ``pushdown`` is
+``AGGREGATE SUM BY x``, numbering the keys while the file is read. The time to
+render the raw and the aggregated BAR charts is compared for ``--render-rows`` rows.
+Each measurement runs in a fresh process so the peak RSS is not shared.
+
+Run with:
+    python -m benchmarks.aggregation [--rows 100000 1000000] [--keys 100]
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from chickpy.aggregation import Aggregate
+from chickpy.datasource import DataSource
+from chickpy.parser import parser
+from chickpy.processor import Command
+
+
+def write_csv(path: Path, rows: int, keys: int) -> None:
+    rng = random.Random(rows)
+    with open(path, "w") as f:
+        f.write("x,y\n")
+        for _ in range(rows):
+            f.write(f"host{rng.randrange(keys)},{rng.uniform(0, 100):.3f}\n")
+
+
+def _script(path: Path, aggregate: bool) -> str:
+    options: str = " AGGREGATE SUM BY x" if aggregate else ""
+    return f'CREATE CHART "hosts" FROM CSV "{path}" TYPE BAR{options};'
+
+
+def _data_source(path: Path) -> Any:
+    return next(parser.parse(_script(path, False)).find_data("data_source"))
+
+
+LOADERS: Dict[str, Callable[[Path], Any]] = {
+    "raw": lambda path: DataSource.values(_data_source(path)),
+    "after": lambda path: Aggregate("sum").reduce(
+        *DataSource.values(_data_source(path))
+    ),
+    "pushdown": lambda path: DataSource.values(_data_source(path), Aggregate("sum")),
+}
+
+
+def measure(loader: str, path: Path) -> dict:
+    """Load *path* in a child process, return its timing and peak RSS."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.aggregation", "--child", loader, str(path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def child(loader: str, path: Path) -> None:
+    start = time.perf_counter()
+    xvalues, _ = LOADERS[loader](path)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"bars": len(xvalues), "seconds": elapsed, "peak_kb": peak_kb}))
+
+
+def render(path: Path) -> None:
+    print(f"\n{'chart':>10}{'bars':>10}{'image':>12}")
+    for aggregate in (False, True):
+        script: str = _script(path, aggregate)
+        start = time.perf_counter()
+        Command.image(script, cache=None)
+        elapsed = time.perf_counter() - start
+        bars: int = len(next(Command._processors(script))._chart["xvalues"])
+        name: str = "aggregate" if aggregate else "raw"
+        print(f"{name:>10}{bars:>10}{elapsed * 1000:>10.1f}ms")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    arg_parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    arg_parser.add_argument("--keys", type=int, default=100, help="distinct x values")
+    arg_parser.add_argument("--render-rows", type=int, default=10_000)
+    arg_parser.add_argument("--child", nargs=2, metavar=("LOADER", "PATH"))
+    args = arg_parser.parse_args()
+    if args.child:
+        return child(args.child[0], Path(args.child[1]))
+
+    print(f"{'rows':>10}{'loader':>10}{'bars':>10}{'time':>12}{'peak RSS':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "data.csv"
+        for rows in args.rows:
+            write_csv(path, rows, args.keys)
+            for loader in LOADERS:
+                result = measure(loader, path)
+                print(
+                    f"{rows:>10}{loader:>10}{result['bars']:>10}"
+                    f"{result['seconds'] * 1000:>10.1f}ms"
+                    f"{result['peak_kb'] / 1024:>10.1f}MB"
+                )
+        write_csv(path, args.render_rows, args.keys)
+        render(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Latency of Command.arender behind a local stand-in HTTP server, under concurrency.
+
+A minimal HTTP/1.0 server renders ``GET /<n>`` as the PNG of a chart with the n-th
+series, clients fire requests concurrently and the p50/p99 latencies are reported.
+A heartbeat task measures how late the event loop gets while rendering.
+
+Run with: python -m benchmarks.async_load [--requests 200] [--concurrency 1 8 32]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from benchmarks.common import inline_script
+from chickpy.aio import AsyncRenderer
+
+renderer = AsyncRenderer(cache=None)
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    request_line: bytes = await reader.readline()
+    while (await reader.readline()).strip():  # skip the headers
+        pass
+    number: int = int(request_line.split()[1].strip(b"/") or 0)
+    try:
+        body: bytes = await renderer.image(inline_script(100 + number % 50))
+        head: bytes = b"HTTP/1.0 200 OK\r\nContent-Type: image/png\r\n"
+    except Exception as e:
+        body, head = str(e).encode(), b"HTTP/1.0 500 Internal Server Error\r\n"
+    writer.write(head + b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    await writer.drain()
+    writer.close()
+
+
+async def fetch(port: int, number: int) -> float:
+    start: float = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /%d HTTP/1.0\r\n\r\n" % number)
+    response: bytes = await reader.read()
+    writer.close()
+    if not response.startswith(b"HTTP/1.0 200"):
+        raise RuntimeError(response.decode(errors="replace"))
+    return time.perf_counter() - start
+
+
+async def heartbeat(lags: List[float], interval: float = 0.005) -> None:
+    while True:
+        start: float = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def load(requests: int, concurrency: int) -> None:
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port: int = server.sockets[0].getsockname()[1]
+    renderer.max_concurrency = concurrency
+    slots = asyncio.Semaphore(concurrency)
+    lags: List[float] = []
+    monitor = asyncio.ensure_future(heartbeat(lags))
+
+    async def client(number: int) -> float:
+        async with slots:
+            return await fetch(port, number)
+
+    start: float = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(client(n) for n in range(requests))))
+    elapsed: float = time.perf_counter() - start
+    monitor.cancel()
+    server.close()
+    await server.wait_closed()
+
+    p50: float = statistics.median(latencies)
+    p99: float = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{concurrency:>12}{requests / elapsed:>10.1f}/s{p50 * 1000:>10.1f}ms"
+        f"{p99 * 1000:>10.1f}ms{max(lags, default=0) * 1000:>12.1f}ms"
+    )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--requests", type=int, default=200)
+    arg_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = arg_parser.parse_args()
+
+    print(f"{'concurrency':>12}{'rate':>12}{'p50':>12}{'p99':>12}{'loop lag':>14}")
+    for concurrency in args.concurrency:
+        asyncio.run(load(args.requests, concurrency))
+    renderer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Throughput of chickpy.batch.render_batch against the number of worker processes.
+
+Run with: python -m benchmarks.batch [--scripts 200] [--points 500] [--format png]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.common import inline_script
+from chickpy.batch import FORMATS, render_batch
+
+CHART_TYPES = ("LINE", "SCATTER")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--scripts", type=int, default=200)
+    arg_parser.add_argument("--points", type=int, default=500)
+    arg_parser.add_argument("--format", choices=FORMATS, default="png")
+    args = arg_parser.parse_args()
+
+    scripts = [
+        inline_script(args.points, f"chart{n}", CHART_TYPES[n % len(CHART_TYPES)])
+        for n in range(args.scripts)
+    ]
+    cpus = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    print(f"{args.scripts} charts, {args.points} points, {args.format}")
+    print(f"{'workers':>8}{'seconds':>10}{'charts/s':>10}{'speedup':>10}")
+    baseline = None
+    for max_workers in workers:
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            results = render_batch(scripts, output_dir, args.format, max_workers)
+            elapsed = time.perf_counter() - start
+        assert all(result.ok for result in results)
+        baseline = baseline or elapsed
+        print(
+            f"{max_workers:>8}{elapsed:>10.2f}{len(results) / elapsed:>10.1f}"
+            f"{baseline / elapsed:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Helpers shared by the benchmark scripts."""
+
+import random
+from typing import List
+
+
+def inline_script(points: int, label: str = "bench", chart_type: str = "LINE") -> str:
+    """Return a CREATE CHART command with *points* random inline values."""
+    rng = random.Random(points)
+    xvalues: List[str] = [str(n) for n in range(points)]
+    yvalues: List[str] = [f"{rng.uniform(-100, 100):.3f}" for _ in range(points)]
+    return (
+        f'CREATE CHART "{label}" VALUES [{",".join(xvalues)}] '
+        f'[{",".join(yvalues)}] TYPE {chart_type};'
+    )
@@ -0,0 +1,83 @@
+"""Rows/sec and peak RSS of the streaming CSV reader against the previous loader.
+
+Each measurement runs in a fresh process so the peak RSS is not shared.
+Run with: python -m benchmarks.csv_loading [--rows 100000 1000000]
+"""
+
+import argparse
+import csv
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from chickpy.csvreader import DELIMITERS, read_xy
+
+
+def legacy_read_xy(path: Path):
+    """The loader before streaming: sniff the whole file and build a dict per row."""
+    with open(path, mode="r") as csv_file:
+        dialect = csv.Sniffer().sniff(csv_file.read(), delimiters=DELIMITERS)
+        csv_file.seek(0)
+        values = list(csv.DictReader(csv_file, dialect=dialect))
+    return [float(row["x"]) for row in values], [float(row["y"]) for row in values]
+
+
+LOADERS = {"legacy": legacy_read_xy, "streaming": read_xy}
+
+
+def write_csv(path: Path, rows: int) -> None:
+    rng = random.Random(rows)
+    with open(path, "w") as f:
+        f.write("x,y\n")
+        for n in range(rows):
+            f.write(f"{n},{rng.uniform(-100, 100):.4f}\n")
+
+
+def measure(loader: str, path: Path) -> dict:
+    """Load *path* in a child process, return its timing and peak RSS."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.csv_loading", "--child", loader, str(path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def child(loader: str, path: Path) -> None:
+    start = time.perf_counter()
+    xvalues, _ = LOADERS[loader](path)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"rows": len(xvalues), "seconds": elapsed, "peak_kb": peak_kb}))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    arg_parser.add_argument("--child", nargs=2, metavar=("LOADER", "PATH"))
+    args = arg_parser.parse_args()
+    if args.child:
+        return child(args.child[0], Path(args.child[1]))
+
+    print(f"{'rows':>10}{'loader':>11}{'rows/s':>12}{'peak RSS':>12}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "data.csv"
+            write_csv(path, rows)
+            for loader in LOADERS:
+                result = measure(loader, path)
+                print(
+                    f"{rows:>10}{loader:>11}"
+                    f"{result['rows'] / result['seconds']:>12,.0f}"
+                    f"{result['peak_kb'] / 1024:>10.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Throughput of `read_columns` against the number of workers and the compression.
+
+A CSV file of ``--rows`` rows is parsed by 1 to ``--workers`` processes, then its
+gzip and zstd compressed copies are read as a stream by one process. The throughput
+is given in MB of uncompressed CSV per second. zstd is skipped without zstandard.
+Run with: python -m benchmarks.csv_parallel [--rows 5000000] [--workers 8]
+"""
+
+import argparse
+import gzip
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import chickpy.csvreader as csvreader
+from chickpy.csvreader import read_columns
+
+REPEAT = 3
+
+
+def write_csv(path: Path, rows: int) -> None:
+    rng = random.Random(rows)
+    with open(path, "w") as f:
+        f.write("x,y,z\n")
+        for n in range(rows):
+            f.write(f"{n},{rng.uniform(-100, 100):.4f},{rng.uniform(0, 1):.6f}\n")
+
+
+def _gzip(source: Path, target: Path) -> None:
+    with open(source, "rb") as src, gzip.open(target, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def _zstd(source: Path, target: Path) -> None:
+    import zstandard  # type: ignore
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        zstandard.ZstdCompressor().copy_stream(src, dst)
+
+
+COMPRESSORS: Dict[str, Callable[[Path, Path], None]] = {
+    ".gz": _gzip,
+    ".zst": _zstd,
+}
+
+
+def measure(path: Path, workers: int) -> float:
+    """The median time to read the x column and two y columns of *path*."""
+    timings: List[float] = []
+    for _ in range(REPEAT):
+        start: float = time.perf_counter()
+        read_columns(path, "x", ["y", "z"], workers=workers)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def report(name: str, path: Path, size: int, workers: int) -> None:
+    seconds: float = measure(path, workers)
+    print(
+        f"{name:>10}{workers:>10}{path.stat().st_size / 2**20:>10.1f}MB"
+        f"{seconds:>10.2f}s{size / 2**20 / seconds:>10.1f}MB/s"
+    )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rows", type=int, default=5_000_000)
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args()
+    csvreader.PARALLEL_MIN_SIZE = 0  # split the file whatever its size
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'file':>10}{'workers':>10}{'size':>12}{'time':>11}{'throughput':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "data.csv"
+        write_csv(path, args.rows)
+        size: int = path.stat().st_size
+        workers: int = 1
+        while workers <= args.workers:
+            report("csv", path, size, workers)
+            workers *= 2
+        for suffix, compress in COMPRESSORS.items():
+            target: Path = path.with_name(path.name + suffix)
+            try:
+                compress(path, target)
+            except ImportError:
+                print(f"{'csv' + suffix:>10} skipped, zstandard is not installed")
+                continue
+            report("csv" + suffix, target, size, 1)
+
+
+if __name__ == "__main__":
+    main()
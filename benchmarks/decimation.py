@@ -0,0 +1,55 @@
+"""Render time against input size, with and without the MAXPOINTS decimation stage.
+
+Run with: python -m benchmarks.decimation [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import io
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from chickpy.processor import Command
+
+MAX_POINTS = 5000
+
+
+def render_png(script: str) -> int:
+    buffer = io.BytesIO()
+    Command.render(script).savefig(buffer, format="png")
+    return len(buffer.getvalue())
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = arg_parser.parse_args()
+
+    render_png('CREATE CHART "warmup" VALUES [1,2] [3,4];')  # import matplotlib
+    print(f"{'points':>10}{'type':>9}{'stage':>6}{'seconds':>10}{'png size':>11}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            path = Path(tmp_dir) / f"{size}.npy"
+            rng = np.random.default_rng(size)
+            np.save(path, np.cumsum(rng.normal(size=size)))
+            for chart_type in ("LINE", "SCATTER"):
+                for stage, option in (("off", ""), ("on", f" MAXPOINTS {MAX_POINTS}")):
+                    script = (
+                        f'CREATE CHART "bench" FROM NPY "{path}" '
+                        f"TYPE {chart_type}{option};"
+                    )
+                    start = time.perf_counter()
+                    png_size = render_png(script)
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"{size:>10}{chart_type:>9}{stage:>6}{elapsed:>10.3f}"
+                        f"{png_size / 1024:>9.0f}KB"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Steady-state RSS and latency of consecutive renders, pooled vs new figures.
+
+Every render draws a different 100 points chart with `MatplotlibBackend.image`. The
+resident memory is sampled every tenth of the run, so a leak shows as a steady
+climb. Each mode runs in its own process to start from the same baseline.
+
+Run with: python -m benchmarks.figure_pool [--renders 10000] [--format png]
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+from typing import List
+
+import numpy as np
+
+
+def rss_mib() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def run(pooled: bool, renders: int, fmt: str) -> None:
+    import matplotlib  # type: ignore
+
+    matplotlib.use("Agg")
+    from chickpy.backend import FigurePool, MatplotlibBackend
+
+    MatplotlibBackend.pool = FigurePool() if pooled else None
+    rng = np.random.default_rng(0)
+    samples: List[float] = []
+    rss: List[float] = []
+    for n in range(renders):
+        chart = {
+            "label": f'"chart {n}"',
+            "xvalues": np.arange(100.0),
+            "yvalues": rng.random(100),
+            "options": {},
+        }
+        start = time.perf_counter()
+        MatplotlibBackend(chart).image(fmt)
+        samples.append(time.perf_counter() - start)
+        if (n + 1) % max(1, renders // 10) == 0:
+            rss.append(rss_mib())
+
+    print(
+        f"{'pooled' if pooled else 'new':>8}"
+        f"{statistics.median(samples) * 1000:>9.2f}ms"
+        f"{sorted(samples)[int(len(samples) * 0.99)] * 1000:>9.2f}ms"
+        f"   {' '.join(f'{value:.0f}' for value in rss)}"
+    )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--renders", type=int, default=1000)
+    arg_parser.add_argument("--format", choices=("png", "svg"), default="png")
+    args = arg_parser.parse_args()
+
+    print(f"{'mode':>8}{'p50':>11}{'p99':>11}   RSS MiB every {args.renders // 10}")
+    for pooled in (False, True):
+        process = multiprocessing.Process(
+            target=run, args=(pooled, args.renders, args.format)
+        )
+        process.start()
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Cost of refreshing a live chart against reloading it, as the CSV file grows.
+
+For every file size, rows are appended in batches and the time of
+`LiveChart.refresh` (parse the new rows and update the artists, then draw the
+figure) is compared with a full `Command.image` of the same script.
+Run with: python -m benchmarks.live_refresh [--rows 10000 1000000] [--append 100]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from chickpy.live import LiveChart
+from chickpy.processor import Command
+
+REPEAT = 5
+
+
+def write_rows(path: Path, start: int, rows: int) -> None:
+    rng = random.Random(start)
+    with open(path, "a") as f:
+        for n in range(start, start + rows):
+            f.write(f"{n},{rng.uniform(-100, 100):.4f}\n")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    arg_parser.add_argument("--append", type=int, default=100)
+    arg_parser.add_argument("--window", type=int, default=None)
+    args = arg_parser.parse_args()
+    follow: str = "FOLLOW" + (f" WINDOW {args.window}" if args.window else "")
+
+    print(f"{'rows':>10}{'refresh':>12}{'draw':>12}{'reload':>12}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "data.csv"
+            path.write_text("x,y\n")
+            write_rows(path, 0, rows)
+            script: str = f'CREATE CHART "live" FROM CSV "{path}" {follow};'
+            chart = LiveChart(script)
+            chart.figure.canvas.draw()
+            refresh: List[float] = []
+            draw: List[float] = []
+            reload: List[float] = []
+            for n in range(REPEAT):
+                write_rows(path, rows + n * args.append, args.append)
+                start: float = time.perf_counter()
+                chart.refresh()
+                refresh.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                chart.figure.canvas.draw()
+                draw.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                Command.image(script, cache=None)
+                reload.append(time.perf_counter() - start)
+            print(
+                f"{rows:>10}{statistics.median(refresh) * 1000:>10.2f}ms"
+                f"{statistics.median(draw) * 1000:>10.2f}ms"
+                f"{statistics.median(reload) * 1000:>10.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Latency of Command.validate on script cache hit and miss, a hit skips parsing.
+
+Run with: python -m benchmarks.script_cache [--points 100 1000 10000] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.common import inline_script
+from chickpy.processor import Command, script_cache
+
+
+def latency(script: str, repeat: int, hit: bool) -> float:
+    samples = []
+    Command.validate(script)
+    for _ in range(repeat):
+        if not hit:
+            script_cache.clear()
+        start = time.perf_counter()
+        Command.validate(script)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--points", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000]
+    )
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    print(f"{'points':>10}{'miss':>12}{'hit':>12}{'speedup':>10}")
+    for points in args.points:
+        script = inline_script(points)
+        miss = latency(script, args.repeat, hit=False)
+        hit = latency(script, args.repeat, hit=True)
+        print(
+            f"{points:>10}{miss * 1000:>10.3f}ms{hit * 1000:>10.3f}ms"
+            f"{miss / hit:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-request latency of a small chart: fresh process vs the warm render server.
+
+Three ways to get the PNG of a small chart are compared:
+
+- cold: a new python process imports chickpy and renders it,
+- client: a new ``python -m chickpy.server send`` process asks the running server,
+- in-process: `chickpy.server.send` from an already running python.
+
+Run with: python -m benchmarks.server [--runs 10] [--workers 2]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from chickpy.server import RenderServer, send
+
+ROOT = Path(__file__).resolve().parent.parent
+ENV = dict(os.environ, PYTHONPATH=str(ROOT))
+
+
+def script(n: int) -> str:
+    # A distinct label per request, so the worker render caches never hit.
+    return f'CREATE CHART "chart {n}" VALUES [1,2,3,4] [4,1,3,2] TYPE LINE;'
+
+
+def cold(n: int, socket_path: Path) -> None:
+    code = f"from chickpy.processor import Command; Command.image({script(n)!r})"
+    subprocess.run([sys.executable, "-c", code], env=ENV, check=True)
+
+
+def client(n: int, socket_path: Path) -> None:
+    command = [sys.executable, "-m", "chickpy.server", "send", "--socket"]
+    command += [str(socket_path), "-o", os.devnull, script(n)]
+    subprocess.run(command, env=ENV, check=True)
+
+
+def in_process(n: int, socket_path: Path) -> None:
+    send(script(n), "png", socket_path)
+
+
+def median_ms(request: Callable[[int, Path], None], runs: int, path: Path) -> float:
+    samples: List[float] = []
+    for n in range(runs):
+        start = time.perf_counter()
+        request(n, path)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--workers", type=int, default=2)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "chickpy.sock"
+        with RenderServer(path, args.workers) as server:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            for name, request in (
+                ("cold", cold),
+                ("client", client),
+                ("in-process", in_process),
+            ):
+                print(f"{name:>12}{median_ms(request, args.runs, path):>10.1f}ms")
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
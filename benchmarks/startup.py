@@ -0,0 +1,52 @@
+"""Compare cold and warm start time of importing chickpy (``chickpy.processor``).
+
+Cold start builds the LALR tables from ``language.lark``, warm start loads them from
+the on-disk parser cache. Run with:
+
+    python -m benchmarks.startup [--runs N] [--module chickpy.parser]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def timed_import(module: str, cache_dir: str) -> float:
+    env = dict(os.environ, CHICKPY_CACHE_DIR=cache_dir, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--module", default="chickpy.processor")
+    args = arg_parser.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(timed_import(args.module, cache_dir))
+            warm.append(timed_import(args.module, cache_dir))
+
+    print(f"import {args.module}, {args.runs} runs")
+    print(f"{'':<6}{'median':>10}{'min':>10}{'max':>10}")
+    for name, samples in (("cold", cold), ("warm", warm)):
+        print(
+            f"{name:<6}"
+            f"{statistics.median(samples) * 1000:>8.1f}ms"
+            f"{min(samples) * 1000:>8.1f}ms"
+            f"{max(samples) * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
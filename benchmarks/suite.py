@@ -0,0 +1,287 @@
+"""Benchmark suite measuring how each stage scales, from 10 to 10M points.
+
+Synthetic scripts with inline values and CSV files are generated once for every
+size, then every case runs in a fresh process: ``parse`` (parser.parse of the inline
+script), ``load_std`` and ``load_csv`` (DataSource.values of the parsed data
+source), ``validate`` (the processor validation, loading the values included) and
+``render_<backend>`` (an image of the validated chart, for every registered
+backend). The time of each run is recorded with the peak RSS growth of the process
+over the runs.
+
+Results are written as JSON, by default in ``.benchmarks/<commit>.json``, and two
+result files can be compared to spot regressions between commits.
+
+Run with:
+    python -m benchmarks.suite run [--points 10 1000 100000 10000000] [--cases parse]
+    python -m benchmarks.suite compare BASE.json NEW.json [--threshold 0.1]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.common import inline_script
+
+RESULTS_DIR = Path(".benchmarks")
+POINTS = [10, 1_000, 100_000, 10_000_000]
+STAGE_CASES = ["parse", "load_std", "load_csv", "validate"]
+
+
+def write_data(data_dir: Path, points: int) -> None:
+    """Write the inline script and the CSV file of the given size."""
+    rng = np.random.default_rng(points)
+    xvalues: List[str] = [str(n) for n in range(points)]
+    yvalues: List[str] = [f"{y:.3f}" for y in rng.standard_normal(points).cumsum()]
+    (data_dir / f"{points}.chick").write_text(
+        f'CREATE CHART "bench" VALUES [{",".join(xvalues)}] [{",".join(yvalues)}];'
+    )
+    with open(data_dir / f"{points}.csv", "w") as csv_file:
+        csv_file.write("x,y\n")
+        for x, y in zip(xvalues, yvalues):
+            csv_file.write(f"{x},{y}\n")
+
+
+def _inline_script(data_dir: Path, points: int) -> str:
+    return (data_dir / f"{points}.chick").read_text()
+
+
+def _csv_script(data_dir: Path, points: int) -> str:
+    return f'CREATE CHART "bench" FROM CSV "{data_dir / f"{points}.csv"}";'
+
+
+def _data_source(script: str) -> Any:
+    from chickpy.parser import parser
+
+    return next(parser.parse(script).find_data("data_source"))
+
+
+def setup_parse(data_dir: Path, points: int) -> Callable[[], Any]:
+    from chickpy.parser import parser
+
+    script: str = _inline_script(data_dir, points)
+    return lambda: parser.parse(script)
+
+
+def setup_load_std(data_dir: Path, points: int) -> Callable[[], Any]:
+    from chickpy.datasource import DataSource
+
+    node: Any = _data_source(_inline_script(data_dir, points))
+    return lambda: DataSource.values(node)
+
+
+def setup_load_csv(data_dir: Path, points: int) -> Callable[[], Any]:
+    from chickpy.datasource import DataSource
+
+    node: Any = _data_source(_csv_script(data_dir, points))
+    return lambda: DataSource.values(node)
+
+
+def setup_validate(data_dir: Path, points: int) -> Callable[[], Any]:
+    from chickpy.parser import parser
+    from chickpy.processor import _CommandProcessor
+
+    tree: Any = parser.parse(_inline_script(data_dir, points))
+    return lambda: _CommandProcessor.factory(tree).validate()
+
+
+def setup_render(backend: str, data_dir: Path, points: int) -> Callable[[], Any]:
+    from chickpy.backend import set_default_backend
+    from chickpy.parser import parser
+    from chickpy.processor import _CommandProcessor
+
+    set_default_backend(backend)
+    warmup = _CommandProcessor.factory(parser.parse(inline_script(10)))
+    warmup.validate()
+    warmup.backend.image()  # imports the plotting library before measuring
+    processor = _CommandProcessor.factory(
+        parser.parse(_inline_script(data_dir, points))
+    )
+    processor.validate()
+    return lambda: processor.backend.image()
+
+
+def cases() -> List[str]:
+    from chickpy.backend import BACKENDS
+
+    return STAGE_CASES + [f"render_{backend}" for backend in BACKENDS]
+
+
+def _setup(case: str) -> Callable[[Path, int], Callable[[], Any]]:
+    if case.startswith("render_"):
+        backend: str = case[len("render_") :]
+        return lambda data_dir, points: setup_render(backend, data_dir, points)
+    return globals()[f"setup_{case}"]
+
+
+def _memory_kib(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak_memory() -> None:
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")  # resets VmHWM to the current RSS
+    except OSError:
+        pass
+
+
+def child(case: str, data_dir: Path, points: int, repeat: int, budget: float) -> None:
+    """Time *case* in this process and print its measures as JSON."""
+    run: Callable[[], Any] = _setup(case)(data_dir, points)
+    _reset_peak_memory()
+    rss: int = _memory_kib("VmRSS")
+    times: List[float] = []
+    while not times or (len(times) < repeat and sum(times) < budget):
+        start: float = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    print(
+        json.dumps(
+            {
+                "times": times,
+                "min": min(times),
+                "median": statistics.median(times),
+                "peak_mib": max(_memory_kib("VmHWM") - rss, 0) / 1024,
+            }
+        )
+    )
+
+
+def measure(
+    case: str, data_dir: Path, points: int, repeat: int, budget: float
+) -> Dict[str, Any]:
+    command: List[str] = [sys.executable, "-m", "benchmarks.suite", "child", case]
+    command += [str(data_dir), str(points), str(repeat), str(budget)]
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0:
+        return {"error": process.stderr.strip().splitlines()[-1]}
+    return json.loads(process.stdout)
+
+
+def environment() -> Dict[str, str]:
+    import lark
+    import matplotlib  # type: ignore
+
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": str(bool(_git("status", "--porcelain", "--untracked-files=no"))),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} {platform.node()}",
+        "numpy": np.__version__,
+        "lark": lark.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(args: argparse.Namespace) -> None:
+    selected: List[str] = args.cases or cases()
+    results: Dict[str, Any] = {"environment": environment(), "results": {}}
+    print(f"{'case':>18}{'points':>10}{'min':>12}{'median':>12}{'peak RSS':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = Path(tmp_dir)
+        for points in args.points:
+            write_data(data_dir, points)
+            for case in selected:
+                result = measure(case, data_dir, points, args.repeat, args.budget)
+                results["results"].setdefault(case, {})[str(points)] = result
+                if "error" in result:
+                    print(f"{case:>18}{points:>10}  {result['error']}")
+                    continue
+                print(
+                    f"{case:>18}{points:>10}{result['min'] * 1000:>10.2f}ms"
+                    f"{result['median'] * 1000:>10.2f}ms{result['peak_mib']:>9.1f}MiB"
+                )
+            (data_dir / f"{points}.chick").unlink()
+            (data_dir / f"{points}.csv").unlink()
+
+    commit: str = _git("rev-parse", "--short", "HEAD") or "results"
+    output: Path = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Print the ratio of the new over the base measures, 1 if a case regressed."""
+    base: Dict[str, Any] = json.loads(args.base.read_text())["results"]
+    new: Dict[str, Any] = json.loads(args.new.read_text())["results"]
+    regressions: int = 0
+    print(f"{'case':>18}{'points':>10}{'base':>12}{'new':>12}{'time':>8}{'memory':>8}")
+    for case, sizes in new.items():
+        for points, result in sizes.items():
+            before: Optional[dict] = base.get(case, {}).get(points)
+            if before is None or "error" in before or "error" in result:
+                continue
+            time_ratio: float = result["min"] / before["min"]
+            memory_ratio: float = (result["peak_mib"] + 1) / (before["peak_mib"] + 1)
+            regressed: bool = max(time_ratio, memory_ratio) > 1 + args.threshold
+            regressions += regressed
+            print(
+                f"{case:>18}{points:>10}{before['min'] * 1000:>10.2f}ms"
+                f"{result['min'] * 1000:>10.2f}ms{time_ratio:>8.2f}{memory_ratio:>8.2f}"
+                f"{'  regressed' if regressed else ''}"
+            )
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite and save the results")
+    run_parser.add_argument("--points", type=int, nargs="+", default=POINTS)
+    run_parser.add_argument("--cases", nargs="+", default=None)
+    run_parser.add_argument("--repeat", type=int, default=5, help="most runs per case")
+    run_parser.add_argument(
+        "--budget", type=float, default=2.0, help="seconds after which to stop a case"
+    )
+    run_parser.add_argument("-o", "--output", type=Path, default=None)
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="tolerated slowdown, 0.1 is 10%%"
+    )
+    child_parser = commands.add_parser("child")
+    child_parser.add_argument("case")
+    child_parser.add_argument("data_dir", type=Path)
+    child_parser.add_argument("points", type=int)
+    child_parser.add_argument("repeat", type=int)
+    child_parser.add_argument("budget", type=float)
+    args = arg_parser.parse_args()
+
+    if args.command == "child":
+        child(args.case, args.data_dir, args.points, args.repeat, args.budget)
+    elif args.command == "compare":
+        raise SystemExit(compare(args))
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
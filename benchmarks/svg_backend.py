@@ -0,0 +1,77 @@
+"""Throughput and memory of the native SVG backend against matplotlib SVG output.
+
+Each backend runs in a fresh process, so the import time and the resident memory
+include loading the plotting library. Line charts of random walks are exported as
+SVG into memory.
+
+Run with: python -m benchmarks.svg_backend [--points 100 10000 100000] [--renders 20]
+"""
+
+import argparse
+import io
+import multiprocessing
+import time
+from typing import List
+
+
+def rss_mib() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):  # peak resident set size
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run(backend: str, points: List[int], renders: int, queue) -> None:
+    start = time.perf_counter()
+    import numpy as np
+
+    from chickpy.backend import get_backend
+
+    backend_cls = get_backend(backend)
+    backend_cls(
+        {"label": '"warm"', "xvalues": np.arange(2.0), "yvalues": np.ones(2)}
+    ).image("svg")
+    startup: float = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    rates: List[float] = []
+    for count in points:
+        chart = {
+            "label": '"bench"',
+            "xvalues": np.arange(count, dtype=np.float64),
+            "yvalues": rng.standard_normal(count).cumsum(),
+            "options": {},
+        }
+        start = time.perf_counter()
+        for _ in range(renders):
+            backend_cls(chart).export(io.BytesIO(), "svg")
+        rates.append(renders / (time.perf_counter() - start))
+    queue.put((startup, rates, rss_mib()))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--points", type=int, nargs="+", default=[100, 10_000, 100_000]
+    )
+    arg_parser.add_argument("--renders", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    header = "".join(f"{f'{count} pts':>14}" for count in args.points)
+    print(f"{'backend':>12}{'startup':>10}{header}{'peak RSS':>12}")
+    for backend in ("matplotlib", "svg"):
+        queue = context.Queue()
+        process = context.Process(
+            target=run, args=(backend, args.points, args.renders, queue)
+        )
+        process.start()
+        startup, rates, rss = queue.get()
+        process.join()
+        columns = "".join(f"{rate:>12.1f}/s" for rate in rates)
+        print(f"{backend:>12}{startup * 1000:>8.0f}ms{columns}{rss:>9.0f}MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Parse time and peak memory of inline VALUES, per number tree vs packed arrays.
+
+The baseline parser is built from the same grammar without the NUMBER_LIST fast path,
+so every number becomes an ``e_list_value`` tree converted afterwards, as it used to.
+
+Run with: python -m benchmarks.values_parsing [--points 10000 1000000] [--repeat 3]
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from lark import Lark
+
+from benchmarks.common import inline_script
+from chickpy.datasource import DataSource
+from chickpy.parser import PARSER_OPTIONS, parser, read_language
+
+
+def baseline_parser() -> Lark:
+    lang_def: str = read_language("language.lark").replace("| NUMBER_LIST", "")
+    return Lark(lang_def, **PARSER_OPTIONS)
+
+
+def load(lang_parser: Lark, script: str) -> None:
+    tree = lang_parser.parse(script)
+    DataSource.values(next(tree.find_data("data_source")))
+
+
+def measure(run: Callable[[], None], repeat: int) -> Tuple[float, float]:
+    """Median seconds and peak traced memory in MiB."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), peak / 2**20
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--points", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    baseline: Lark = baseline_parser()
+    print(f"{'points':>10}{'tree':>12}{'packed':>12}{'tree mem':>12}{'packed mem':>12}")
+    for points in args.points:
+        script = inline_script(points)
+        old, old_mem = measure(lambda: load(baseline, script), args.repeat)
+        new, new_mem = measure(lambda: load(parser, script), args.repeat)
+        print(
+            f"{points:>10}{old:>11.3f}s{new:>11.3f}s"
+            f"{old_mem:>9.1f}MiB{new_mem:>9.1f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Reduce the rows of a data source to one point per x value or per bin.
+
+``AGGREGATE SUM BY x`` groups the rows by x value and reduces the y values of each
+group with SUM, COUNT, MEAN, MIN or MAX. Numeric x values come out sorted, category
+labels in order of first appearance. ``HISTOGRAM BINS n`` counts the y values in n
+bins of equal width, labelled with their range.
+
+The reductions are vectorized: rows are factorized into group numbers, then summed
+with `np.bincount` or reduced with `np.minimum.reduceat` on the rows sorted by group.
+CSV files are reduced in the pass reading them: the x column is factorized with a
+dict while the rows are parsed, and a histogram doesn't read the x column at all.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from chickpy.csvreader import Column, read_columns, read_groups
+from chickpy.datasource import is_categorical
+
+DEFAULT_BINS = 10
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    function: str
+
+    def reduce(
+        self, xvalues: np.ndarray, yvalues: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """One point per distinct x value."""
+        keys, codes = factorize(xvalues)
+        return keys, self.reduce_groups(codes, len(keys), yvalues)
+
+    def reduce_csv(
+        self, path: Path, x: Optional[Column], ys: Sequence[Column]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        keys, codes, yvalues = read_groups(path, x, ys)
+        return keys, self.reduce_groups(codes, len(keys), yvalues)
+
+    def reduce_groups(
+        self, codes: np.ndarray, groups: int, yvalues: np.ndarray
+    ) -> np.ndarray:
+        """Reduce the y values of the rows of each of the *groups* given by *codes*.
+
+        Every group must have at least one row.
+        """
+        series: list = list(yvalues.T) if yvalues.ndim > 1 else [yvalues]
+        counts: np.ndarray = np.bincount(codes, minlength=groups).astype(np.float64)
+        if self.function == "count":
+            reduced: list = [counts] * len(series)
+        elif self.function in ("sum", "mean"):
+            reduced = [np.bincount(codes, values, groups) for values in series]
+            if self.function == "mean":
+                reduced = [sums / counts for sums in reduced]
+        elif not groups:  # reduceat needs at least one group
+            reduced = [counts] * len(series)
+        else:
+            ufunc: np.ufunc = np.minimum if self.function == "min" else np.maximum
+            order: np.ndarray = np.argsort(codes, kind="stable")
+            starts: np.ndarray = np.concatenate(([0], np.cumsum(counts[:-1])))
+            reduced = [
+                ufunc.reduceat(values[order], starts.astype(np.int64))
+                for values in series
+            ]
+        if yvalues.ndim > 1:
+            return np.column_stack(reduced)
+        return np.asarray(reduced[0], dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class Histogram:
+    bins: int = DEFAULT_BINS
+
+    def reduce(
+        self, xvalues: np.ndarray, yvalues: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The counts of y values in each bin, the x values are not used."""
+        finite: np.ndarray = yvalues[np.isfinite(yvalues)]
+        edges: np.ndarray = np.histogram_bin_edges(finite, self.bins)
+        series: list = list(yvalues.T) if yvalues.ndim > 1 else [yvalues]
+        counts: list = [
+            np.histogram(values, edges)[0].astype(np.float64) for values in series
+        ]
+        labels: np.ndarray = np.array(
+            [f"{low:.4g} to {high:.4g}" for low, high in zip(edges[:-1], edges[1:])]
+        )
+        return labels, counts[0] if yvalues.ndim == 1 else np.column_stack(counts)
+
+    def reduce_csv(
+        self, path: Path, x: Optional[Column], ys: Sequence[Column]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return self.reduce(*read_columns(path, None, ys))
+
+
+Reduction = Union[Aggregate, Histogram]
+
+
+def reduction(options: dict) -> Optional[Reduction]:
+    """The reduction asked by the ``AGGREGATE`` or ``HISTOGRAM`` chart options."""
+    if "aggregate" in options and "histogram" in options:
+        raise ValueError("AGGREGATE and HISTOGRAM cannot be used together.")
+    if "aggregate" in options:
+        return Aggregate(options["aggregate"])
+    if "histogram" in options:
+        bins: int = options.get("bins", DEFAULT_BINS)
+        if bins < 1:
+            raise ValueError("HISTOGRAM must have at least one bin.")
+        return Histogram(bins)
+    return None
+
+
+def factorize(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """The distinct values and the index of each value among them.
+
+    Numbers are sorted, category labels are kept in order of first appearance.
+    """
+    keys, first, codes = np.unique(values, return_index=True, return_inverse=True)
+    if not is_categorical(values):
+        return keys, codes.reshape(-1)
+    order: np.ndarray = np.argsort(first)
+    rank: np.ndarray = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return keys[order], rank[codes.reshape(-1)]
@@ -0,0 +1,98 @@
+"""Render charts from asyncio code without blocking the event loop.
+
+Parsing, data loading and cache lookups run in the loop default executor, so file
+reads never block the loop. Rasterization runs in a small dedicated executor. At most
+``max_concurrency`` renders are in flight, the following ones wait for a free slot.
+Cancelling a waiting render drops it before any work is done.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from chickpy.cache import RenderCache, render_cache
+from chickpy.processor import Command, _CreateChartProcessor
+
+# Charts are drawn on their own figures, so several can be rasterized at once.
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class AsyncRenderer:
+    """Bounded asyncio front end of `Command.image`.
+
+    All the renderers share the module parser and the script cache, so concurrent
+    requests for the same script are parsed and validated once.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        executor: Optional[Executor] = None,
+        cache: Optional[RenderCache] = render_cache,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self._executor: Optional[Executor] = executor
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                RENDER_WORKERS, thread_name_prefix="chickpy-render"
+            )
+        return self._executor
+
+    async def image(self, script: str, fmt: Optional[str] = None) -> bytes:
+        """Return the chart of the script encoded as image bytes.
+
+        The format defaults to the script ``OUTPUT`` option, then to the backend's.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        async with self._slot(loop):
+            key, data, processor = await loop.run_in_executor(
+                None, self._prepare, script, fmt
+            )
+            if data is not None:
+                return data
+            data = await loop.run_in_executor(
+                self.executor, processor.backend.image, fmt
+            )
+            if self.cache is not None:
+                await loop.run_in_executor(None, self.cache.put, key, data)
+            return data
+
+    def close(self) -> None:
+        """Shut the render executor down, waiting for the running renders."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _slot(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # A semaphore is bound to the loop it was first used in.
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def _prepare(
+        self, script: str, fmt: Optional[str]
+    ) -> Tuple[str, Optional[bytes], _CreateChartProcessor]:
+        """Parse, look the image up in the cache, load the data on a miss."""
+        parsed = Command._parsed(script)
+        if self.cache is None:
+            return "", None, parsed.processor(0)
+        processor: _CreateChartProcessor = parsed.processor(0, validate=False)
+        key: str = processor.cache_key(
+            processor.output_format(fmt), self.cache.content_hash
+        )
+        data: Optional[bytes] = self.cache.get(key)
+        return key, data, parsed.processor(0, validate=data is None)
+
+
+# Default renderer of `Command.arender`.
+renderer = AsyncRenderer()
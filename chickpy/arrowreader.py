@@ -0,0 +1,157 @@
+"""Readers of the projected columns of Apache Arrow IPC and Parquet files.
+
+pyarrow is optional and only imported when one of these files is read. Columns are
+picked by name or by position and the other ones are never read: Arrow IPC files are
+memory-mapped and Parquet files read only the projected column chunks. Numeric
+columns reach numpy without copying when they are made of a single chunk without
+nulls, category labels are converted once per distinct value. With a *where* range
+the Parquet row groups whose statistics are outside the range are skipped.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chickpy.csvreader import Column
+
+# Rows kept by ``WHERE column BETWEEN low AND high``, bounds included.
+Where = Tuple[Column, float, float]
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow  # type: ignore
+        import pyarrow.ipc  # type: ignore # noqa: F401
+        import pyarrow.parquet  # type: ignore # noqa: F401
+    except ImportError:
+        raise ImportError("Reading Arrow and Parquet files needs pyarrow installed.")
+    return pyarrow
+
+
+def read_arrow(
+    path: Path, x: Optional[Column], ys: Sequence[Column], where: Optional[Where]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the *x* column and the *ys* columns of the Arrow IPC file at *path*."""
+    pa: Any = _pyarrow()
+    with pa.memory_map(str(path), "r") as source:
+        table: Any = pa.ipc.open_file(source).read_all()  # buffers stay mapped
+        names: List[str] = _names(path, table.schema.names, x, ys, where)
+        table = table.select(list(dict.fromkeys(names)))
+        row_numbers: np.ndarray = np.arange(table.num_rows, dtype=np.float64)
+        return _values(table, names, row_numbers, path, x, where)
+
+
+def read_parquet(
+    path: Path, x: Optional[Column], ys: Sequence[Column], where: Optional[Where]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the *x* column and the *ys* columns of the Parquet file at *path*.
+
+    Only the row groups which may hold rows in the *where* range are read.
+    """
+    pa: Any = _pyarrow()
+    parquet_file: Any = pa.parquet.ParquetFile(str(path), memory_map=True)
+    names: List[str] = _names(path, parquet_file.schema_arrow.names, x, ys, where)
+    metadata: Any = parquet_file.metadata
+    row_groups: List[int] = list(range(metadata.num_row_groups))
+    if where is not None:
+        row_groups = _row_groups(parquet_file, names[-1], where[1], where[2])
+    table: Any = parquet_file.read_row_groups(
+        row_groups, columns=list(dict.fromkeys(names))
+    )
+    # Row numbers in the whole file, the skipped row groups included.
+    starts: np.ndarray = np.cumsum(
+        [0] + [metadata.row_group(n).num_rows for n in range(metadata.num_row_groups)]
+    )
+    row_numbers: np.ndarray = np.concatenate(
+        [np.arange(starts[n], starts[n + 1], dtype=np.float64) for n in row_groups]
+        or [np.empty(0)]
+    )
+    return _values(table, names, row_numbers, path, x, where)
+
+
+def _names(
+    path: Path,
+    schema: List[str],
+    x: Optional[Column],
+    ys: Sequence[Column],
+    where: Optional[Where],
+) -> List[str]:
+    """The names of the x column, the y columns and the *where* column, in order."""
+    columns: List[Column] = ([] if x is None else [x]) + list(ys)
+    columns += [] if where is None else [where[0]]
+    names: List[str] = []
+    for column in columns:
+        if isinstance(column, int):
+            if column >= len(schema):
+                raise ValueError(
+                    f"Column {column} is out of range, {path} has {len(schema)} "
+                    "columns."
+                )
+            column = schema[column]
+        if column not in schema:
+            raise ValueError(f"{path} has no {column} column.")
+        names.append(column)
+    return names
+
+
+def _row_groups(parquet_file: Any, name: str, low: float, high: float) -> List[int]:
+    """The row groups whose min and max statistics of *name* overlap the range."""
+    metadata: Any = parquet_file.metadata
+    index: int = parquet_file.schema_arrow.get_field_index(name)
+    row_groups: List[int] = []
+    for row_group in range(metadata.num_row_groups):
+        statistics: Any = metadata.row_group(row_group).column(index).statistics
+        if (
+            statistics is None
+            or not statistics.has_min_max
+            or not isinstance(statistics.min, (int, float))
+            or (statistics.min <= high and statistics.max >= low)
+        ):
+            row_groups.append(row_group)
+    return row_groups
+
+
+def _values(
+    table: Any,
+    names: List[str],
+    row_numbers: np.ndarray,
+    path: Path,
+    x: Optional[Column],
+    where: Optional[Where],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """The x and y values of the *table*, holding the columns *names* in order."""
+    arrays: Dict[str, np.ndarray] = {
+        name: _numpy(table.column(name)) for name in dict.fromkeys(names)
+    }
+    columns: List[np.ndarray] = [arrays[name] for name in names]
+    if where is not None:
+        values: np.ndarray = columns.pop()
+        if values.dtype.kind not in "fiu":
+            raise ValueError(f"Column {where[0]} of {path} is not numeric.")
+        rows: np.ndarray = (values >= where[1]) & (values <= where[2])
+        columns = [column[rows] for column in columns]
+        row_numbers = row_numbers[rows]
+    xvalues: np.ndarray = row_numbers if x is None else columns.pop(0)
+    if any(column.dtype.kind not in "fiu" for column in columns):
+        raise ValueError(f"y columns of {path} must be numeric.")
+    if len(columns) == 1:
+        return xvalues, columns[0].astype(np.float64, copy=False)
+    return xvalues, np.column_stack(columns).astype(np.float64, copy=False)
+
+
+def _numpy(column: Any) -> np.ndarray:
+    """The values of a chunked array, without copying single chunks of numbers.
+
+    Numbers are float64 unless they are integers without nulls, labels are strings.
+    """
+    pa: Any = _pyarrow()
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        encoded: Any = column.combine_chunks().dictionary_encode()
+        labels: np.ndarray = np.array(encoded.dictionary.to_pylist(), dtype=str)
+        return labels[encoded.indices.to_numpy(zero_copy_only=False)]
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=False)
+    return column.to_numpy()
@@ -1,23 +1,178 @@
+import io
+import os
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
 from functools import cached_property as lazy_property
-
-import matplotlib.pyplot as plt  # type: ignore
-from matplotlib.figure import Figure  # type: ignore
+from importlib import import_module, metadata
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from chickpy.enums import CHART_TYPE
 
+if TYPE_CHECKING:  # pragma: no cover
+    from matplotlib.axes import Axes  # type: ignore
+    from matplotlib.figure import Figure  # type: ignore
+
+
+class _LazyModule:
+    """Proxy importing the wrapped module only when one of its attributes is used."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(import_module(self._name), attr)
+
+
+FORMATS = ("png", "svg", "pdf")
+
+# Where `Backend.export` writes: a binary file object, a file descriptor or a path.
+Output = Union[IO[bytes], int, str, Path]
+
+
+@contextmanager
+def _binary_file(output: Output) -> Iterator[IO[bytes]]:
+    """The output as a binary file object, closing only what is opened here."""
+    if isinstance(output, int):
+        with open(output, "wb", closefd=False) as f:
+            yield f
+    elif isinstance(output, (str, Path)):
+        with open(output, "wb") as f:
+            yield f
+    else:
+        yield output
+
+
+plt: Any = _LazyModule("matplotlib.pyplot")
+mpl_figure: Any = _LazyModule("matplotlib.figure")
+backend_agg: Any = _LazyModule("matplotlib.backends.backend_agg")
+
+
+class FigurePool:
+    """Pre-sized figures reused from chart to chart by the export path.
+
+    Each pooled figure has its Agg canvas and a single axes, which are cleared as
+    soon as the image is encoded, so the chart data is not kept alive. At most *size*
+    idle figures are kept, shared by all the threads, and they never enter the
+    pyplot registry.
+    """
+
+    def __init__(self, size: int = 4, figsize: Optional[Tuple[float, float]] = None):
+        self.size = size
+        self.figsize = figsize
+        self._free: List["Axes"] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def axes(self) -> Iterator["Axes"]:
+        """Lend the axes of an idle figure, created when none is left."""
+        with self._lock:
+            ax: Optional["Axes"] = self._free.pop() if self._free else None
+        if ax is None:
+            fig: "Figure" = mpl_figure.Figure(figsize=self.figsize)
+            backend_agg.FigureCanvasAgg(fig)
+            ax = fig.subplots()
+        try:
+            yield ax
+        finally:
+            ax.clear()
+            with self._lock:
+                if len(self._free) < self.size:
+                    self._free.append(ax)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._free.clear()
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+
+# Figures reused by `MatplotlibBackend.export`.
+figure_pool = FigurePool()
+
 
 class Backend(ABC):
     _chart: dict
+    # Format of the images when neither the caller nor the OUTPUT option set one.
+    default_format: ClassVar[str] = "png"
 
     @abstractmethod
-    def render(self, show: bool = True) -> None:
+    def render(self, show: bool = True) -> Optional["Figure"]:
         pass
 
-    @abstractmethod
-    def figure(self) -> Figure:
-        pass
+    def figure(self) -> "Figure":
+        """The chart drawn on a matplotlib figure, for the backends drawing with it.
+
+        Backends not using matplotlib don't override it, see `builds_figures`.
+        """
+        raise ValueError(f"{type(self).__name__} cannot build figures.")
+
+    @classmethod
+    def builds_figures(cls) -> bool:
+        return cls.figure is not Backend.figure
+
+    def image(self, fmt: Optional[str] = None) -> bytes:
+        """Return the chart encoded in the given image format, see `export`."""
+        buffer = io.BytesIO()
+        self.export(buffer, fmt)
+        return buffer.getvalue()
+
+    def export(
+        self,
+        output: Output,
+        fmt: Optional[str] = None,
+        dpi: Optional[int] = None,
+        size: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        """Write the chart encoded as PNG, SVG or PDF straight into *output*.
+
+        The format, resolution and size in inches default to the ``OUTPUT`` and
+        ``SIZE`` options of the script, then to the backend `default_format` at the
+        backend defaults.
+        """
+        fmt, dpi, size = self._output_options(fmt, dpi, size)
+        fig: "Figure" = self.figure()
+        if size is not None:
+            fig.set_size_inches(size)
+        with _binary_file(output) as f:
+            fig.savefig(f, format=fmt, dpi=dpi or "figure")
+
+    def _output_options(
+        self,
+        fmt: Optional[str],
+        dpi: Optional[int],
+        size: Optional[Tuple[float, float]],
+    ) -> Tuple[str, Optional[int], Optional[Tuple[float, float]]]:
+        options: dict = self._chart.get("options", {})
+        fmt = (fmt or options.get("output_format", self.default_format)).lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt}. Allowed formats are {FORMATS}")
+        return fmt, dpi or options.get("dpi"), size or options.get("size")
+
+    def _series(self) -> List[Tuple[Any, Optional[str]]]:
+        """The y series with their name, a single unnamed one for 1-D y values."""
+        yvalues: Any = self._chart["yvalues"]
+        if getattr(yvalues, "ndim", 1) == 1:
+            return [(yvalues, None)]
+        names: List[str] = self._chart.get("series") or [
+            str(n) for n in range(yvalues.shape[1])
+        ]
+        return list(zip(yvalues.T, names))
 
     @lazy_property
     def _method_name(self) -> str:
@@ -28,16 +183,135 @@ class Backend(ABC):
 @dataclass
 class MatplotlibBackend(Backend):
     _chart: dict
+    # Set to None to draw every image on a new figure.
+    pool: ClassVar[Optional[FigurePool]] = figure_pool
 
-    def render(self, show: bool = True) -> None:
-        plt.figure()  # Create a figure containing a single axes.
-        plt.title(self._chart["label"][1:-1])
-        getattr(plt, self._method_name)(self._chart["xvalues"], self._chart["yvalues"])
-        if show:
-            plt.show()
+    def render(self, show: bool = True) -> Optional["Figure"]:
+        """Display the chart in a window, or return its figure when *show* is False.
 
-    def figure(self) -> Figure:
-        fig, ax = plt.subplots()
-        getattr(ax, self._method_name)(self._chart["xvalues"], self._chart["yvalues"])
-        ax.set_title(self._chart["label"][1:-1])
+        Charts are drawn through the Figure API only, so they can be rendered from
+        several threads at once. pyplot is used to display the figure and nothing else.
+        """
+        if not show:
+            return self.figure()
+        fig: "Figure" = plt.figure()  # a window needs a figure managed by pyplot
+        self._draw(fig.subplots())
+        plt.show()
+        return None
+
+    def figure(self) -> "Figure":
+        # Not registered in pyplot: the figure is freed as soon as the caller drops it.
+        fig: "Figure" = mpl_figure.Figure()
+        self._draw(fig.subplots())
         return fig
+
+    def export(
+        self,
+        output: Output,
+        fmt: Optional[str] = None,
+        dpi: Optional[int] = None,
+        size: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        if self.pool is None:
+            return super().export(output, fmt, dpi, size)
+        fmt, dpi, size = self._output_options(fmt, dpi, size)
+        with self.pool.axes() as ax, _binary_file(output) as f:
+            fig: "Figure" = ax.figure  # type: ignore
+            width, height = fig.get_size_inches()
+            if size is not None:
+                fig.set_size_inches(size)
+            try:
+                self._draw(ax)
+                fig.savefig(f, format=fmt, dpi=dpi or "figure")
+            finally:
+                fig.set_size_inches((width, height))
+
+    def _draw(self, ax: "Axes") -> None:
+        plot: Any = getattr(ax, self._method_name)
+        series: List[Tuple[Any, Optional[str]]] = self._series()
+        for values, name in series:
+            if name is None:
+                plot(self._chart["xvalues"], values)
+            else:
+                plot(self._chart["xvalues"], values, label=name)
+        if len(series) > 1:
+            ax.legend()
+        ax.set_title(self._chart["label"][1:-1])
+
+
+DEFAULT_BACKEND = "matplotlib"
+BACKEND_ENV = "CHICKPY_BACKEND"
+ENTRY_POINT_GROUP = "chickpy.backends"
+
+# Backends are registered by "module:class" path and imported on first use, so that
+# parsing and validating a script never pays for loading a plotting library.
+BACKENDS: Dict[str, Union[str, Type[Backend]]] = {
+    "matplotlib": "chickpy.backend:MatplotlibBackend",
+    "svg": "chickpy.svg:SvgBackend",
+}
+
+_default_backend: Optional[str] = None
+_discovered: bool = False
+
+
+def register_backend(name: str, backend: Union[str, Type[Backend]]) -> None:
+    """Register a backend class, or its "module:class" path, under *name*."""
+    BACKENDS[name.lower()] = backend
+
+
+def backend_name(name: str) -> str:
+    """Return the registry name of the backend, raise ValueError if unknown.
+
+    Backends installed by other packages are declared as ``chickpy.backends`` entry
+    points, they are looked up the first time a name is not in the registry.
+    """
+    if name.lower() not in BACKENDS:
+        _discover_backends()
+    if name.lower() not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend {name}. Available backends are {', '.join(BACKENDS)}"
+        )
+    return name.lower()
+
+
+def set_default_backend(name: Optional[str]) -> None:
+    """Use the backend registered under *name* for all the scripts, None to reset."""
+    global _default_backend
+    _default_backend = backend_name(name) if name is not None else None
+
+
+def default_backend() -> str:
+    """Name of the backend used by default.
+
+    Set with `set_default_backend`, else the ``CHICKPY_BACKEND`` environment variable,
+    else ``matplotlib``.
+    """
+    return _default_backend or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND
+
+
+def get_backend(name: Optional[str] = None) -> Type[Backend]:
+    """Return the backend class registered under *name*, importing it if needed."""
+    name = backend_name(name or default_backend())
+    backend: Union[str, Type[Backend]] = BACKENDS[name]
+    if isinstance(backend, str):
+        module_name, _, class_name = backend.partition(":")
+        backend = getattr(import_module(module_name), class_name)
+        BACKENDS[name] = backend
+    return backend  # type: ignore
+
+
+def _discover_backends() -> None:
+    """Register the entry point backends, without importing them."""
+    global _discovered
+    if _discovered:
+        return
+    _discovered = True
+    for entry_point in _entry_points(ENTRY_POINT_GROUP):
+        BACKENDS.setdefault(entry_point.name.lower(), entry_point.value)
+
+
+def _entry_points(group: str) -> list:
+    entry_points: Any = metadata.entry_points()
+    if hasattr(entry_points, "select"):  # python >= 3.10
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))
@@ -0,0 +1,141 @@
+"""Render many scripts in parallel across a pool of worker processes.
+
+Usage: python -m chickpy.batch OUTPUT_DIR SCRIPT_FILE... [--format svg] [--workers 4]
+"""
+
+import argparse
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+from chickpy.backend import FORMATS
+
+
+@dataclass
+class BatchResult:
+    """Outcome of rendering a single command of a batch."""
+
+    source: str
+    index: int
+    path: Optional[Path]
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def render_batch(
+    scripts: Iterable[Union[str, Path]],
+    output_dir: Union[str, Path],
+    fmt: str = "png",
+    max_workers: Optional[int] = None,
+) -> List[BatchResult]:
+    """Render every command of every script into *output_dir*.
+
+    Scripts are given as text or as `Path` to script files. Each script is parsed once
+    in a worker process, and each of its commands is written to
+    ``<name>_<index>.<fmt>``, the name being the file stem or ``script<n>`` for the
+    script at position n of the batch. Scripts sharing a stem get their position
+    appended, e.g. ``plot-3``, so they don't overwrite each other. Failures are
+    reported in the returned results, in script and command order, without stopping
+    the rest of the batch.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt}. Allowed formats are {FORMATS}")
+    output_path: Path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    jobs: List[Tuple[str, Union[str, Path]]] = _named(list(scripts))
+    results: List[BatchResult] = []
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker) as executor:
+        futures: List[Future] = [
+            executor.submit(_render_script, name, script, output_path, fmt)
+            for name, script in jobs
+        ]
+        for (name, script), future in zip(jobs, futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:  # e.g. a worker process died
+                results.append(BatchResult(str(script), 0, None, 0.0, _error(e)))
+    return results
+
+
+def _named(scripts: List[Union[str, Path]]) -> List[Tuple[str, Union[str, Path]]]:
+    """The scripts with the unique name their outputs are written under."""
+    names: List[str] = [
+        script.stem if isinstance(script, Path) else f"script{n}"
+        for n, script in enumerate(scripts)
+    ]
+    counts: Counter = Counter(names)
+    return [
+        (name if counts[name] == 1 else f"{name}-{n}", script)
+        for n, (name, script) in enumerate(zip(names, scripts))
+    ]
+
+
+def _init_worker() -> None:
+    import matplotlib  # type: ignore
+
+    matplotlib.use("Agg")
+
+
+def _render_script(
+    name: str, script: Union[str, Path], output_dir: Path, fmt: str
+) -> List[BatchResult]:
+    from chickpy.parser import parser
+    from chickpy.processor import _CommandProcessor
+
+    source: str = str(script) if isinstance(script, Path) else name
+    start: float = time.perf_counter()
+    try:
+        text: str = script.read_text() if isinstance(script, Path) else script
+        processors = list(_CommandProcessor.processors(parser.parse(text)))
+    except Exception as e:
+        return [BatchResult(source, 0, None, time.perf_counter() - start, _error(e))]
+
+    results: List[BatchResult] = []
+    for index, processor in enumerate(processors):
+        start = time.perf_counter()
+        path: Path = output_dir / f"{name}_{index}.{fmt}"
+        try:
+            processor.validate()
+            path.write_bytes(processor.backend.image(fmt))
+        except Exception as e:
+            results.append(
+                BatchResult(source, index, None, time.perf_counter() - start, _error(e))
+            )
+        else:
+            results.append(
+                BatchResult(source, index, path, time.perf_counter() - start)
+            )
+    return results
+
+
+def _error(exception: Exception) -> str:
+    return f"{type(exception).__name__}: {exception}"
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Render chickpy scripts.")
+    arg_parser.add_argument("output_dir", type=Path)
+    arg_parser.add_argument("scripts", type=Path, nargs="+")
+    arg_parser.add_argument("--format", choices=FORMATS, default="png")
+    arg_parser.add_argument("--workers", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    results = render_batch(args.scripts, args.output_dir, args.format, args.workers)
+    for result in results:
+        outcome = result.path if result.ok else result.error
+        print(f"{result.source}[{result.index}] {result.seconds:.3f}s {outcome}")
+    failures: int = sum(not result.ok for result in results)
+    print(f"{len(results) - failures} rendered, {failures} failed")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
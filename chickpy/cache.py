@@ -0,0 +1,216 @@
+"""Caches shared by the commands, safe to use from several threads."""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Hashable, Iterator, List, Optional, Union
+
+import numpy as np
+from lark import Token, Tree
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class LRUCache:
+    """Bounded mapping evicting the least recently used entries first."""
+
+    def __init__(self, maxsize: int = 128):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value: Any = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._entries), self._maxsize)
+
+    def _evict(self) -> None:
+        while len(self._entries) > max(self._maxsize, 0):
+            self._entries.popitem(last=False)
+
+
+DISK_MAXSIZE = 256 * 1024 * 1024  # bytes of images kept by a RenderCache disk tier
+
+
+class RenderCache:
+    """Rendered images by content key, in memory with an optional on-disk tier.
+
+    The memory tier is a `LRUCache` of at most *maxsize* images. When *directory* is
+    given every image is also written there, so it survives the process and can be
+    shared by several of them. The disk tier holds at most *disk_maxsize* bytes, the
+    least recently used images are removed first. Keys already identify the inputs,
+    including the data files state, so entries never need to be invalidated.
+
+    Data files are identified by size and modification time, or by a hash of their
+    content with *content_hash*, so files rewritten with the same content, e.g. by
+    a checkout, keep their images.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        directory: Optional[Union[str, Path]] = None,
+        disk_maxsize: int = DISK_MAXSIZE,
+        content_hash: bool = False,
+    ):
+        self._memory = LRUCache(maxsize)
+        self._directory: Optional[Path] = Path(directory) if directory else None
+        self.disk_maxsize = disk_maxsize
+        self.content_hash = content_hash
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._memory.maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        self._memory.maxsize = maxsize
+
+    def get(self, key: str) -> Optional[bytes]:
+        data: Optional[bytes] = self._memory.get(key)
+        if data is None and self._directory is not None:
+            data = self._read(key)
+            if data is not None:
+                self._memory.put(key, data)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self._memory.put(key, data)
+        if self._directory is not None:
+            self._write(key, data)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> CacheStats:
+        memory: CacheStats = self._memory.stats()
+        with self._lock:
+            return CacheStats(self.hits, self.misses, memory.size, memory.maxsize)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path: Path = self._directory / key  # type: ignore
+        try:
+            data: bytes = path.read_bytes()
+            os.utime(path)  # the modification time orders the evictions
+        except OSError:
+            return None
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        """Atomically write the image, a failing disk tier only costs a re-render."""
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)  # type: ignore
+            fd, tmp_name = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_name, self._directory / key)  # type: ignore
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Remove the least recently used images beyond *disk_maxsize* bytes."""
+        entries: List[os.DirEntry] = [
+            entry
+            for entry in os.scandir(self._directory)  # type: ignore
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+        size: int = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime_ns):
+            if size <= self.disk_maxsize:
+                break
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:  # removed by another process
+                pass
+            size -= entry.stat().st_size
+
+
+def tree_digest(tree: Tree, *extras: str) -> str:
+    """Hash of the parse tree and the extra strings.
+
+    The tree holds no whitespace nor comment, so scripts only differing by them share
+    the same digest.
+    """
+    digest = hashlib.sha256()
+    for chunk in _tree_chunks(tree):
+        digest.update(chunk)
+    for extra in extras:
+        digest.update(f"\0{extra}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _tree_chunks(node: Any) -> Iterator[bytes]:
+    if isinstance(node, Tree):
+        yield f"({node.data}".encode("utf-8")
+        for child in node.children:
+            yield from _tree_chunks(child)
+        yield b")"
+    elif isinstance(node, Token):
+        yield f" {node.type}={node.value!r}".encode("utf-8")
+    elif isinstance(node, np.ndarray):  # lists of numbers packed by the parser
+        yield f" {node.dtype.str}{node.shape}=".encode("utf-8")
+        yield np.ascontiguousarray(node).tobytes()
+    else:
+        yield f" {node!r}".encode("utf-8")
+
+
+# Default render cache of `Command.image`.
+render_cache = RenderCache()
@@ -0,0 +1,526 @@
+"""Streaming reader loading the projected columns of a CSV file into typed buffers."""
+
+import csv
+import gzip
+import io
+import multiprocessing
+import os
+import threading
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, count, repeat
+from operator import itemgetter
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+DELIMITERS = ",;|~"
+SNIFF_SIZE = 64 * 1024  # characters inspected to detect the dialect
+FOLLOW_CHUNK_SIZE = 16 * 1024 * 1024  # bytes parsed at once by a CsvFollower
+# Uncompressed files from this size are split in ranges parsed by worker processes.
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+PARALLEL_CHUNK_SIZE = 16 * 1024 * 1024  # bytes of the ranges parsed by the workers
+# Processes parsing a large file, e.g. set to os.cpu_count() to use all the cores.
+PARSE_WORKERS = 1
+
+# Compressed files are detected by their first bytes, then by their extension.
+MAGIC_BYTES = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+EXTENSIONS = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+DIALECT_ATTRIBUTES = (
+    "delimiter",
+    "doublequote",
+    "escapechar",
+    "lineterminator",
+    "quotechar",
+    "quoting",
+    "skipinitialspace",
+)
+
+
+def sniff(csv_file: IO[str]) -> "type[csv.Dialect]":
+    """Detect the dialect from a bounded prefix, then rewind the file."""
+    dialect = _dialect(csv_file.read(SNIFF_SIZE))
+    csv_file.seek(0)
+    return dialect
+
+
+def _dialect(sample: str) -> "type[csv.Dialect]":
+    if len(sample) == SNIFF_SIZE and "\n" in sample:
+        sample = sample[: sample.rindex("\n")]  # don't sniff a truncated row
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=DELIMITERS)
+    except csv.Error as e:
+        raise csv.Error(f"{str(e)}. Allowed delimiters are {DELIMITERS}")
+
+
+def compression(path: Path) -> Optional[str]:
+    """The compression of the file, "gzip" or "zstd", None if it is not compressed."""
+    with open(path, "rb") as f:
+        magic: bytes = f.read(4)
+    for prefix, name in MAGIC_BYTES.items():
+        if magic.startswith(prefix):
+            return name
+    return EXTENSIONS.get(path.suffix.lower())
+
+
+@contextmanager
+def open_csv(path: Path) -> Iterator[IO[str]]:
+    """Open the CSV file as text, gzip and zstd files are decompressed as a stream.
+
+    zstd needs the zstandard package.
+    """
+    kind: Optional[str] = compression(path)
+    if kind is None:
+        with open(path, mode="r", newline="") as csv_file:
+            yield csv_file
+    elif kind == "gzip":
+        with gzip.open(path, mode="rt", newline="") as csv_file:
+            yield csv_file
+    else:
+        try:
+            import zstandard  # type: ignore
+        except ImportError:
+            raise ImportError(f"Reading {path} needs zstandard installed.")
+        with open(path, "rb") as compressed:
+            stream: Any = zstandard.ZstdDecompressor().stream_reader(compressed)
+            with io.TextIOWrapper(stream, newline="") as csv_file:
+                yield csv_file
+
+
+def _start(csv_file: IO[str]) -> Tuple["type[csv.Dialect]", List[str], Iterator[str]]:
+    """The dialect, the header and the other lines of a file opened by `open_csv`."""
+    if csv_file.seekable():
+        dialect = sniff(csv_file)
+        lines: Iterator[str] = iter(csv_file)
+    else:  # a stream: the sniffed sample is read again from memory
+        sample: str = csv_file.read(SNIFF_SIZE)
+        dialect = _dialect(sample)
+        lines = chain(io.StringIO(sample + csv_file.readline()), csv_file)
+    return dialect, next(csv.reader(lines, dialect=dialect), []), lines
+
+
+# A CSV column given by header name or by position.
+Column = Union[str, int]
+
+
+def read_xy(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``x`` and ``y`` columns of the CSV file at *path*."""
+    return read_columns(path, "x", ["y"])
+
+
+def read_columns(
+    path: Path,
+    x: Optional[Column],
+    ys: Sequence[Column],
+    workers: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the *x* column and the *ys* columns of the CSV file at *path*.
+
+    After sniffing the first ``SNIFF_SIZE`` characters the file is streamed once, row
+    by row. Rows without quotes are only split up to the last projected column, the
+    other columns are neither split nor converted. y values and numeric x values are
+    packed in ``array("d")`` buffers, then exposed as float64 arrays without copying:
+    a single y column gives a 1-D array, several give one column per series. When a
+    non numeric x value is found the x column becomes categorical and is returned as
+    an array of strings. Without *x* the row numbers are the x values.
+
+    Uncompressed files of ``PARALLEL_MIN_SIZE`` bytes or more are parsed by
+    *workers* processes, ``PARSE_WORKERS`` by default, see `_read_parallel`. The
+    file is parsed in the calling process whatever *workers* when it runs other
+    threads, since forking them is unsafe, or is a worker process itself, e.g. of a
+    batch or of the render server.
+    """
+    workers = PARSE_WORKERS if workers is None else workers
+    if (
+        workers > 1
+        and path.stat().st_size >= PARALLEL_MIN_SIZE
+        and threading.active_count() == 1
+        and multiprocessing.parent_process() is None
+    ):
+        values: Optional[Tuple[np.ndarray, np.ndarray]] = _read_parallel(
+            path, x, ys, workers
+        )
+        if values is not None:
+            return values
+    with open_csv(path) as csv_file:
+        dialect, header, lines = _start(csv_file)
+        xvalues, yvalues = _Projection(path, dialect, header, x, ys).parse(lines)
+    if xvalues is None:
+        return np.arange(len(yvalues), dtype=np.float64), yvalues
+    return xvalues, yvalues
+
+
+def read_groups(
+    path: Path, x: Optional[Column], ys: Sequence[Column]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the distinct *x* values, the index of each row among them and the *ys*.
+
+    Like `read_columns`, but category labels are numbered with a dict while the rows
+    are read, in order of first appearance, and only the number is kept for each
+    row. Numbers are sorted.
+    """
+    with open_csv(path) as csv_file:
+        dialect, header, lines = _start(csv_file)
+        projection = _Projection(path, dialect, header, x, ys, group=True)
+        xvalues, yvalues = projection.parse(lines)
+    if isinstance(xvalues, _Groups):
+        return xvalues.keys, xvalues.codes, yvalues
+    if xvalues is None:
+        xvalues = np.arange(len(yvalues), dtype=np.float64)
+    keys, codes = np.unique(xvalues, return_inverse=True)
+    return keys, codes.reshape(-1), yvalues
+
+
+def _read_parallel(
+    path: Path, x: Optional[Column], ys: Sequence[Column], workers: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Parse byte ranges of the file on a process pool, None if it can't be split.
+
+    The ranges end at line ends, so the file is split only when its rows can't span
+    several lines: uncompressed and without quotes. The prefix is checked first,
+    then each worker checks its range. The values of the ranges are concatenated in
+    file order.
+    """
+    if compression(path) is not None:
+        return None
+    with open(path, "rb") as f:
+        prefix: bytes = f.read(SNIFF_SIZE)
+        if b"\n" not in prefix:
+            return None
+        # Complete lines only, a multibyte character may straddle the end.
+        text_file: IO[str] = _text_file(prefix[: prefix.rindex(b"\n") + 1])
+        dialect = sniff(text_file)
+        if dialect.quotechar and dialect.quotechar in text_file.read():
+            return None
+        f.seek(0)
+        header_line: bytes = f.readline()
+        header: List[str] = next(
+            csv.reader(_text_file(header_line), dialect=dialect), []
+        )
+        size: int = os.fstat(f.fileno()).st_size
+        ranges: int = max(workers, -(-(size - len(header_line)) // PARALLEL_CHUNK_SIZE))
+        ends: List[int] = []
+        for n in range(1, ranges):
+            f.seek(len(header_line) + (size - len(header_line)) * n // ranges)
+            f.readline()  # to the start of the next row
+            ends.append(min(f.tell(), size))
+    starts: List[int] = [len(header_line)] + ends
+    ends.append(size)
+    projection = _Projection(path, dialect, header, x, ys)
+    with ProcessPoolExecutor(workers) as executor:
+        results: List[Optional[Tuple[Any, np.ndarray]]] = list(
+            executor.map(_parse_range, repeat(projection), starts, ends)
+        )
+    parts: List[Tuple[Any, np.ndarray]] = [part for part in results if part]
+    if len(parts) < len(results):  # quotes found after the prefix
+        return None
+    yvalues: np.ndarray = np.concatenate([part[1] for part in parts])
+    if projection.x_index is None:
+        return np.arange(len(yvalues), dtype=np.float64), yvalues
+    xparts: List[np.ndarray] = [part[0] for part in parts]
+    if any(xpart.dtype.kind == "U" for xpart in xparts):  # a range is categorical
+        xparts = [
+            xpart if xpart.dtype.kind == "U" else np.array(list(map(_label, xpart)))
+            for xpart in xparts
+        ]
+    return np.concatenate(xparts), yvalues
+
+
+def _parse_range(
+    projection: "_Projection", start: int, end: int
+) -> Optional[Tuple[Any, Any]]:
+    """Parse the rows between the *start* and *end* offsets, in a worker process.
+
+    None when the range has quotes, its rows may then span several ranges.
+    """
+    with open(projection.path, "rb") as f:
+        f.seek(start)
+        data: bytes = f.read(end - start)
+    quotechar: Optional[str] = projection.dialect.quotechar
+    if quotechar and quotechar.encode() in data:
+        return None
+    return projection.parse(iter(_text_file(data)))
+
+
+def _text_file(data: bytes) -> IO[str]:
+    """*data* decoded like a file opened as text."""
+    return io.TextIOWrapper(io.BytesIO(data), newline="")
+
+
+class _Groups:
+    """Category labels numbered in order of first appearance, and the row numbers."""
+
+    def __init__(self, labels: Iterable[str]):
+        # A new label gets the next number without leaving C code.
+        self.numbers: Dict[str, int] = defaultdict(count().__next__)
+        self.rows: "array[int]" = array("q", [self.numbers[label] for label in labels])
+
+    @property
+    def keys(self) -> np.ndarray:
+        return np.array(list(self.numbers))
+
+    @property
+    def codes(self) -> np.ndarray:
+        return np.frombuffer(self.rows, dtype=np.int64)
+
+
+class _Projection:
+    """Parses the projected columns of the rows of a CSV file."""
+
+    def __init__(
+        self,
+        path: Path,
+        dialect: "type[csv.Dialect]",
+        header: List[str],
+        x: Optional[Column],
+        ys: Sequence[Column],
+        group: bool = False,
+    ):
+        self.path = path
+        self.dialect = dialect
+        self.group = group  # number the category labels instead of keeping them
+        self.x_index: Optional[int] = None if x is None else _index(header, x)
+        self.y_indexes: List[Any] = [_index(header, y) for y in ys]
+        if None in self.y_indexes or (x is not None and self.x_index is None):
+            names: List[str] = [str(c) for c in ([] if x is None else [x]) + list(ys)]
+            raise ValueError(
+                f"CSV file {path} must have {', '.join(names[:-1])} and {names[-1]} "
+                "columns."
+                if len(names) > 1
+                else f"CSV file {path} must have a {names[0]} column."
+            )
+
+    def __getstate__(self) -> dict:
+        # Sniffed dialects are classes local to the csv module, so they are pickled
+        # by attributes for the worker processes.
+        state: dict = self.__dict__.copy()
+        state["dialect"] = {
+            name: getattr(self.dialect, name) for name in DIALECT_ATTRIBUTES
+        }
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["dialect"] = type("dialect", (csv.Dialect,), state["dialect"])
+        self.__dict__.update(state)
+
+    def parse(self, lines: Iterator[str]) -> Tuple[Any, np.ndarray]:
+        """The x values, None without x column, and the y values of the *lines*.
+
+        Categorical x values are returned as `_Groups` when grouping.
+        """
+        dialect = self.dialect
+        delimiter: str = dialect.delimiter
+        quotechar: Optional[str] = dialect.quotechar
+        x_index, y_indexes = self.x_index, self.y_indexes
+        splits: int = max(y_indexes + [x_index or 0]) + 1
+        y_index: int = y_indexes[0]
+        get_ys: Callable[[List[str]], Any] = itemgetter(*y_indexes)
+        single: bool = len(y_indexes) == 1
+        numbers: "array[float]" = array("d")
+        labels: Optional[List[str]] = None
+        groups: Optional[_Groups] = None
+        yvalues: "array[float]" = array("d")
+        append_y, extend_y = yvalues.append, yvalues.extend
+        for line in lines:
+            if quotechar and quotechar in line:
+                row: List[str] = next(
+                    csv.reader(chain((line,), lines), dialect=dialect), []
+                )
+            elif line.isspace():
+                continue
+            else:
+                row = line.split(delimiter, splits)
+            if not row:
+                continue
+            try:
+                if single:
+                    append_y(float(row[y_index]))
+                else:
+                    extend_y(map(float, get_ys(row)))
+                if x_index is None:
+                    continue
+                value: str = row[x_index]
+            except IndexError:
+                raise ValueError(
+                    f"CSV file {self.path} has a row missing columns: {line!r}"
+                )
+            if labels is None:
+                try:
+                    numbers.append(float(value))
+                    continue
+                except ValueError:
+                    labels = [_label(n) for n in numbers]
+                    if self.group:
+                        groups = _Groups(labels)
+                        numbered, add_row = groups.numbers, groups.rows.append
+            if groups is None:
+                labels.append(_text(value, dialect))
+            else:
+                add_row(numbered[_text(value, dialect)])
+        ycolumns: np.ndarray = np.frombuffer(yvalues, dtype=np.float64)
+        if not single:
+            ycolumns = ycolumns.reshape(-1, len(y_indexes))
+        if x_index is None:
+            return None, ycolumns
+        if groups is not None:
+            return groups, ycolumns
+        xvalues: np.ndarray = (
+            np.frombuffer(numbers, dtype=np.float64)
+            if labels is None
+            else np.array(labels)
+        )
+        return xvalues, ycolumns
+
+
+class CsvFollower:
+    """Reads a growing CSV file incrementally, parsing only the appended rows.
+
+    Every `poll` starts reading at the byte offset where the previous one stopped,
+    and only complete lines are consumed, so a row being written is read by the next
+    poll. The values are kept in buffers growing in place. With a *window* only the
+    last *window* rows are kept. A file getting smaller is read again from the start.
+    Large appends are parsed by chunks of ``FOLLOW_CHUNK_SIZE`` bytes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        x: Optional[Column],
+        ys: Sequence[Column],
+        window: Optional[int] = None,
+    ):
+        self.path = path
+        self.x = x
+        self.ys = list(ys)
+        self.window = window
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset: int = 0
+        self.rows: int = 0
+        self._projection: Optional[_Projection] = None
+        self._xvalues = _Buffer(None, self.window)
+        self._yvalues = _Buffer(len(self.ys) if len(self.ys) > 1 else None, self.window)
+        self._labels: Optional[List[str]] = None
+
+    @property
+    def values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The x and y values of the rows read so far, or of the window."""
+        yvalues: np.ndarray = self._yvalues.values
+        if self._labels is None:
+            return self._xvalues.values, yvalues
+        return np.array(self._labels[len(self._labels) - len(yvalues) :]), yvalues
+
+    def poll(self) -> int:
+        """Read the rows appended since the previous poll, return how many."""
+        size: int = self.path.stat().st_size
+        if size < self.offset:  # truncated or replaced
+            self._reset()
+        if size == self.offset:
+            return 0
+        if not self.offset and compression(self.path) is not None:
+            raise ValueError(f"Compressed CSV file {self.path} cannot be followed.")
+        rows: int = 0
+        pending: bytes = b""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for _ in range(0, size - self.offset, FOLLOW_CHUNK_SIZE):
+                data: bytes = pending + f.read(FOLLOW_CHUNK_SIZE)
+                end: int = data.rfind(b"\n") + 1  # a row being written is left
+                if end:
+                    rows += self._parse(data[:end])
+                    self.offset += end
+                pending = data[end:]
+        return rows
+
+    def _parse(self, data: bytes) -> int:
+        text_file: IO[str] = _text_file(data)
+        lines: Iterator[str] = iter(text_file)
+        if self._projection is None:
+            dialect = sniff(text_file)
+            header: List[str] = next(csv.reader(lines, dialect=dialect), [])
+            self._projection = _Projection(self.path, dialect, header, self.x, self.ys)
+        xvalues, yvalues = self._projection.parse(lines)
+        if xvalues is None:
+            xvalues = np.arange(self.rows, self.rows + len(yvalues), dtype=np.float64)
+        self._append(xvalues, yvalues)
+        self.rows += len(yvalues)
+        return len(yvalues)
+
+    def _append(self, xvalues: np.ndarray, yvalues: np.ndarray) -> None:
+        self._yvalues.extend(yvalues)
+        if self._labels is None and xvalues.dtype.kind == "f":
+            self._xvalues.extend(xvalues)
+            return
+        if self._labels is None:  # the x column turned out categorical
+            self._labels = [_label(n) for n in self._xvalues.values.tolist()]
+        self._labels.extend(str(x) for x in xvalues.tolist())
+        if self.window is not None and len(self._labels) > 2 * self.window:
+            del self._labels[: -self.window]
+
+
+class _Buffer:
+    """float64 values appended in place, keeping the last *window* rows if given.
+
+    The storage grows by doubling, so appending costs the size of the new values.
+    `values` is a view which later appends don't change.
+    """
+
+    def __init__(self, columns: Optional[int], window: Optional[int]):
+        self._shape: Tuple[int, ...] = () if columns is None else (columns,)
+        self._window = window
+        self._data: np.ndarray = np.empty((0,) + self._shape, dtype=np.float64)
+        self._start = self._stop = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[self._start : self._stop]
+
+    def extend(self, values: np.ndarray) -> None:
+        if self._window is not None and len(values) > self._window:
+            values = values[-self._window :]
+        if self._stop + len(values) > len(self._data):
+            kept: np.ndarray = self.values
+            if self._window is not None:
+                kept = kept[max(0, len(kept) + len(values) - self._window) :]
+            capacity: int = max(1024, 2 * (len(kept) + len(values)))
+            self._data = np.empty((capacity,) + self._shape, dtype=np.float64)
+            self._data[: len(kept)] = kept
+            self._start, self._stop = 0, len(kept)
+        self._data[self._stop : self._stop + len(values)] = values
+        self._stop += len(values)
+        if self._window is not None:
+            self._start = max(self._start, self._stop - self._window)
+
+
+def _index(header: List[str], column: Column) -> Optional[int]:
+    """Position of the column given by name, or checked position, None if missing."""
+    if isinstance(column, int):
+        return column if column < len(header) else None
+    return header.index(column) if column in header else None
+
+
+def _text(value: str, dialect: "type[csv.Dialect]") -> str:
+    """A field split without the csv module, as the csv module would read it."""
+    value = value.rstrip("\r\n")
+    return value.lstrip(" ") if dialect.skipinitialspace else value
+
+
+def _label(number: float) -> str:
+    """Text of a numeric x value read before the column turned out categorical."""
+    return str(int(number)) if number.is_integer() else repr(number)
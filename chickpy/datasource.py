@@ -1,72 +1,314 @@
-import csv
+import hashlib
+import os
 from abc import ABC, abstractproperty
 from dataclasses import dataclass
 from functools import cached_property as lazy_property
 from pathlib import Path
-from typing import Any, List, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Type
 
-DELIMITERS = ",;|~"
+import numpy as np
+
+from chickpy import profiling
+from chickpy.arrowreader import Where, read_arrow, read_parquet
+from chickpy.csvreader import Column, CsvFollower, read_columns, read_xy
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chickpy.aggregation import Reduction
+
+
+def is_categorical(values: np.ndarray) -> bool:
+    """Whether the values are category labels rather than numbers."""
+    return values.dtype.kind in "OSU"
 
 
 class DataSource(ABC):
-    def sanitize_value(self, value: str) -> Union[str, float]:
+    def sanitize_values(self, values: List[str]) -> np.ndarray:
+        """Convert the values to a float64 array, or to an array of unquoted strings."""
         try:
-            return float(value)
+            return np.array(values, dtype=np.float64)
         except ValueError:
-            return value[1:-1]
+            return np.array([v[1:-1] if v[:1] == '"' else v for v in values])
 
     @classmethod
-    def values(cls, data_src_tree: Any) -> Tuple[List[Union[str, float]], List[float]]:
-        data_source: str = data_src_tree.children[0].data.value
-        if data_source == "data_source_csv":
-            return _DataSourceCsv(data_src_tree).data
-        return _DataSourceStd(data_src_tree).data
+    def values(
+        cls, data_src_tree: Any, reduction: Optional["Reduction"] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The x and y values, reduced while loading when a *reduction* is given."""
+        data_source: str = str(data_src_tree.children[0].data)
+        DataSourceCls: Type[DataSource] = DATA_SOURCES.get(data_source, _DataSourceStd)
+        source: DataSource = DataSourceCls(data_src_tree)  # type: ignore
+        with profiling.stage("load") as stage:
+            values: Tuple[np.ndarray, np.ndarray] = (
+                source.data if reduction is None else source.reduced(reduction)
+            )
+            stage.points = len(values[1])
+            if stage.enabled:
+                stage.bytes_read = source.bytes_read
+        return values
+
+    @property
+    def bytes_read(self) -> int:
+        """Size of the data read from files, for profiling."""
+        return 0
+
+    @classmethod
+    def fingerprint(cls, data_src_tree: Any, content: bool = False) -> str:
+        """Identify the state of the data read by the source.
+
+        Inline values are part of the script so their fingerprint is empty. Files are
+        identified by path, size and modification time, or by a hash of their content
+        when *content* is True.
+        """
+        data_source: str = str(data_src_tree.children[0].data)
+        DataSourceCls: Type[DataSource] = DATA_SOURCES.get(data_source, _DataSourceStd)
+        return DataSourceCls(data_src_tree)._fingerprint(content)  # type: ignore
+
+    def _fingerprint(self, content: bool) -> str:
+        return ""
+
+    @classmethod
+    def series(cls, data_src_tree: Any) -> List[str]:
+        """Names of the y columns picked with ``COLUMNS``, empty when not picked."""
+        return [
+            str(_column(token))
+            for node in data_src_tree.find_data("y_column")
+            for token in node.children
+        ]
+
+    @classmethod
+    def follower(cls, data_src_tree: Any) -> Optional[CsvFollower]:
+        """The follower reading the appended rows of a ``FOLLOW`` source, or None."""
+        data_source: str = str(data_src_tree.children[0].data)
+        DataSourceCls: Type[DataSource] = DATA_SOURCES.get(data_source, _DataSourceStd)
+        return DataSourceCls(data_src_tree)._follower  # type: ignore
+
+    @property
+    def _follower(self) -> Optional[CsvFollower]:
+        return None
+
+    def reduced(self, reduction: "Reduction") -> Tuple[np.ndarray, np.ndarray]:
+        """The values reduced by *reduction*, sources can reduce them while reading."""
+        return reduction.reduce(*self.data)
 
     @abstractproperty
-    def data(self) -> Tuple[List[Union[str, float]], List[float]]:
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
         pass
 
 
 @dataclass
-class _DataSourceCsv(DataSource):
+class _DataSourceFile(DataSource):
     _data_source_tree: Any
 
-    @lazy_property
-    def data(self) -> Tuple[List[Union[str, float]], List[float]]:
-        with open(self._file_path, mode="r") as csv_file:
-            try:
-                dialect = csv.Sniffer().sniff(csv_file.read(), delimiters=DELIMITERS)
-            except csv.Error as e:
-                raise csv.Error(f"{str(e)}. Allowed delimiters are {DELIMITERS}")
-            csv_file.seek(0)
-            csv_reader = csv.DictReader(
-                csv_file,
-                quoting=csv.QUOTE_MINIMAL,
-                dialect=dialect,
-            )
-            values: List[dict] = list(csv_reader)
-        xvalues = [self.sanitize_value(row["x"]) for row in values]
-        yvalues = [float(row["y"]) for row in values]
-        return xvalues, yvalues
-
     @property
     def _file_path(self) -> Path:
         file: str = self._data_source_tree.children[0].children[0].value[1:-1]
         return Path(file).resolve()
 
+    @property
+    def bytes_read(self) -> int:
+        return self._file_path.stat().st_size
+
+    def _fingerprint(self, content: bool) -> str:
+        path: Path = self._file_path
+        if content:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            return f"{path}:{digest.hexdigest()}"
+        stat: os.stat_result = path.stat()
+        return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @property
+    def _columns(self) -> Tuple[Optional[Column], List[Column]]:
+        """The x and y columns given in the script, None and [] when missing."""
+        x_column: Optional[Column] = None
+        y_columns: List[Column] = []
+        for node in self._data_source_tree.children[0].iter_subtrees_topdown():
+            if node.data == "x_column":
+                x_column = _column(node.children[0])
+            elif node.data == "y_column":
+                y_columns = [_column(token) for token in node.children]
+        return x_column, y_columns
+
+    @property
+    def _xy_columns(self) -> Tuple[Optional[Column], List[Column]]:
+        """The columns picked with ``COLUMNS``, the ``x`` and ``y`` ones otherwise."""
+        x_column, y_columns = self._columns
+        return (x_column, y_columns) if y_columns else ("x", ["y"])
+
+
+@dataclass
+class _DataSourceCsv(_DataSourceFile):
+    """CSV file with ``x`` and ``y`` columns, or the columns picked with ``COLUMNS``.
+
+    Only the picked columns are converted, and all the y series are read in the same
+    pass over the file. With ``FOLLOW`` the file is read by a `CsvFollower`, which
+    reads the rows appended later at each poll.
+    """
+
+    @lazy_property
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._follower is not None:
+            self._follower.poll()
+            return self._follower.values
+        x_column, y_columns = self._columns
+        if not y_columns:
+            return read_xy(self._file_path)
+        return read_columns(self._file_path, x_column, y_columns)
+
+    def reduced(self, reduction: "Reduction") -> Tuple[np.ndarray, np.ndarray]:
+        if self._follower is not None:
+            return super().reduced(reduction)
+        return reduction.reduce_csv(self._file_path, *self._xy_columns)
+
+    @lazy_property
+    def _follower(self) -> Optional[CsvFollower]:
+        follow: List[Any] = list(self._data_source_tree.find_data("follow"))
+        if not follow:
+            return None
+        window: List[Any] = follow[0].children
+        return CsvFollower(
+            self._file_path, *self._xy_columns, int(window[0]) if window else None
+        )
+
+
+@dataclass
+class _DataSourceArray(_DataSourceFile):
+    """Binary series mapped in memory, pages are read only when values are used.
+
+    A 1-D file holds the y values, x being their index. A 2-D file holds one series
+    per column, x and y are the first two columns unless picked by index with
+    ``COLUMNS``. Several y columns are returned as a 2-D array, one column per series.
+    """
+
+    @lazy_property
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        array: np.ndarray = self._array
+        x_column, y_columns = self._columns
+        if array.ndim == 1:
+            if x_column is not None or y_columns:
+                raise ValueError(f"{self._file_path} has a single column.")
+            return np.arange(len(array), dtype=np.float64), array
+
+        if not y_columns:
+            x_column, y_columns = 0, [1]
+        x_index: Optional[int] = self._index(x_column, array.shape[1])
+        y_indexes: List[int] = [self._index(y, array.shape[1]) for y in y_columns]
+        xvalues: np.ndarray = (
+            np.arange(len(array), dtype=np.float64)
+            if x_index is None
+            else array[:, x_index]
+        )
+        if len(y_indexes) == 1:
+            return xvalues, array[:, y_indexes[0]]
+        return xvalues, array[:, y_indexes]
+
+    def _index(self, column: Optional[Column], width: int) -> Any:
+        """The index of the column, checked against the *width* of the array."""
+        if isinstance(column, str):
+            raise ValueError(
+                f"Columns of {self._file_path} are picked by index, not by name."
+            )
+        if column is not None and column >= width:
+            raise ValueError(
+                f"Column {column} is out of range, "
+                f"{self._file_path} has {width} columns."
+            )
+        return column
+
+    @abstractproperty
+    def _array(self) -> np.ndarray:
+        pass
+
+
+@dataclass
+class _DataSourceNpy(_DataSourceArray):
+    @property
+    def _array(self) -> np.ndarray:
+        return np.load(self._file_path, mmap_mode="r", allow_pickle=False)
+
+
+@dataclass
+class _DataSourceBin(_DataSourceArray):
+    """Raw little-endian float64 values, ``FIELDS`` values per row."""
+
+    @property
+    def _array(self) -> np.ndarray:
+        fields_tokens: List[Any] = [
+            token
+            for token in self._data_source_tree.children[0].children
+            if getattr(token, "type", None) == "FIELDS"
+        ]
+        fields: int = int(fields_tokens[0]) if fields_tokens else 1
+        array: np.ndarray = np.memmap(self._file_path, dtype="<f8", mode="r")
+        if fields == 1:
+            return array
+        if len(array) % fields:
+            raise ValueError(
+                f"{self._file_path} size is not a multiple of {fields} fields."
+            )
+        return array.reshape(-1, fields)
+
+
+@dataclass
+class _DataSourceArrow(_DataSourceFile):
+    """Arrow IPC file mapped in memory, only the picked columns are converted.
+
+    Columns are picked by name or index with ``COLUMNS``, ``x`` and ``y`` by default,
+    and ``WHERE column BETWEEN low AND high`` keeps the rows in the range.
+    """
+
+    @lazy_property
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        return read_arrow(self._file_path, *self._xy_columns, self._where)
+
+    @property
+    def _where(self) -> Optional[Where]:
+        for node in self._data_source_tree.find_data("where"):
+            column, low, high = node.children
+            return _column(column), float(low), float(high)
+        return None
+
+
+@dataclass
+class _DataSourceParquet(_DataSourceArrow):
+    """Parquet file, the row groups outside the ``WHERE`` range are not read."""
+
+    @lazy_property
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        return read_parquet(self._file_path, *self._xy_columns, self._where)
+
 
 @dataclass
 class _DataSourceStd(DataSource):
     _data_source_tree: Any
 
     @lazy_property
-    def data(self) -> Tuple[List[Union[str, float]], List[float]]:
-        xvalues: map = map(
-            lambda x: self.sanitize_value(x.children[0].value),
-            list(self._data_source_tree.find_data("x_values"))[0].children,
-        )
-        yvalues: map = map(
-            lambda x: float(x.children[0].value),
-            list(self._data_source_tree.find_data("y_values"))[0].children,
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            self._values("x_values", self.sanitize_values),
+            self._values("y_values", lambda values: np.array(values, dtype=np.float64)),
         )
-        return list(xvalues), list(yvalues)
+
+    def _values(self, name: str, convert: Callable[[List[str]], np.ndarray]):
+        children: list = next(self._data_source_tree.find_data(name)).children
+        if len(children) == 1 and isinstance(children[0], np.ndarray):
+            return children[0]  # list of numbers already packed by the parser
+        return convert([child.children[0].value for child in children])
+
+
+def _column(token: Any) -> Column:
+    """A column index, or a header name which may be quoted."""
+    if token.type == "COLUMN":
+        return int(token)
+    return token[1:-1] if token.type == "ESCAPED_STRING" else str(token)
+
+
+DATA_SOURCES: Dict[str, Type[DataSource]] = {
+    "data_source_csv": _DataSourceCsv,
+    "data_source_npy": _DataSourceNpy,
+    "data_source_bin": _DataSourceBin,
+    "data_source_arrow": _DataSourceArrow,
+    "data_source_parquet": _DataSourceParquet,
+}
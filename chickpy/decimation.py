@@ -0,0 +1,71 @@
+"""Reduce huge series to the points a rendered chart can actually show."""
+
+from typing import Tuple
+
+import numpy as np
+
+from chickpy.datasource import is_categorical
+from chickpy.enums import CHART_TYPE
+
+
+def decimate(
+    xvalues: np.ndarray, yvalues: np.ndarray, chart_type: CHART_TYPE, max_points: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return at most *max_points* points of the series, picked by chart type.
+
+    Lines keep the minimum and maximum of each bucket of consecutive points, so
+    peaks survive. Scatter plots keep one point per cell of a grid over the data
+    range, so the shape and the outliers survive. Bars and categorical values are
+    never decimated.
+    """
+    if len(yvalues) <= max_points or max_points < 1 or is_categorical(xvalues):
+        return xvalues, yvalues
+    # Several series (one per column) share the budget and keep the union of picks.
+    series: list = list(yvalues.T) if yvalues.ndim > 1 else [yvalues]
+    budget: int = max(1, max_points // len(series))
+    if chart_type == CHART_TYPE.LINE:
+        picks: list = [minmax_indexes(values, budget) for values in series]
+    elif chart_type == CHART_TYPE.SCATTER:
+        picks = [grid_indexes(xvalues, values, budget) for values in series]
+    else:
+        return xvalues, yvalues
+    indexes: np.ndarray = (
+        picks[0] if len(picks) == 1 else np.unique(np.concatenate(picks))
+    )
+    return xvalues[indexes], yvalues[indexes]
+
+
+def minmax_indexes(yvalues: np.ndarray, max_points: int) -> np.ndarray:
+    """Sorted indexes of the min and max of each bucket, plus first and last point."""
+    if max_points < 4:  # not enough room for the extremes: evenly spaced points
+        return np.unique(np.linspace(0, len(yvalues) - 1, max_points).astype(np.int64))
+    buckets: int = (max_points - 2) // 2
+    size: int = -(-len(yvalues) // buckets)  # ceil division
+    # Pad with the last value to get equal size buckets, reshaped as a 2-D array.
+    padded: np.ndarray = np.pad(
+        np.asarray(yvalues), (0, buckets * size - len(yvalues)), mode="edge"
+    ).reshape(buckets, size)
+    offsets: np.ndarray = np.arange(buckets) * size
+    indexes: np.ndarray = np.concatenate(
+        (
+            [0, len(yvalues) - 1],
+            offsets + padded.argmin(axis=1),
+            offsets + padded.argmax(axis=1),
+        )
+    )
+    return np.unique(np.minimum(indexes, len(yvalues) - 1))
+
+
+def grid_indexes(
+    xvalues: np.ndarray, yvalues: np.ndarray, max_points: int
+) -> np.ndarray:
+    """Sorted indexes of the first point falling in each cell of a square grid."""
+    side: int = max(1, int(np.sqrt(max_points)))
+    cells: np.ndarray = _grid_cell(xvalues, side) * side + _grid_cell(yvalues, side)
+    return np.sort(np.unique(cells, return_index=True)[1])
+
+
+def _grid_cell(values: np.ndarray, side: int) -> np.ndarray:
+    low, high = np.nanmin(values), np.nanmax(values)
+    span: float = float(high - low) or 1.0
+    return np.minimum(((values - low) / span * side).astype(np.int64), side - 1)
@@ -0,0 +1,156 @@
+"""Charts of growing CSV files, updated in place as rows are appended.
+
+The data source must be a CSV file read with ``FOLLOW``. Each `LiveChart.refresh`
+parses only the rows appended since the previous one, then updates the data of the
+lines or scatter points already drawn instead of drawing the chart again, so its cost
+grows with the new rows rather than with the size of the file. With ``WINDOW n`` the
+chart shows the last n rows.
+
+Usage
+-----
+>>> chart = LiveChart('CREATE CHART "load" FROM CSV "load.csv" FOLLOW WINDOW 500;')
+>>> chart.show(interval=1.0)  # window refreshed every second
+
+or, without a window:
+
+>>> chart.refresh()
+>>> png = chart.image()
+"""
+
+import io
+from typing import TYPE_CHECKING, Any, List, Optional
+
+import numpy as np
+
+from chickpy import profiling
+from chickpy.backend import MatplotlibBackend, backend_agg, mpl_figure, plt
+from chickpy.csvreader import CsvFollower
+from chickpy.datasource import DataSource, is_categorical
+from chickpy.enums import CHART_TYPE
+from chickpy.parser import parser
+from chickpy.processor import _CommandProcessor, _CreateChartProcessor
+
+if TYPE_CHECKING:  # pragma: no cover
+    from matplotlib.axes import Axes  # type: ignore
+    from matplotlib.figure import Figure  # type: ignore
+
+LIVE_CHART_TYPES = (CHART_TYPE.LINE, CHART_TYPE.SCATTER)
+
+
+class LiveChart:
+    """The chart of the command at *index* of *script*, following its CSV file."""
+
+    def __init__(self, script: str, index: int = 0):
+        tree: Any = parser.parse(script)
+        self._processor: _CreateChartProcessor = list(
+            _CommandProcessor.processors(tree)
+        )[index]
+        data_source: Any = self._processor._tree.children[1]
+        follower: Optional[CsvFollower] = (
+            DataSource.follower(data_source)
+            if getattr(data_source, "data", None) == "data_source"
+            else None
+        )
+        if follower is None:
+            raise ValueError("A live chart must read a CSV file with FOLLOW.")
+        self._follower: CsvFollower = follower
+        self._follower.poll()
+        self._validate()
+        self._scatter: bool = self._chart_type == CHART_TYPE.SCATTER
+        self._figure: Optional["Figure"] = None
+        self._artists: List[Any] = []
+
+    @property
+    def chart(self) -> dict:
+        """The validated chart, with the values read so far."""
+        return self._processor._chart
+
+    @property
+    def figure(self) -> "Figure":
+        """The figure of the chart, drawn on first use then updated by `refresh`."""
+        if self._figure is None:
+            fig: "Figure" = mpl_figure.Figure()
+            backend_agg.FigureCanvasAgg(fig)
+            self._draw(fig)
+        return self._figure  # type: ignore
+
+    def refresh(self) -> int:
+        """Read the appended rows and update the figure, return how many were read.
+
+        The figure is not drawn here, it is drawn again when saved or shown.
+        """
+        offset: int = self._follower.offset
+        with profiling.stage("load") as stage:
+            rows: int = self._follower.poll()
+            stage.points = rows
+            stage.bytes_read = self._follower.offset - offset
+        if not rows:
+            return 0
+        self._validate()
+        if self._figure is not None:
+            with profiling.stage("render") as stage:
+                self._update(rows)
+                stage.points = len(self.chart["yvalues"])
+        return rows
+
+    def image(self, fmt: str = "png") -> bytes:
+        """Return the current state of the chart encoded in the given format."""
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+
+    def show(self, interval: float = 1.0) -> None:
+        """Display the chart in a window, refreshed every *interval* seconds."""
+        fig: "Figure" = plt.figure()  # a window needs a figure managed by pyplot
+        self._draw(fig)
+        timer: Any = fig.canvas.new_timer(interval=int(interval * 1000))
+        timer.add_callback(self._tick)
+        timer.start()
+        plt.show()
+
+    def _tick(self) -> None:
+        if self.refresh():
+            self.figure.canvas.draw_idle()
+
+    @property
+    def _chart_type(self) -> CHART_TYPE:
+        return self.chart["options"].get("chart_type", CHART_TYPE.LINE)
+
+    def _validate(self) -> None:
+        xvalues, yvalues = self._follower.values
+        if self._processor.reduction is not None:
+            xvalues, yvalues = self._processor.reduction.reduce(xvalues, yvalues)
+        self._processor.validate_values(xvalues, yvalues)
+        if self._chart_type not in LIVE_CHART_TYPES:
+            raise ValueError(f"A live chart cannot be a {self._chart_type.name} chart.")
+        if is_categorical(self.chart["xvalues"]):
+            raise ValueError("A live chart must have numeric x values.")
+
+    def _draw(self, fig: "Figure") -> None:
+        ax: "Axes" = fig.subplots()
+        # The backend instance of the processor keeps the chart of its first use.
+        MatplotlibBackend(self.chart)._draw(ax)
+        self._figure = fig
+        self._artists = list(ax.collections if self._scatter else ax.lines)
+
+    def _update(self, rows: int) -> None:
+        xvalues: np.ndarray = self.chart["xvalues"]
+        yvalues: np.ndarray = self.chart["yvalues"]
+        series: List[np.ndarray] = [yvalues] if yvalues.ndim == 1 else list(yvalues.T)
+        ax: "Axes" = self._artists[0].axes
+        # Without window, reduction nor decimation the points only get appended, so
+        # the limits are extended with the new ones, otherwise they are computed again.
+        grows: bool = (
+            self._follower.window is None
+            and self._processor.reduction is None
+            and not self.chart["options"].get("max_points")
+        )
+        start: int = len(xvalues) - rows if grows else 0
+        ax.ignore_existing_data_limits = start == 0
+        for artist, values in zip(self._artists, series):
+            if self._scatter:
+                artist.set_offsets(np.column_stack((xvalues, values)))
+            else:
+                artist.set_data(xvalues, values)
+            ax.update_datalim(np.column_stack((xvalues[start:], values[start:])))
+        ax.autoscale_view()
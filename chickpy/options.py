@@ -1,9 +1,32 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Callable, Dict, List, Tuple
 
 from chickpy.enums import CHART_TYPE
 
 
+def _chart_type(value: str) -> CHART_TYPE:
+    return getattr(CHART_TYPE, "_".join(value.upper().split()))
+
+
+def _size(value: str) -> Tuple[float, float]:
+    width, height = value.split(",")
+    return float(width), float(height)
+
+
+# Converters from the option tokens to their values, keyed on the token type.
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "CHART_TYPE": _chart_type,
+    "MAX_POINTS": int,
+    "OUTPUT_FORMAT": str.lower,
+    "DPI": int,
+    "SIZE": _size,
+    "BACKEND_NAME": str.lower,
+    "AGGREGATE": str.lower,
+    "HISTOGRAM": bool,
+    "BINS": int,
+}
+
+
 @dataclass
 class ChartOptions:
     _options_nodes: List[list]
@@ -13,7 +36,5 @@ class ChartOptions:
         options: dict = dict()
         for node in options_nodes:
             for token in node:
-                options[token.type.lower()] = getattr(
-                    CHART_TYPE, token.value.replace(" ", "_")
-                )
+                options[token.type.lower()] = CONVERTERS[token.type](token.value)
         return options
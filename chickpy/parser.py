@@ -1,6 +1,48 @@
+import hashlib
+import os
+import sys
+import tempfile
 from pathlib import Path
+from typing import Optional, Union
 
-from lark import Lark
+import lark
+import numpy as np
+from lark import Lark, Token, Transformer, Tree
+
+CACHE_DIR_ENV = "CHICKPY_CACHE_DIR"
+CACHE_FORMAT_VERSION = 1
+PARSER_OPTIONS: dict = {
+    "keep_all_tokens": False,
+    "start": "start",
+    "parser": "lalr",
+    "lexer": "contextual",
+}
+
+
+class ValuesTransformer(Transformer):
+    """Pack the inline lists of numbers into float64 arrays while parsing.
+
+    The lexer reads a whole list of numbers as a single NUMBER_LIST token, which is
+    converted here in one vectorized call. Other lists are left untouched.
+    """
+
+    def x_values(self, children: list) -> Tree:
+        return Tree("x_values", self._pack(children))
+
+    def y_values(self, children: list) -> Tree:
+        return Tree("y_values", self._pack(children))
+
+    def _pack(self, children: list) -> list:
+        if len(children) != 1 or not isinstance(children[0], Token):
+            return children
+        token: Token = children[0]
+        try:
+            return [np.array(token[1:-1].split(","), dtype=np.float64)]
+        except ValueError as e:
+            raise ValueError(
+                f"Invalid number in the list at line {token.line}, "
+                f"column {token.column}: {e}"
+            )
 
 
 def read_language(filename: str) -> str:
@@ -8,16 +50,88 @@ def read_language(filename: str) -> str:
     return open(filepath).read()
 
 
-def gen_parser() -> Lark:
+def cache_dir() -> Optional[Path]:
+    """Return the directory holding the compiled grammar, None if caching is off.
+
+    The location can be configured through the ``CHICKPY_CACHE_DIR`` environment
+    variable, an empty value disables the cache. Default is ``$XDG_CACHE_HOME/chickpy``
+    falling back to ``~/.cache/chickpy``.
+    """
+    configured: Optional[str] = os.environ.get(CACHE_DIR_ENV)
+    if configured is not None:
+        return Path(configured).expanduser() if configured else None
+    xdg_cache: str = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(xdg_cache) / "chickpy"
+
+
+def cache_file(lang_def: str, directory: Path) -> Path:
+    """Return the cache file path for the given grammar.
+
+    The name is keyed on the grammar content, the parser options, the lark version
+    and the python version, so any change to one of them points to a new file.
+    """
+    key: str = (
+        lang_def + repr(sorted(PARSER_OPTIONS.items())) + ValuesTransformer.__qualname__
+    )
+    digest: str = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    python_version: str = "%d%d" % sys.version_info[:2]
+    return directory / (
+        f"language-v{CACHE_FORMAT_VERSION}-{digest}"
+        f"-lark{lark.__version__}-py{python_version}.cache"
+    )
+
+
+def _load_cached(path: Path) -> Optional[Lark]:
+    try:
+        with open(path, "rb") as f:
+            return Lark.load(f)
+    except Exception:
+        # Missing, truncated or incompatible cache: rebuild it from the grammar.
+        return None
+
+
+def _save_cached(lang_parser: Lark, path: Path) -> None:
+    """Atomically write the compiled parser, ignoring any filesystem failure."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                lang_parser.save(f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError:
+        pass
+
+
+def gen_parser(cache: Union[bool, str, Path] = True) -> Lark:
+    """Return the chickpy language parser.
+
+    Building the LALR tables is the most expensive part of the import, so the
+    compiled parser is stored on disk and reused by the following processes. Pass
+    ``cache=False`` to always build from the grammar, or a directory to override the
+    default cache location.
+    """
     lang_def: str = read_language("language.lark")
+    directory: Optional[Path] = (
+        cache_dir() if cache is True else Path(cache) if cache else None
+    )
+    path: Optional[Path] = cache_file(lang_def, directory) if directory else None
+
+    if path is not None:
+        cached: Optional[Lark] = _load_cached(path)
+        if cached is not None:
+            return cached
+
+    # The transformer is saved in the cache along with the parser tables.
     lang_parser: Lark = Lark(
-        lang_def,
-        keep_all_tokens=False,
-        start="start",
-        parser="lalr",
-        lexer="contextual",
+        lang_def, transformer=ValuesTransformer(), **PARSER_OPTIONS
     )
 
+    if path is not None:
+        _save_cached(lang_parser, path)
     return lang_parser
 
 
@@ -1,13 +1,29 @@
+import threading
 from functools import cached_property as lazy_property
-from typing import Any, List, Type, Union
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Tuple, Type, Union
 
+import numpy as np
 from lark import Token, Tree
 
-from chickpy.backend import Figure, MatplotlibBackend
-from chickpy.datasource import DataSource
+from chickpy import profiling
+from chickpy.aggregation import Reduction, reduction
+from chickpy.backend import (
+    Backend,
+    Output,
+    backend_name,
+    default_backend,
+    get_backend,
+)
+from chickpy.cache import LRUCache, RenderCache, render_cache, tree_digest
+from chickpy.datasource import DataSource, is_categorical
+from chickpy.decimation import decimate
 from chickpy.enums import CHART_TYPE
 from chickpy.options import ChartOptions
 from chickpy.parser import parser
+from chickpy.profiling import Profile
+
+if TYPE_CHECKING:  # pragma: no cover
+    from matplotlib.figure import Figure  # type: ignore
 
 
 class Command:
@@ -21,9 +37,37 @@ class Command:
 
     Methods
     -------
-    run(script: str, show_output: bool = True)
+    run(script: str, show_output: bool = True, profile: bool = False)
         Parse validate and run the given script. If show_output is False the output will
-        be hidden. Default is True.
+        be hidden and the figure of the chart returned instead, None for backends not
+        building figures. Default is True. With profile=True the time spent in each
+        stage is returned as a `chickpy.profiling.Profile`.
+    run_script(script: str, show_output: bool = True, profile: bool = False)
+        Parse the given script once then validate and run all its commands in order.
+        If show_output is False the list of their figures is returned.
+    render_all(script: str)
+        Lazily yield a figure for each command of the script, a command is processed
+        only when its figure is requested.
+    validate(script: str)
+        Parse and validate all the commands of the given script without rendering them.
+        The plotting backend is not imported.
+    image(script: str, fmt: Optional[str] = None, cache: ... = render_cache)
+        Return the chart of the script encoded as image bytes, in the script
+        ``OUTPUT`` format by default, else the backend's. Images are cached by parse
+        tree, backend, format and data files state, pass cache=None to disable.
+    export(script: str, output: Output, fmt: Optional[str] = None, ...)
+        Write the chart of the script as PNG, SVG or PDF into a binary file object,
+        a file descriptor or a path. Format, DPI and size default to the script
+        ``OUTPUT`` and ``SIZE`` options.
+    arender(script: str, fmt: Optional[str] = None)
+        Coroutine returning the image bytes like `image`, without blocking the event
+        loop. See `chickpy.aio.AsyncRenderer` to tune concurrency.
+
+    Parsed and validated scripts are kept in `script_cache` by script text and default
+    backend, its size can be changed with ``script_cache.maxsize = n``. A cached script
+    is validated again when one of its data files changes. Only the first chart of a
+    script keeps its values there, `run_script`, `render_all` and `validate` process
+    the commands again without keeping them.
 
     Usage
     -----
@@ -35,48 +79,240 @@ class Command:
         self._script = script
 
     @classmethod
-    def run(cls, script: str, show_output: bool = True) -> None:
-        tree: Tree = parser.parse(script)
-        processor: _CreateChartProcessor = _CommandProcessor.factory(tree)
-        processor.validate()
-        processor.backend.render(show_output)
+    def run(
+        cls, script: str, show_output: bool = True, profile: bool = False
+    ) -> Union[Profile, "Figure", None]:
+        if profile:
+            with profiling.profile() as stats:
+                cls.run(script, show_output)
+            return stats
+        return _render(0, cls._parsed(script).processor(0), "render", show_output)
+
+    @classmethod
+    def render(cls, script: str) -> "Figure":
+        return _render(0, cls._parsed(script).processor(0), "figure")
+
+    @classmethod
+    def image(
+        cls,
+        script: str,
+        fmt: Optional[str] = None,
+        cache: Optional[RenderCache] = render_cache,
+    ) -> bytes:
+        parsed: _ParsedScript = cls._parsed(script)
+        if cache is None:
+            return _render(0, parsed.processor(0), "image", fmt)
+
+        processor: _CreateChartProcessor = parsed.processor(0, validate=False)
+        key: str = processor.cache_key(processor.output_format(fmt), cache.content_hash)
+        data: Optional[bytes] = cache.get(key)
+        if data is None:
+            data = _render(0, parsed.processor(0), "image", fmt)
+            cache.put(key, data)
+        return data
+
+    @classmethod
+    def export(
+        cls,
+        script: str,
+        output: Output,
+        fmt: Optional[str] = None,
+        dpi: Optional[int] = None,
+        size: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        processor: _CreateChartProcessor = cls._parsed(script).processor(0)
+        _render(0, processor, "export", output, fmt, dpi, size)
+
+    @classmethod
+    async def arender(cls, script: str, fmt: Optional[str] = None) -> bytes:
+        from chickpy.aio import renderer
+
+        return await renderer.image(script, fmt)
+
+    @classmethod
+    def run_script(
+        cls, script: str, show_output: bool = True, profile: bool = False
+    ) -> Union[Profile, List[Optional["Figure"]], None]:
+        if profile:
+            with profiling.profile() as stats:
+                cls.run_script(script, show_output)
+            return stats
+        figures: List[Optional["Figure"]] = [
+            _render(index, processor, "render", show_output)
+            for index, processor in enumerate(cls._processors(script))
+        ]
+        return None if show_output else figures
+
+    @classmethod
+    def render_all(cls, script: str) -> Iterator["Figure"]:
+        for index, processor in enumerate(cls._processors(script)):
+            yield _render(index, processor, "figure")
+
+    @classmethod
+    def validate(cls, script: str) -> None:
+        for _ in cls._processors(script):
+            pass
+
+    @classmethod
+    def _processors(cls, script: str) -> Iterator["_CreateChartProcessor"]:
+        """Yield the validated processor of each command of the script.
+
+        They are not kept in the script cache, so the values of a chart are freed
+        once the caller moves on to the next one.
+        """
+        yield from cls._parsed(script).commands()
 
     @classmethod
-    def render(cls, script: str) -> Figure:
-        tree: Tree = parser.parse(script)
-        processor: _CreateChartProcessor = _CommandProcessor.factory(tree)
-        processor.validate()
-        return processor.backend.figure()
+    def _parsed(cls, script: str) -> "_ParsedScript":
+        """The parsed script from the cache, parsed and stored on a miss."""
+        # The processors are bound to the default backend of the time they're built.
+        key: Tuple[str, str] = (script, default_backend())
+        parsed: Optional[_ParsedScript] = script_cache.get(key)
+        fresh: bool = False
+        if parsed is not None:  # the parse and validate stages are skipped
+            with profiling.stage("cache") as stage:
+                fresh = parsed.is_fresh()
+                stage.points = int(fresh)
+        if parsed is None or not fresh:
+            if parsed is not None:
+                tree: Tree = parsed.tree
+            else:
+                with profiling.stage("parse") as stage:
+                    tree = parser.parse(script)
+                    stage.bytes_read = len(script)
+            parsed = _ParsedScript(tree)
+            script_cache.put(key, parsed)
+        return parsed
+
+
+class _ParsedScript:
+    """A parse tree with the processors of its commands, validated on first use.
+
+    The data files fingerprints are taken at parse time, so the processors can be
+    thrown away once a file they read has changed. Only the processors of the
+    single chart entry points are kept, with their values, the commands of a whole
+    script are processed by new processors, see `commands`.
+    """
+
+    def __init__(self, tree: Tree):
+        self.tree = tree
+        self._data_sources: List[Tree] = list(tree.find_data("data_source"))
+        self._fingerprints: List[str] = self._data_fingerprints()
+        self._processors: List[_CreateChartProcessor] = list(
+            _CommandProcessor.processors(tree)
+        )
+        self._validated: List[bool] = [False] * len(self._processors)
+        self._lock = threading.Lock()
+
+    def processor(self, index: int, validate: bool = True) -> "_CreateChartProcessor":
+        processor: _CreateChartProcessor = self._processors[index]
+        if validate:
+            with self._lock:
+                if not self._validated[index]:
+                    with profiling.command(index):
+                        processor.validate()
+                    self._validated[index] = True
+        return processor
+
+    def commands(self) -> Iterator["_CreateChartProcessor"]:
+        """Yield a new validated processor per command, which the cache doesn't keep."""
+        for index, processor in enumerate(_CommandProcessor.processors(self.tree)):
+            with profiling.command(index):
+                processor.validate()
+            yield processor
+
+    def is_fresh(self) -> bool:
+        return self._data_fingerprints() == self._fingerprints
+
+    def _data_fingerprints(self) -> List[str]:
+        return [DataSource.fingerprint(node) for node in self._data_sources]
 
 
 class _CreateChartProcessor:
     """Processes the Tree node from the script corresponding to create_chart."""
 
-    _chart: dict = {}
-
-    def __init__(self, tree: Tree, backend: Type[MatplotlibBackend]):
+    def __init__(self, tree: Tree, backend: Union[str, Type[Backend]]):
         self._tree = tree
         self._backend = backend
+        self._chart: dict = {}
+
+    @lazy_property
+    def backend(self) -> Backend:
+        """The backend instance, a backend given by name is imported only here.
+
+        The ``BACKEND`` option of the script takes precedence over the given one.
+        """
+        return self._backend_class(self._chart.get("options", {}))(
+            self._chart  # type: ignore
+        )
+
+    def output_format(self, fmt: Optional[str] = None) -> str:
+        """*fmt*, else the ``OUTPUT`` option, else the default format of the backend.
+
+        It doesn't need the chart to be validated.
+        """
+        if fmt:
+            return fmt.lower()
+        options: dict = ChartOptions.values(
+            self._pick_nodes("chart_options", self._tree.children)
+        )
+        return options.get("output_format", self._backend_class(options).default_format)
+
+    def _backend_class(self, options: dict) -> Type[Backend]:
+        backend: Union[str, Type[Backend]] = options.get("backend_name", self._backend)
+        return get_backend(backend) if isinstance(backend, str) else backend
 
     @lazy_property
-    def backend(self) -> MatplotlibBackend:
-        return self._backend(self._chart)
+    def reduction(self) -> Optional[Reduction]:
+        """The ``AGGREGATE`` or ``HISTOGRAM`` reduction, applied while loading."""
+        return reduction(
+            ChartOptions.values(self._pick_nodes("chart_options", self._tree.children))
+        )
 
     def validate(self) -> None:
+        self.validate_values(*DataSource.values(self._tree.children[1], self.reduction))
+
+    def validate_values(self, xvalues: np.ndarray, yvalues: np.ndarray) -> None:
+        """Validate the chart with the given values instead of its data source's.
+
+        The values must be reduced already when the chart has a `reduction`.
+        """
         label: Token = self._pick_node("label", self._tree.children)[0]
         data_source_tree: Union[str, Tree] = self._tree.children[1]
         chart_options_nodes: List = self._pick_nodes(
             "chart_options", self._tree.children
         )
-        xvalues, yvalues = DataSource.values(data_source_tree)
-        options: dict = ChartOptions.values(chart_options_nodes)
-        self._validate(xvalues, options)
-        self._chart = {
+        with profiling.stage("options"):
+            options: dict = ChartOptions.values(chart_options_nodes)
+        with profiling.stage("validate") as stage:
+            if "backend_name" in options:  # chosen by the script, imported when used
+                backend_name(options["backend_name"])
+            self._validate(xvalues, yvalues, options)
+            xvalues, yvalues = self._decimate(xvalues, yvalues, options)
+            stage.points = len(yvalues)
+        chart: dict = {
             "label": label.value,
             "xvalues": xvalues,
             "yvalues": yvalues,
             "options": options,
         }
+        series: List[str] = DataSource.series(data_source_tree)
+        if series:  # names of the y columns, one per column of a 2-D yvalues
+            chart["series"] = series
+        self._chart = chart
+
+    def cache_key(self, fmt: str, content_hash: bool = False) -> str:
+        """Content key of the rendered chart, changing when a data file changes.
+
+        Data files are identified by a hash of their content with *content_hash*.
+        """
+        backend: str = getattr(self._backend, "__qualname__", str(self._backend))
+        data_sources: List[str] = [
+            DataSource.fingerprint(node, content_hash)
+            for node in self._tree.children
+            if isinstance(node, Tree) and node.data == "data_source"
+        ]
+        return tree_digest(self._tree, backend, fmt, *data_sources)
 
     def _pick_nodes(self, node_type: str, nodes: list) -> List:
         """In a list of nodes, return all nodes matching the type."""
@@ -95,14 +331,28 @@ class _CreateChartProcessor:
         ]
         return matches[0].children if matches else [Token("", "")]  # type: ignore
 
-    def _validate(self, xvalues: List[Union[str, float]], options: dict) -> None:
+    def _decimate(
+        self, xvalues: np.ndarray, yvalues: np.ndarray, options: dict
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Reduce the series to MAXPOINTS points before it reaches the backend."""
+        max_points: Optional[int] = options.get("max_points")
+        if max_points is None:
+            return xvalues, yvalues
+        chart_type: CHART_TYPE = options.get("chart_type", CHART_TYPE.LINE)
+        return decimate(xvalues, yvalues, chart_type, max_points)
+
+    def _validate(
+        self, xvalues: np.ndarray, yvalues: np.ndarray, options: dict
+    ) -> None:
         chart_type: CHART_TYPE = options.get("chart_type", CHART_TYPE.LINE)
-        if chart_type in CHART_TYPE.BARS() and all(
-            isinstance(x, float) for x in xvalues
-        ):
+        if chart_type in CHART_TYPE.BARS() and not is_categorical(xvalues):
             raise ValueError(
                 f"{chart_type.name.replace('_', ' ')} cannot have numeric x values."
             )
+        if chart_type in CHART_TYPE.BARS() and yvalues.ndim > 1:
+            raise ValueError(
+                f"{chart_type.name.replace('_', ' ')} cannot have several y series."
+            )
 
 
 class _CommandProcessor:
@@ -113,12 +363,22 @@ class _CommandProcessor:
     def factory(cls, tree: Tree) -> _CreateChartProcessor:
         return cls(tree)._factory()
 
+    @classmethod
+    def processors(cls, tree: Tree) -> Iterator[_CreateChartProcessor]:
+        """Yield a processor for each command of the tree, in script order."""
+        command_processor: _CommandProcessor = cls(tree)
+        for node in tree.children:
+            yield command_processor._processor(node)
+
     def _factory(self) -> _CreateChartProcessor:
-        command_node: Tree = self._command_node(self._tree.children[0])
+        return self._processor(self._tree.children[0])
+
+    def _processor(self, node: Any) -> _CreateChartProcessor:
+        command_node: Tree = self._command_node(node)
         command_token: Any = command_node.data
-        backend: Type[MatplotlibBackend] = MatplotlibBackend
+        backend: str = default_backend()
         ChartProcessorCls: Type[_CreateChartProcessor] = PROCESSORS.get(
-            command_token.value, _CreateChartProcessor
+            str(command_token), _CreateChartProcessor
         )
         return ChartProcessorCls(command_node, backend)
 
@@ -129,4 +389,21 @@ class _CommandProcessor:
         raise TypeError("Node type mismatch")
 
 
+def _render(
+    index: int, processor: _CreateChartProcessor, method: str, *args: Any
+) -> Any:
+    """Call the backend method of the validated processor, in a render stage."""
+    if method == "figure" and not processor.backend.builds_figures():
+        raise ValueError(
+            f"{type(processor.backend).__name__} cannot build figures, use "
+            "Command.image or Command.export."
+        )
+    with profiling.command(index), profiling.stage("render") as stage:
+        stage.points = len(processor._chart["yvalues"])
+        return getattr(processor.backend, method)(*args)
+
+
 PROCESSORS = {"create_chart": _CreateChartProcessor}
+
+# Parsed and validated scripts by script text, shared by all the commands.
+script_cache: LRUCache = LRUCache(maxsize=128)
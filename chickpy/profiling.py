@@ -0,0 +1,160 @@
+"""Per stage timing of the commands: parse, load, options, validate and render.
+
+A script found in `chickpy.processor.script_cache` is not parsed again: a ``cache``
+stage, with 1 point when its data files are unchanged, is measured instead of the
+parse stage. The single chart calls then skip the load, options and validate stages
+too, unless a data file changed.
+
+Stages are only measured while a hook is registered with `add_hook` or a `profile`
+block is open in the current thread, otherwise `stage` returns a shared no-op
+context and costs a single check.
+
+Usage
+-----
+>>> from chickpy import profiling
+>>> with profiling.profile() as stats:
+...     Command.render(script)
+>>> print(stats.format())
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class StageStats:
+    """Measures of one stage of one command, *command* is None for the script."""
+
+    stage: str
+    command: Optional[int] = None
+    wall: float = 0.0  # seconds
+    cpu: float = 0.0  # seconds of the current thread
+    bytes_read: int = 0
+    points: int = 0
+
+    enabled = True
+
+
+@dataclass
+class Profile:
+    """Stage measures collected by a `profile` block, in order."""
+
+    stages: List[StageStats] = field(default_factory=list)
+
+    def totals(self) -> Dict[str, StageStats]:
+        """Measures summed by stage name, for all the commands."""
+        totals: Dict[str, StageStats] = {}
+        for stats in self.stages:
+            total: StageStats = totals.setdefault(stats.stage, StageStats(stats.stage))
+            total.wall += stats.wall
+            total.cpu += stats.cpu
+            total.bytes_read += stats.bytes_read
+            total.points += stats.points
+        return totals
+
+    def format(self) -> str:
+        """A table with a line per command and stage, and the totals."""
+        lines: List[str] = [
+            f"{'command':>8} {'stage':<9}{'wall ms':>10}{'cpu ms':>10}"
+            f"{'bytes':>12}{'points':>10}"
+        ]
+        rows: List[Any] = [(stats.command, stats) for stats in self.stages]
+        rows += [("total", stats) for stats in self.totals().values()]
+        for command, stats in rows:
+            lines.append(
+                f"{'-' if command is None else command:>8} {stats.stage:<9}"
+                f"{stats.wall * 1000:>10.3f}{stats.cpu * 1000:>10.3f}"
+                f"{stats.bytes_read:>12}{stats.points:>10}"
+            )
+        return "\n".join(lines)
+
+
+_hooks: List[Callable[[StageStats], None]] = []
+_local = threading.local()
+
+
+def add_hook(hook: Callable[[StageStats], None]) -> None:
+    """Call *hook* with the measures of every stage, from every thread."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[StageStats], None]) -> None:
+    _hooks.remove(hook)
+
+
+def enabled() -> bool:
+    return bool(_hooks) or bool(getattr(_local, "profiles", None))
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """Collect the stages run by the current thread inside the block."""
+    stats = Profile()
+    profiles: List[Profile] = _local.__dict__.setdefault("profiles", [])
+    profiles.append(stats)
+    try:
+        yield stats
+    finally:
+        del profiles[next(n for n, item in enumerate(profiles) if item is stats)]
+
+
+class _Stage:
+    def __init__(self, name: str):
+        self.stats = StageStats(name, getattr(_local, "command", None))
+
+    def __enter__(self) -> StageStats:
+        self._wall: float = time.perf_counter()
+        self._cpu: float = time.thread_time()
+        return self.stats
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stats.wall = time.perf_counter() - self._wall
+        self.stats.cpu = time.thread_time() - self._cpu
+        for hook in _hooks:
+            hook(self.stats)
+        for stats in getattr(_local, "profiles", ()):
+            stats.stages.append(self.stats)
+
+
+class _NullStage:
+    """Stands for the stage measures when profiling is off, ignoring them."""
+
+    enabled = False
+    bytes_read = points = 0
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str) -> Any:
+    """Context measuring the stage, yielding its `StageStats` to fill counters in.
+
+    Check ``enabled`` on the yielded object before computing costly counters.
+    """
+    return _Stage(name) if enabled() else _NULL_STAGE
+
+
+class _Command:
+    def __init__(self, index: int):
+        self.index = index
+
+    def __enter__(self) -> None:
+        self._previous: Optional[int] = getattr(_local, "command", None)
+        _local.command = self.index
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _local.command = self._previous
+
+
+def command(index: int) -> Any:
+    """Context attributing the stages run inside to the command at *index*."""
+    return _Command(index) if enabled() else _NULL_STAGE
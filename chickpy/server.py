@@ -0,0 +1,218 @@
+"""Long-lived render server keeping warm worker processes, and its thin client.
+
+The server listens on a local Unix socket. Worker processes import the parser and
+matplotlib, and render a first chart, before the first request comes in, so a
+request only costs the rendering itself.
+
+Every message is a frame: a 4 bytes big-endian length followed by the payload. A
+request is a JSON object ``{"script": ..., "format": "png"}``, without format the
+script ``OUTPUT`` option or the backend default format is used. The response starts
+with a status byte, ``0`` followed by the image bytes or ``1`` followed by the error
+message.
+
+Usage:
+    python -m chickpy.server serve [--socket PATH] [--workers 4]
+    python -m chickpy.server send [--socket PATH] [--format svg] [-o FILE] SCRIPT
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+from chickpy.backend import FORMATS
+
+SOCKET_ENV = "CHICKPY_SOCKET"
+_HEADER = struct.Struct(">I")
+_OK, _ERROR = b"\0", b"\1"
+_WARMUP_SCRIPT = """CREATE CHART "warmup" VALUES [1,2,3] [1,2,3] TYPE LINE;"""
+
+
+class ServerError(Exception):
+    """A script the server failed to render."""
+
+
+def default_socket() -> Path:
+    """``$CHICKPY_SOCKET``, else a per-user socket in the runtime or temp directory."""
+    configured: Optional[str] = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    runtime_dir: str = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime_dir) / f"chickpy-{os.getuid()}.sock"
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Optional[bytes]:
+    """The next frame payload, None when the peer closed the connection."""
+    header: Optional[bytes] = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload: Optional[bytes] = _recv_exactly(sock, _HEADER.unpack(header)[0])
+    if payload is None:
+        raise ConnectionError("Connection closed in the middle of a frame.")
+    return payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk: bytes = sock.recv(min(size - len(buffer), 1 << 20))
+        if not chunk:
+            return None
+        buffer += chunk
+    return bytes(buffer)
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server handing the scripts to a pool of warm worker processes.
+
+    Connections are served by threads, each one can send several requests in a row.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Union[str, Path], workers: Optional[int] = None):
+        self.path = Path(path)
+        _remove_stale_socket(self.path)
+        self.workers: int = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+        # Start and warm every worker now rather than on the first requests.
+        for future in [self.executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        super().__init__(str(self.path), _RequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        if self.path.exists():
+            self.path.unlink()
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """Remove the socket left by a server no longer running.
+
+    Raise FileExistsError when *path* is not a socket or a server still listens on it.
+    """
+    try:
+        mode: int = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket.")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except ConnectionRefusedError:  # nobody listens on it
+            path.unlink()
+            return
+    raise FileExistsError(f"A server is already listening on {path}.")
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    server: RenderServer
+
+    def handle(self) -> None:
+        while True:
+            request: Optional[bytes] = recv_frame(self.request)
+            if request is None:
+                return
+            try:
+                message: dict = json.loads(request)
+                data: bytes = self.server.executor.submit(
+                    _render, message["script"], message.get("format")
+                ).result()
+            except Exception as e:
+                error: str = str(e) if isinstance(e, ServerError) else _error(e)
+                send_frame(self.request, _ERROR + error.encode("utf-8"))
+            else:
+                send_frame(self.request, _OK + data)
+
+
+def _init_worker() -> None:
+    import matplotlib  # type: ignore
+
+    matplotlib.use("Agg")
+    from chickpy.processor import Command
+
+    Command.image(_WARMUP_SCRIPT, cache=None)
+
+
+def _render(script: str, fmt: Optional[str]) -> bytes:
+    from chickpy.processor import Command
+
+    try:
+        return Command.image(script, fmt)
+    except Exception as e:
+        # Parse errors hold the parser, which can't be sent back to the server.
+        raise ServerError(_error(e)) from None
+
+
+def _error(exception: Exception) -> str:
+    return f"{type(exception).__name__}: {exception}"
+
+
+def send(
+    script: str, fmt: Optional[str] = None, path: Optional[Union[str, Path]] = None
+) -> bytes:
+    """Render the script on the server listening at *path* and return the image."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path or default_socket()))
+        send_frame(sock, json.dumps({"script": script, "format": fmt}).encode())
+        response: Optional[bytes] = recv_frame(sock)
+    if response is None:
+        raise ConnectionError("The server closed the connection.")
+    if response[:1] != _OK:
+        raise ServerError(response[1:].decode("utf-8"))
+    return response[1:]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="chickpy render server.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="start the server")
+    serve_parser.add_argument("--socket", type=Path, default=None)
+    serve_parser.add_argument("--workers", type=int, default=None)
+    send_parser = commands.add_parser("send", help="render a script on the server")
+    send_parser.add_argument("script", help="script text, or path to a script file")
+    send_parser.add_argument("--socket", type=Path, default=None)
+    send_parser.add_argument("--format", choices=FORMATS, default=None)
+    send_parser.add_argument("-o", "--output", type=Path, default=None)
+    args = arg_parser.parse_args()
+
+    path: Path = args.socket or default_socket()
+    if args.command == "serve":
+        with RenderServer(path, args.workers) as server:
+            print(f"Serving on {path}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return
+
+    script: str = args.script
+    if os.path.isfile(script):
+        script = Path(script).read_text()
+    try:
+        data: bytes = send(script, args.format, path)
+    except ServerError as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+    if args.output is None:
+        sys.stdout.buffer.write(data)
+    else:
+        args.output.write_bytes(data)
+
+
+if __name__ == "__main__":
+    main()
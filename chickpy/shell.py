@@ -1,14 +1,23 @@
+import argparse
 from cmd import Cmd
 
 from chickpy.processor import Command
 
 
 class ChickPrompt(Cmd):
-    """Activate a shell usinng: python -m chickpy.shell"""
+    """Activate a shell usinng: python -m chickpy.shell
+
+    With ``--profile`` the time spent in each stage of the scripts is printed after
+    they run.
+    """
 
     prompt = "chickpy> "
     intro = "Welcome to chickpy shell! Type ? to list commands"
 
+    def __init__(self, profile: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.profile = profile
+
     def onecmd(self, line):
         try:
             return super().onecmd(line)
@@ -33,11 +42,22 @@ class ChickPrompt(Cmd):
         print("Run a script")
 
     def do_run(self, script):
-        Command.run(script)
+        stats = Command.run_script(script, profile=self.profile)
+        if stats is not None:
+            print(stats.format())
 
     do_EOF = do_exit
     help_EOF = help_exit
 
 
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="chickpy shell.")
+    arg_parser.add_argument(
+        "--profile", action="store_true", help="print the time spent in each stage"
+    )
+    args = arg_parser.parse_args()
+    ChickPrompt(profile=args.profile).cmdloop()
+
+
 if __name__ == "__main__":
-    ChickPrompt().cmdloop()
+    main()
@@ -0,0 +1,405 @@
+"""Native SVG backend drawing simple charts without matplotlib.
+
+The layout follows the matplotlib defaults (figure size, axes position, colors,
+fonts, margins and tick placement), so the output looks like `MatplotlibBackend`
+SVG files for the four chart types. The document is streamed to the output, the
+coordinates being converted by numpy in chunks. Like matplotlib path simplification,
+long lines only keep the extremes of each fraction of point, and overlapping scatter
+markers are drawn once.
+"""
+
+import atexit
+import html
+import math
+import os
+import tempfile
+import webbrowser
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, ClassVar, List, Optional, Tuple
+
+import numpy as np
+
+from chickpy.backend import Backend, Output, _binary_file
+from chickpy.datasource import is_categorical
+from chickpy.decimation import minmax_indexes
+from chickpy.enums import CHART_TYPE
+
+FIGURE_SIZE = (6.4, 4.8)  # inches, as matplotlib
+AXES_BOX = (0.125, 0.11, 0.9, 0.88)  # left, bottom, right, top in figure fraction
+MARGIN = 0.05  # of the data range, added on both sides
+# The matplotlib color cycle, a color per series.
+COLORS = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+)
+COLOR = COLORS[0]
+FONT = "font-family:DejaVu Sans, Bitstream Vera Sans, Arial, sans-serif"
+TICK_SIZE = 3.5
+CHUNK = 65536  # numbers formatted per write
+SCALE = 100  # data coordinates are written as integers in 1/SCALE points
+LINE_RESOLUTION = 8  # line points kept per point of axes width, at most
+
+Range = Tuple[float, float]
+
+
+@dataclass
+class SvgBackend(Backend):
+    _chart: dict
+    default_format: ClassVar[str] = "svg"
+
+    def render(self, show: bool = True) -> None:
+        """Open the chart in the web browser when *show* is True, else do nothing.
+
+        The chart is written to a temporary SVG file, removed when the interpreter
+        exits since the browser reads it in the background.
+        """
+        if not show:
+            return
+        with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as f:
+            self.export(f, "svg")
+        atexit.register(_remove, f.name)
+        webbrowser.open(Path(f.name).as_uri())
+
+    def export(
+        self,
+        output: Output,
+        fmt: Optional[str] = None,
+        dpi: Optional[int] = None,
+        size: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        fmt, dpi, size = self._output_options(fmt, dpi, size)
+        if fmt != "svg":
+            raise ValueError(f"The svg backend cannot write {fmt} images.")
+        with _binary_file(output) as f:
+            _SvgWriter(f, self._chart, size or FIGURE_SIZE, self._series()).write()
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class _SvgWriter:
+    """Writes one chart, in points (1/72 inch) like matplotlib SVG files."""
+
+    def __init__(
+        self,
+        f: IO[bytes],
+        chart: dict,
+        size: Tuple[float, float],
+        series: List[Tuple[np.ndarray, Optional[str]]],
+    ):
+        self._f = f
+        self._label: str = chart["label"][1:-1]
+        self._chart_type: CHART_TYPE = chart.get("options", {}).get(
+            "chart_type", CHART_TYPE.LINE
+        )
+        self.width, self.height = size[0] * 72, size[1] * 72
+        left, bottom, right, top = AXES_BOX
+        self._box = (
+            left * self.width,
+            (1 - top) * self.height,
+            right * self.width,
+            (1 - bottom) * self.height,
+        )
+        xvalues: np.ndarray = np.asarray(chart["xvalues"])
+        self._yvalues: np.ndarray = np.asarray(chart["yvalues"], dtype=np.float64)
+        self._series: List[Tuple[np.ndarray, Optional[str]]] = [
+            (np.asarray(values, dtype=np.float64), name) for values, name in series
+        ]
+        self._categories: List[str] = []
+        if is_categorical(xvalues):
+            # Categories are placed at 0, 1, ... in order of first appearance.
+            names, first, inverse = np.unique(
+                xvalues, return_index=True, return_inverse=True
+            )
+            order: np.ndarray = np.argsort(first)
+            self._categories = [str(name) for name in names[order]]
+            rank: np.ndarray = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            self._xvalues: np.ndarray = rank[inverse].astype(np.float64)
+        else:
+            self._xvalues = xvalues.astype(np.float64)
+
+    def write(self) -> None:
+        horizontal: bool = self._chart_type == CHART_TYPE.HORIZONTAL_BAR
+        positions, heights = self._xvalues, self._yvalues
+        if self._chart_type in CHART_TYPE.BARS():
+            position_range: Range = _bar_range(positions)
+            height_range: Range = _sticky_range(heights)
+        else:
+            position_range, height_range = _range(positions), _range(heights)
+        if horizontal:
+            self._xrange, self._yrange = height_range, position_range
+        else:
+            self._xrange, self._yrange = position_range, height_range
+
+        self._write(
+            '<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+            f'<svg xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{self.width:g}pt" height="{self.height:g}pt" '
+            f'viewBox="0 0 {self.width:g} {self.height:g}" '
+            'xmlns="http://www.w3.org/2000/svg" version="1.1">\n'
+            f'<rect width="{self.width:g}" height="{self.height:g}" fill="#ffffff"/>\n'
+        )
+        if self._chart_type == CHART_TYPE.LINE:
+            self._write_line()
+        elif self._chart_type == CHART_TYPE.SCATTER:
+            self._write_scatter()
+        else:
+            self._write_bars(horizontal)
+        self._write_axes(horizontal)
+        if len(self._series) > 1:
+            self._write_legend()
+        self._write_title()
+        self._write("</svg>\n")
+
+    def _write(self, text: str) -> None:
+        self._f.write(text.encode("utf-8"))
+
+    def _points(self, xvalues: np.ndarray, yvalues: np.ndarray) -> np.ndarray:
+        """Data coordinates converted to SVG coordinates, as a (n, 2) array."""
+        left, top, right, bottom = self._box
+        (xlow, xhigh), (ylow, yhigh) = self._xrange, self._yrange
+        return np.column_stack(
+            (
+                left + (xvalues - xlow) * ((right - left) / (xhigh - xlow)),
+                bottom - (yvalues - ylow) * ((bottom - top) / (yhigh - ylow)),
+            )
+        )
+
+    def _units(self, xvalues: np.ndarray, yvalues: np.ndarray) -> np.ndarray:
+        """SVG coordinates of the finite points, as integers in 1/SCALE points."""
+        points: np.ndarray = self._points(xvalues, yvalues)
+        return np.rint(points[np.isfinite(points).all(axis=1)] * SCALE).astype(np.int64)
+
+    def _write_numbers(self, numbers: np.ndarray) -> None:
+        """Write the integers separated by spaces, converted by numpy in chunks."""
+        flat: np.ndarray = numbers.ravel()
+        for start in range(0, len(flat), CHUNK):
+            self._write(" " if start else "")
+            self._write(" ".join(flat[start : start + CHUNK].astype(str).tolist()))
+
+    def _write_rows(self, rows: np.ndarray, template: str) -> None:
+        for start in range(0, len(rows), CHUNK):
+            chunk: list = rows[start : start + CHUNK].tolist()
+            self._write("".join([template.format(*row) for row in chunk]))
+
+    def _write_line(self) -> None:
+        self._write(self._data_start())
+        for n, (yvalues, _) in enumerate(self._series):
+            self._write_line_series(yvalues, COLORS[n % len(COLORS)])
+        self._write("</g></g>\n")
+
+    def _write_line_series(self, yvalues: np.ndarray, color: str) -> None:
+        xvalues: np.ndarray = self._xvalues
+        left, _, right, _ = self._box
+        max_points: int = int((right - left) * LINE_RESOLUTION)
+        if len(yvalues) > max_points and bool(np.all(np.diff(xvalues) >= 0)):
+            # Extremes per fraction of point, the same drawing with less points.
+            indexes: np.ndarray = minmax_indexes(yvalues, max_points)
+            xvalues, yvalues = xvalues[indexes], yvalues[indexes]
+        points: np.ndarray = self._points(xvalues, yvalues)
+        finite: np.ndarray = np.isfinite(points).all(axis=1)
+        # NaN values break the line, like matplotlib does.
+        edges: np.ndarray = np.flatnonzero(np.diff(np.r_[False, finite, False]))
+        for start, stop in zip(edges[::2], edges[1::2]):
+            units: np.ndarray = np.rint(points[start:stop] * SCALE).astype(np.int64)
+            self._write('<path d="M ')
+            self._write_numbers(units[:1])
+            if len(units) > 1:
+                self._write(" L ")
+                self._write_numbers(units[1:])
+            self._write(
+                f'" style="fill:none;stroke:{color};stroke-width:{1.5 * SCALE:g};'
+                'stroke-linecap:square"/>\n'
+            )
+
+    def _write_scatter(self) -> None:
+        radius: int = 3 * SCALE
+        self._write(self._data_start())
+        for n, (yvalues, _) in enumerate(self._series):
+            units: np.ndarray = self._units(self._xvalues, yvalues)
+            # Markers of the same color on the same half point are drawn once.
+            indexes: np.ndarray = np.unique(
+                units // (SCALE // 2), axis=0, return_index=True
+            )[1]
+            color: str = COLORS[n % len(COLORS)]
+            marker: str = f"marker{n or ''}"
+            self._write(
+                f'<defs><path id="{marker}" d="M 0 {radius} A {radius} {radius} 0 1 0 '
+                f'0 -{radius} A {radius} {radius} 0 1 0 0 {radius} z" '
+                f'style="fill:{color};stroke:{color};stroke-width:{SCALE}"/></defs>\n'
+            )
+            self._write_rows(
+                units[np.sort(indexes)],
+                f'<use xlink:href="#{marker}" x="{{}}" y="{{}}"/>\n',
+            )
+        self._write("</g></g>\n")
+
+    def _write_bars(self, horizontal: bool) -> None:
+        starts: np.ndarray = self._xvalues - 0.4
+        bases: np.ndarray = np.zeros_like(self._yvalues)
+        if horizontal:
+            low = self._points(np.minimum(bases, self._yvalues), starts + 0.8)
+            high = self._points(np.maximum(bases, self._yvalues), starts)
+        else:
+            low = self._points(starts, np.maximum(bases, self._yvalues))
+            high = self._points(starts + 0.8, np.minimum(bases, self._yvalues))
+        rects: np.ndarray = np.column_stack((low, high - low))
+        rects = np.rint(rects[np.isfinite(rects).all(axis=1)] * SCALE).astype(np.int64)
+        self._write(self._data_start())
+        self._write_rows(
+            rects,
+            '<rect x="{}" y="{}" width="{}" height="{}" fill="' + COLOR + '"/>\n',
+        )
+        self._write("</g></g>\n")
+
+    def _data_start(self) -> str:
+        """Open the groups clipping the data to the axes and scaling it down."""
+        left, top, right, bottom = self._box
+        return (
+            '<defs><clipPath id="axes"><rect '
+            f'x="{left:g}" y="{top:g}" width="{right - left:g}" '
+            f'height="{bottom - top:g}"/></clipPath></defs>\n'
+            f'<g clip-path="url(#axes)"><g transform="scale({1 / SCALE:g})">\n'
+        )
+
+    def _write_axes(self, horizontal: bool) -> None:
+        left, top, right, bottom = self._box
+        xlabels: List[Tuple[float, str]] = self._ticks(self._xrange, not horizontal)
+        ylabels: List[Tuple[float, str]] = self._ticks(self._yrange, horizontal)
+        parts: List[str] = ['<g style="stroke:#000000;stroke-width:0.8">\n']
+        texts: List[str] = [f'<g style="{FONT};font-size:10px;fill:#000000">\n']
+        for value, text in xlabels:
+            x: float = float(self._points(np.array([value]), np.array([0.0]))[0, 0])
+            parts.append(f'<path d="M {x:.3f} {bottom:g} v {TICK_SIZE}"/>\n')
+            texts.append(
+                f'<text x="{x:.3f}" y="{bottom + TICK_SIZE + 11:.3f}" '
+                f'text-anchor="middle">{html.escape(text)}</text>\n'
+            )
+        for value, text in ylabels:
+            y: float = float(self._points(np.array([0.0]), np.array([value]))[0, 1])
+            parts.append(f'<path d="M {left:g} {y:.3f} h {-TICK_SIZE}"/>\n')
+            texts.append(
+                f'<text x="{left - TICK_SIZE - 3.5:.3f}" y="{y + 3.5:.3f}" '
+                f'text-anchor="end">{html.escape(text)}</text>\n'
+            )
+        parts.append(
+            f'<rect x="{left:g}" y="{top:g}" width="{right - left:g}" '
+            f'height="{bottom - top:g}" style="fill:none;stroke-linejoin:miter"/>\n'
+            "</g>\n"
+        )
+        texts.append("</g>\n")
+        self._write("".join(parts + texts))
+
+    def _write_title(self) -> None:
+        left, top, right, _ = self._box
+        self._write(
+            f'<text x="{(left + right) / 2:.3f}" y="{top - 6:.3f}" '
+            f'style="{FONT};font-size:12px" text-anchor="middle">'
+            f"{html.escape(self._label)}</text>\n"
+        )
+
+    def _write_legend(self) -> None:
+        """A box naming the series in the upper right corner of the axes."""
+        _, top, right, _ = self._box
+        names: List[str] = [str(name) for _, name in self._series]
+        width: float = 34 + 6 * max(len(name) for name in names)
+        x, y = right - width - 7, top + 7
+        parts: List[str] = [
+            f'<g style="{FONT};font-size:10px">\n'
+            f'<rect x="{x:g}" y="{y:g}" width="{width:g}" '
+            f'height="{8 + 14 * len(names):g}" style="fill:#ffffff;opacity:0.8;'
+            'stroke:#cccccc;stroke-linejoin:miter"/>\n'
+        ]
+        for n, name in enumerate(names):
+            row: float = y + 11 + 14 * n
+            color: str = COLORS[n % len(COLORS)]
+            if self._chart_type == CHART_TYPE.SCATTER:
+                parts.append(
+                    f'<circle cx="{x + 14:g}" cy="{row:g}" r="3" fill="{color}"/>\n'
+                )
+            else:
+                parts.append(
+                    f'<path d="M {x + 4:g} {row:g} h 20" '
+                    f'style="stroke:{color};stroke-width:1.5"/>\n'
+                )
+            parts.append(
+                f'<text x="{x + 30:g}" y="{row + 3.5:g}">{html.escape(name)}</text>\n'
+            )
+        parts.append("</g>\n")
+        self._write("".join(parts))
+
+    def _ticks(self, value_range: Range, positions: bool) -> List[Tuple[float, str]]:
+        """Tick values and labels, the category names on the categorical axis."""
+        if positions and self._categories:
+            return list(enumerate(self._categories))  # type: ignore
+        values: List[float] = nice_ticks(*value_range)
+        return list(zip(values, tick_labels(values)))
+
+
+def nice_ticks(low: float, high: float, bins: int = 9) -> List[float]:
+    """Round tick values inside the range, 1, 2, 2.5 or 5 times a power of ten apart.
+
+    The step is the smallest one splitting the range in at most *bins* intervals.
+    """
+    span: float = high - low
+    if not span > 0 or not math.isfinite(span):
+        return [low]
+    raw_step: float = span / bins
+    magnitude: float = 10 ** math.floor(math.log10(raw_step))
+    step: float = next(
+        factor * magnitude
+        for factor in (1, 2, 2.5, 5, 10)
+        if factor * magnitude >= raw_step
+    )
+    first: int = math.ceil(low / step - 1e-9)
+    last: int = math.floor(high / step + 1e-9)
+    return [round(n * step, 12) for n in range(first, last + 1)]
+
+
+def tick_labels(values: List[float]) -> List[str]:
+    """Labels sharing the same number of decimals, with unicode minus signs."""
+    decimals: int = max(
+        (len(f"{value:.12g}".partition(".")[2]) for value in values), default=0
+    )
+    return [f"{value + 0.0:.{decimals}f}".replace("-", "\u2212") for value in values]
+
+
+def _range(values: np.ndarray) -> Range:
+    finite: np.ndarray = values[np.isfinite(values)]
+    if not len(finite):
+        return -MARGIN, MARGIN
+    low, high = float(finite.min()), float(finite.max())
+    if low == high:  # a single value, widened around it like matplotlib
+        expand: float = abs(low) * MARGIN or MARGIN
+        return low - expand, high + expand
+    margin: float = (high - low) * MARGIN
+    return low - margin, high + margin
+
+
+def _bar_range(positions: np.ndarray) -> Range:
+    return _range(np.concatenate((positions - 0.4, positions + 0.4)))
+
+
+def _sticky_range(heights: np.ndarray) -> Range:
+    """Bar heights range, without margin on the side of the zero baseline."""
+    finite: np.ndarray = heights[np.isfinite(heights)]
+    low: float = min(0.0, float(finite.min())) if len(finite) else 0.0
+    high: float = max(0.0, float(finite.max())) if len(finite) else 1.0
+    if low == high:
+        high = 1.0
+    margin: float = (high - low) * MARGIN or MARGIN
+    return (low - margin if low < 0 else 0.0), (high + margin if high > 0 else 0.0)
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from chickpy.aggregation import Aggregate, Histogram, factorize, reduction
+
+
+class DescribeAggregate:
+    @pytest.mark.parametrize(
+        "function, expected",
+        (
+            ("sum", [4.0, 2.0, 4.0]),
+            ("count", [2.0, 1.0, 1.0]),
+            ("mean", [2.0, 2.0, 4.0]),
+            ("min", [1.0, 2.0, 4.0]),
+            ("max", [3.0, 2.0, 4.0]),
+        ),
+    )
+    def it_reduces_each_group_of_rows(self, function, expected):
+        xvalues = np.array(["b", "a", "b", "c"])
+
+        keys, yvalues = Aggregate(function).reduce(xvalues, np.arange(1.0, 5.0))
+
+        assert keys.tolist() == ["b", "a", "c"]
+        assert yvalues.tolist() == expected
+
+    def it_sorts_numeric_keys(self):
+        keys, yvalues = Aggregate("sum").reduce(
+            np.array([3.0, 1.0, 3.0]), np.array([1.0, 2.0, 3.0])
+        )
+
+        assert (keys.tolist(), yvalues.tolist()) == ([1.0, 3.0], [2.0, 4.0])
+
+    def it_reduces_every_series(self):
+        yvalues = np.array([[1.0, 10.0], [2.0, 20.0], [3.0, 30.0]])
+
+        keys, maxima = Aggregate("max").reduce(np.array(["a", "b", "a"]), yvalues)
+
+        assert maxima.tolist() == [[3.0, 30.0], [2.0, 20.0]]
+
+    @pytest.mark.parametrize("function", ("sum", "min", "max"))
+    @pytest.mark.parametrize("ys, shape", ((["y"], (0,)), (["y", "z"], (0, 2))))
+    def but_it_returns_no_point_without_rows(self, tmp_path, function, ys, shape):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y,z\n")
+
+        keys, yvalues = Aggregate(function).reduce_csv(path, "x", ys)
+
+        assert (len(keys), yvalues.shape) == (0, shape)
+
+
+class DescribeHistogram:
+    def it_counts_the_y_values_in_bins(self):
+        labels, counts = Histogram(2).reduce(
+            np.arange(5.0), np.array([0.0, 1.0, 1.5, 4.0, np.nan])
+        )
+
+        assert labels.tolist() == ["0 to 2", "2 to 4"]
+        assert counts.tolist() == [3.0, 1.0]
+
+
+class DescribeReduction:
+    def it_reads_the_chart_options(self):
+        assert reduction({}) is None
+        assert reduction({"aggregate": "sum"}) == Aggregate("sum")
+        assert reduction({"histogram": True}) == Histogram(10)
+        assert reduction({"histogram": True, "bins": 3}) == Histogram(3)
+
+    @pytest.mark.parametrize(
+        "options, message",
+        (
+            (
+                {"aggregate": "sum", "histogram": True},
+                "AGGREGATE and HISTOGRAM cannot be used together.",
+            ),
+            ({"histogram": True, "bins": 0}, "HISTOGRAM must have at least one bin."),
+        ),
+    )
+    def but_it_raises_on_invalid_options(self, options, message):
+        with pytest.raises(ValueError) as e:
+            reduction(options)
+
+        assert str(e.value) == message
+
+
+class DescribeFactorize:
+    def it_keeps_categories_in_order_of_first_appearance(self):
+        keys, codes = factorize(np.array(["z", "a", "z", "m"]))
+
+        assert (keys.tolist(), codes.tolist()) == (["z", "a", "m"], [0, 1, 0, 2])
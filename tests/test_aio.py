@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from chickpy.aio import AsyncRenderer
+from chickpy.cache import CacheStats, RenderCache
+from chickpy.processor import Command
+
+SCRIPT = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] TYPE LINE;"""
+
+
+class DescribeAsyncRenderer:
+    def it_renders_the_same_image_as_the_sync_api(self):
+        renderer = AsyncRenderer(cache=None)
+
+        data = asyncio.run(renderer.image(SCRIPT, "png"))
+
+        assert data.startswith(b"\x89PNG")
+        assert data == Command.image(SCRIPT, "png", cache=None)
+
+    def it_uses_the_script_output_format_by_default(self):
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] OUTPUT SVG;"""
+
+        data = asyncio.run(AsyncRenderer(cache=RenderCache()).image(script))
+
+        assert data.startswith(b"<?xml")
+
+    def it_serves_concurrent_requests_from_the_cache(self):
+        cache = RenderCache()
+        renderer = AsyncRenderer(cache=cache)
+
+        async def requests():
+            await renderer.image(SCRIPT)
+            return await asyncio.gather(*(renderer.image(SCRIPT) for _ in range(5)))
+
+        images = asyncio.run(requests())
+
+        assert len(set(images)) == 1
+        assert cache.stats() == CacheStats(hits=5, misses=1, size=1, maxsize=128)
+
+    def it_shares_a_content_hash_cache_with_the_sync_api(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n1,2\n2,3\n")
+        script = f"""CREATE CHART "foo" FROM CSV "{path}";"""
+        cache = RenderCache(content_hash=True)
+
+        data = Command.image(script, cache=cache)
+
+        assert asyncio.run(AsyncRenderer(cache=cache).image(script)) is data
+        assert cache.stats() == CacheStats(hits=1, misses=1, size=1, maxsize=128)
+
+    def it_bounds_the_renders_in_flight(self, monkeypatch):
+        active, peak = [], []
+        lock = threading.Lock()
+
+        def prepare(script, fmt):
+            with lock:
+                active.append(script)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(script)
+            return "key", b"image", None
+
+        renderer = AsyncRenderer(max_concurrency=2)
+        monkeypatch.setattr(renderer, "_prepare", prepare)
+
+        async def requests():
+            return await asyncio.gather(*(renderer.image(str(n)) for n in range(6)))
+
+        assert asyncio.run(requests()) == [b"image"] * 6
+        assert max(peak) == 2
+
+    def it_drops_a_cancelled_render_waiting_for_a_slot(self, monkeypatch):
+        release = threading.Event()
+        calls = []
+
+        def prepare(script, fmt):
+            calls.append(script)
+            release.wait(5)
+            return "key", b"image", None
+
+        renderer = AsyncRenderer(max_concurrency=1)
+        monkeypatch.setattr(renderer, "_prepare", prepare)
+
+        async def requests():
+            first = asyncio.ensure_future(renderer.image("first"))
+            second = asyncio.ensure_future(renderer.image("second"))
+            await asyncio.sleep(0.01)
+            second.cancel()
+            release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await second
+            return await first
+
+        assert asyncio.run(requests()) == b"image"
+        assert calls == ["first"]
+
+    def but_it_needs_room_for_one_render(self):
+        with pytest.raises(ValueError, match="max_concurrency"):
+            AsyncRenderer(max_concurrency=0)
+
+
+class DescribeCommandArender:
+    def it_returns_the_image_bytes(self):
+        data = asyncio.run(Command.arender(SCRIPT))
+
+        assert data.startswith(b"\x89PNG")
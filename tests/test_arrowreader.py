@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from chickpy.arrowreader import read_arrow, read_parquet
+from chickpy.datasource import DataSource
+from chickpy.parser import parser
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _table(rows=10):
+    return pa.table(
+        {
+            "ts": np.arange(rows, dtype=np.int64),
+            "host": ["a", "b"] * (rows // 2),
+            "load": np.arange(rows, dtype=np.float64) * 2,
+            "temp": np.arange(rows, dtype=np.float64) + 40,
+        }
+    )
+
+
+def _write_arrow(path, table):
+    with pa.OSFile(str(path), "wb") as f:
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+
+
+class DescribeReadArrow:
+    def it_maps_the_projected_columns_without_copying(self, tmp_path):
+        path = tmp_path / "series.arrow"
+        _write_arrow(path, _table())
+        allocated = pa.total_allocated_bytes()
+
+        xvalues, yvalues = read_arrow(path, "ts", ["load"], None)
+
+        assert pa.total_allocated_bytes() == allocated
+        assert not yvalues.flags.owndata
+        assert xvalues.tolist() == list(range(10))
+        assert yvalues.tolist() == [n * 2.0 for n in range(10)]
+
+    def it_reads_labels_and_several_series_by_name_or_index(self, tmp_path):
+        path = tmp_path / "series.arrow"
+        _write_arrow(path, _table())
+
+        xvalues, yvalues = read_arrow(path, 1, ["load", 3], ("ts", 2, 3))
+
+        assert xvalues.tolist() == ["a", "b"]
+        assert yvalues.tolist() == [[4.0, 42.0], [6.0, 43.0]]
+
+    @pytest.mark.parametrize(
+        "x, ys, message",
+        (
+            ("nope", ["load"], "{} has no nope column."),
+            ("ts", [7], "Column 7 is out of range, {} has 4 columns."),
+            ("ts", ["host"], "y columns of {} must be numeric."),
+        ),
+    )
+    def but_it_raises_on_invalid_columns(self, tmp_path, x, ys, message):
+        path = tmp_path / "series.arrow"
+        _write_arrow(path, _table())
+
+        with pytest.raises(ValueError) as e:
+            read_arrow(path, x, ys, None)
+
+        assert str(e.value) == message.format(path)
+
+
+class DescribeReadParquet:
+    def it_skips_the_row_groups_outside_the_range(self, tmp_path, monkeypatch):
+        path = tmp_path / "series.parquet"
+        pq.write_table(_table(), str(path), row_group_size=3)
+        read_row_groups = pq.ParquetFile.read_row_groups
+        calls = []
+
+        def spy(self, row_groups, *args, **kwargs):
+            calls.append((list(row_groups), kwargs["columns"]))
+            return read_row_groups(self, row_groups, *args, **kwargs)
+
+        monkeypatch.setattr(pq.ParquetFile, "read_row_groups", spy)
+
+        xvalues, yvalues = read_parquet(path, None, ["load"], ("ts", 4, 7))
+
+        assert calls == [([1, 2], ["load", "ts"])]
+        assert xvalues.tolist() == [4.0, 5.0, 6.0, 7.0]
+        assert yvalues.tolist() == [8.0, 10.0, 12.0, 14.0]
+
+
+class DescribeDataSourceArrow:
+    @pytest.mark.parametrize("kind", ("ARROW", "PARQUET"))
+    def it_reads_the_x_and_y_columns_by_default(self, tmp_path, kind):
+        path = tmp_path / "series"
+        table = pa.table({"y": [3.0, 4.0], "x": [1.0, 2.0]})
+        if kind == "ARROW":
+            _write_arrow(path, table)
+        else:
+            pq.write_table(table, str(path))
+        script = f'CREATE CHART "foo" FROM {kind} "{path}" TYPE LINE;'
+        tree = next(parser.parse(script).find_data("data_source"))
+
+        xvalues, yvalues = DataSource.values(tree)
+
+        assert (xvalues.tolist(), yvalues.tolist()) == ([1.0, 2.0], [3.0, 4.0])
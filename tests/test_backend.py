@@ -0,0 +1,193 @@
+import io
+import os
+import struct
+from importlib.metadata import EntryPoint
+
+import numpy as np
+import pytest
+from mock import patch
+
+from chickpy.backend import (
+    BACKENDS,
+    Backend,
+    FigurePool,
+    MatplotlibBackend,
+    default_backend,
+    get_backend,
+    register_backend,
+    set_default_backend,
+)
+from chickpy.enums import CHART_TYPE
+
+from .util import Mock
+
+
+class DescribeBackendRegistry:
+    def it_resolves_the_default_backend(self):
+        assert get_backend() is MatplotlibBackend
+
+    def it_resolves_a_backend_registered_by_path(self, monkeypatch):
+        monkeypatch.setitem(BACKENDS, "other", "chickpy.backend:MatplotlibBackend")
+
+        assert get_backend("OTHER") is MatplotlibBackend
+
+    def it_can_register_a_backend_class(self, monkeypatch):
+        monkeypatch.setattr("chickpy.backend.BACKENDS", dict(BACKENDS))
+
+        class FooBackend(Backend):
+            def render(self, show=True):
+                pass
+
+            def figure(self):
+                pass
+
+        register_backend("Foo", FooBackend)
+
+        assert get_backend("foo") is FooBackend
+
+    def it_can_change_the_default_backend(self, monkeypatch):
+        monkeypatch.setattr("chickpy.backend._default_backend", None)
+        monkeypatch.setenv("CHICKPY_BACKEND", "svg")
+        assert default_backend() == "svg"
+
+        set_default_backend("Matplotlib")
+
+        assert get_backend() is MatplotlibBackend
+        with pytest.raises(ValueError, match="Unknown backend foo"):
+            set_default_backend("foo")
+
+    def it_discovers_the_backends_declared_as_entry_points(self, monkeypatch):
+        monkeypatch.setattr("chickpy.backend.BACKENDS", dict(BACKENDS))
+        monkeypatch.setattr("chickpy.backend._discovered", False)
+        entry_point = EntryPoint(
+            "Fast", "chickpy.backend:MatplotlibBackend", "chickpy.backends"
+        )
+        entry_points_ = Mock(return_value=[entry_point])
+        monkeypatch.setattr("chickpy.backend._entry_points", entry_points_)
+
+        assert get_backend("fast") is MatplotlibBackend
+        assert get_backend("fast") is MatplotlibBackend
+        entry_points_.assert_called_once_with("chickpy.backends")
+
+    def but_it_raises_on_unknown_backends(self):
+        with pytest.raises(ValueError) as e:
+            get_backend("foo")
+
+        assert str(e.value) == (
+            "Unknown backend foo. Available backends are matplotlib, svg"
+        )
+
+
+class DescribeMatplotlibBackendExport:
+    @pytest.mark.parametrize(
+        "fmt, magic", (("png", b"\x89PNG"), ("svg", b"<?xml"), ("pdf", b"%PDF"))
+    )
+    def it_writes_the_chart_into_a_buffer(self, fmt, magic):
+        buffer = io.BytesIO()
+
+        _backend().export(buffer, fmt)
+
+        assert buffer.getvalue().startswith(magic)
+
+    def it_writes_the_chart_into_a_file_descriptor_or_a_path(self, tmp_path):
+        path = tmp_path / "chart.pdf"
+        fd = os.open(tmp_path / "fd.svg", os.O_WRONLY | os.O_CREAT)
+        try:
+            _backend().export(fd, "svg")
+        finally:
+            os.close(fd)
+        _backend().export(path)
+
+        assert (tmp_path / "fd.svg").read_bytes().startswith(b"<?xml")
+        assert path.read_bytes().startswith(b"\x89PNG")
+
+    def it_uses_the_output_options_of_the_chart(self):
+        options = {"output_format": "png", "dpi": 50, "size": (4.0, 2.0)}
+        buffer = io.BytesIO()
+
+        _backend(options).export(buffer)
+
+        assert _png_size(buffer.getvalue()) == (200, 100)
+        assert _png_size(_backend().image()) == (640, 480)
+
+    def but_it_raises_on_unknown_formats(self):
+        with pytest.raises(ValueError, match="Unknown format bmp"):
+            _backend().export(io.BytesIO(), "bmp")
+
+
+class DescribeMatplotlibBackendRender:
+    @patch("chickpy.backend.plt")
+    def it_shows_the_chart_drawn_with_the_figure_api(self, mock_plt):
+        _backend().render()
+
+        ax = mock_plt.figure.return_value.subplots.return_value
+        ax.plot.assert_called_once()
+        ax.set_title.assert_called_once_with("foo")
+        mock_plt.show.assert_called_once_with()
+        assert not mock_plt.plot.called
+        assert not mock_plt.title.called
+
+    def it_draws_a_named_line_per_series(self):
+        backend = MatplotlibBackend(
+            {
+                "label": '"foo"',
+                "xvalues": np.array([1.0, 2.0]),
+                "yvalues": np.array([[3.0, 5.0], [4.0, 6.0]]),
+                "options": {},
+                "series": ["load", "temp"],
+            }
+        )
+
+        ax = backend.figure().axes[0]
+
+        assert [line.get_ydata().tolist() for line in ax.lines] == [[3, 4], [5, 6]]
+        assert [t.get_text() for t in ax.get_legend().get_texts()] == ["load", "temp"]
+
+    @patch("chickpy.backend.plt")
+    def but_it_returns_the_figure_without_touching_pyplot_when_hidden(self, mock_plt):
+        fig = _backend().render(show=False)
+
+        assert mock_plt.method_calls == []
+        assert fig.axes[0].get_title() == "foo"
+
+
+class DescribeFigurePool:
+    def it_reuses_cleared_figures(self):
+        pool = FigurePool(size=1)
+        with pool.axes() as ax:
+            ax.plot([1, 2], [3, 4])
+
+        with pool.axes() as reused:
+            assert reused is ax
+            assert not reused.lines
+
+    def it_keeps_at_most_size_idle_figures(self):
+        pool = FigurePool(size=1)
+        with pool.axes() as first, pool.axes() as second:
+            assert first is not second
+
+        assert len(pool) == 1
+
+    def it_draws_the_same_image_as_a_new_figure(self, monkeypatch):
+        backend = _backend({"chart_type": CHART_TYPE.BAR, "size": (3.0, 2.0)})
+        monkeypatch.setattr(MatplotlibBackend, "pool", FigurePool())
+        pooled = [backend.image("png") for _ in range(2)]
+        monkeypatch.setattr(MatplotlibBackend, "pool", None)
+
+        assert pooled == [backend.image("png")] * 2
+
+
+def _backend(options=None):
+    return MatplotlibBackend(
+        {
+            "label": '"foo"',
+            "xvalues": np.array(["a", "b"]),
+            "yvalues": np.array([1.0, 2.0]),
+            "options": options or {},
+        }
+    )
+
+
+def _png_size(data):
+    """Width and height read from the PNG header."""
+    return struct.unpack(">II", data[16:24])
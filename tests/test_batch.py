@@ -0,0 +1,75 @@
+import pytest
+
+from chickpy.batch import render_batch
+
+
+class DescribeRenderBatch:
+    @pytest.mark.parametrize("fmt", ("png", "svg"))
+    def it_renders_every_command_of_every_script(self, tmp_path, fmt):
+        script_file = tmp_path / "charts.chk"
+        script_file.write_text(
+            """CREATE CHART "foo" VALUES [1,2] [4,5];\n"""
+            """CREATE CHART "bar" VALUES ["a", "b"] [6,7] TYPE BAR;"""
+        )
+        scripts = [
+            script_file,
+            """CREATE CHART "baz" VALUES [1,2] [4,5] TYPE SCATTER;""",
+        ]
+
+        results = render_batch(scripts, tmp_path / "out", fmt, max_workers=2)
+
+        assert [(r.source, r.index, r.ok) for r in results] == [
+            (str(script_file), 0, True),
+            (str(script_file), 1, True),
+            ("script1", 0, True),
+        ]
+        assert [r.path.name for r in results] == [
+            f"charts_0.{fmt}",
+            f"charts_1.{fmt}",
+            f"script1_0.{fmt}",
+        ]
+        assert all(r.path.stat().st_size > 0 for r in results)
+
+    def but_it_reports_failures_without_aborting_the_batch(self, tmp_path):
+        scripts = [
+            """CREATE foo;""",
+            """CREATE CHART "foo" XVALUES [1] YVALUES [4] TYPE BAR;\n"""
+            """CREATE CHART "bar" VALUES [1,2] [4,5];""",
+        ]
+
+        results = render_batch(scripts, tmp_path, max_workers=1)
+
+        assert [(r.source, r.index, r.ok) for r in results] == [
+            ("script0", 0, False),
+            ("script1", 0, False),
+            ("script1", 1, True),
+        ]
+        assert results[0].error.startswith("UnexpectedToken: ")
+        assert results[1].error == "ValueError: BAR cannot have numeric x values."
+        assert results[2].path == tmp_path / "script1_1.png"
+
+    def and_it_keeps_apart_the_outputs_of_scripts_with_the_same_name(self, tmp_path):
+        scripts = []
+        for n, directory in enumerate(("a", "b")):
+            (tmp_path / directory).mkdir()
+            scripts.append(tmp_path / directory / "plot.chk")
+            scripts[-1].write_text(f"""CREATE CHART "foo" VALUES [1,2] [{n},5];""")
+        scripts.append(tmp_path / "other.chk")
+        scripts[-1].write_text("""CREATE CHART "foo" VALUES [1,2] [4,5];""")
+
+        results = render_batch(scripts, tmp_path / "out", "svg", max_workers=1)
+
+        assert [r.path.name for r in results] == [
+            "plot-0_0.svg",
+            "plot-1_0.svg",
+            "other_0.svg",
+        ]
+        assert results[0].path.read_bytes() != results[1].path.read_bytes()
+
+    def and_it_rejects_unknown_formats(self, tmp_path):
+        with pytest.raises(ValueError) as e:
+            render_batch([], tmp_path, "bmp")
+
+        assert str(e.value) == (
+            "Unknown format bmp. Allowed formats are ('png', 'svg', 'pdf')"
+        )
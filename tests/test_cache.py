@@ -0,0 +1,119 @@
+import os
+
+from chickpy.cache import CacheStats, LRUCache, RenderCache, tree_digest
+from chickpy.parser import parser
+from chickpy.processor import Command
+
+CSV_SCRIPT = """CREATE CHART "foo" FROM CSV "{}" TYPE LINE;"""
+
+
+class DescribeLRUCache:
+    def it_evicts_the_least_recently_used_entries(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+        assert cache.stats() == CacheStats(hits=3, misses=1, size=2, maxsize=2)
+
+    def it_can_be_resized(self):
+        cache = LRUCache(maxsize=3)
+        for key in "abc":
+            cache.put(key, key)
+
+        cache.maxsize = 1
+
+        assert (cache.get("b"), cache.get("c")) == (None, "c")
+
+
+class DescribeRenderCache:
+    def it_stores_images_on_disk_when_configured(self, tmp_path):
+        RenderCache(directory=tmp_path).put("key", b"image")
+        cache = RenderCache(directory=tmp_path)
+
+        assert cache.get("key") == b"image"
+        assert cache.get("other") is None
+        assert cache.stats() == CacheStats(hits=1, misses=1, size=1, maxsize=128)
+
+    def it_removes_the_least_recently_used_images_beyond_the_disk_size(self, tmp_path):
+        cache = RenderCache(directory=tmp_path, disk_maxsize=10)
+        for n, key in enumerate(("a", "b")):
+            cache.put(key, b"12345")
+            os.utime(tmp_path / key, ns=(0, n))
+        cache.clear()
+        cache.get("a")  # now more recently used than b
+
+        cache.put("c", b"12345")
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "c"]
+
+
+class DescribeTreeDigest:
+    def it_ignores_whitespace_and_comments(self):
+        tree = parser.parse("""CREATE CHART "foo" VALUES [1,2] [3,4];""")
+        other = parser.parse(
+            """CREATE  CHART "foo"\n VALUES [1, 2]  [3,4] ; # comment\n"""
+        )
+
+        assert tree_digest(tree) == tree_digest(other)
+        assert tree_digest(tree, "png") != tree_digest(tree, "svg")
+
+
+class DescribeCommandImage:
+    def it_returns_cached_images_for_identical_scripts(self):
+        cache = RenderCache()
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] TYPE LINE;"""
+
+        image = Command.image(script, cache=cache)
+
+        assert image.startswith(b"\x89PNG")
+        assert Command.image(script, cache=cache) is image
+        assert Command.image(script, "svg", cache=cache).startswith(b"<?xml")
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def it_uses_the_script_output_format_by_default(self):
+        cache = RenderCache()
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] OUTPUT SVG;"""
+
+        image = Command.image(script, cache=cache)
+
+        assert image.startswith(b"<?xml")
+        assert Command.image(script, "svg", cache=cache) is image
+        assert Command.image(script, "png", cache=cache).startswith(b"\x89PNG")
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def and_the_backend_default_format_without_output_option(self):
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] BACKEND svg;"""
+
+        assert Command.image(script).startswith(b"<?xml")
+        assert Command.image(script, cache=None).startswith(b"<?xml")
+
+    def it_renders_again_when_a_csv_file_changes(self, tmp_path):
+        cache = RenderCache()
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n1,2\n2,3\n")
+        script = CSV_SCRIPT.format(path)
+        image = Command.image(script, cache=cache)
+
+        path.write_text("x,y\n1,2\n2,4\n")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+
+        assert Command.image(script, cache=cache) != image
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def it_keys_the_data_files_by_content_with_content_hash(self, tmp_path):
+        cache = RenderCache(content_hash=True)
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n1,2\n2,3\n")
+        script = CSV_SCRIPT.format(path)
+        image = Command.image(script, cache=cache)
+
+        path.write_text("x,y\n1,2\n2,3\n")  # same content, new modification time
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+        assert Command.image(script, cache=cache) is image
+
+        path.write_text("x,y\n1,2\n2,4\n")
+        assert Command.image(script, cache=cache) != image
+        assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from chickpy.processor import Command
+
+THREADS = 16
+CHARTS = 1000
+
+
+def _script(n):
+    return (
+        f'CREATE CHART "chart {n}" VALUES [{n},{n + 1},{n + 2}] '
+        f"[{n * 2},{n * 3},{n * 4}] TYPE {('LINE', 'SCATTER')[n % 2]};"
+    )
+
+
+class DescribeConcurrentRendering:
+    def it_renders_a_thousand_distinct_charts_from_many_threads(self):
+        def render(n):
+            ax = Command.render(_script(n)).axes[0]
+            if n % 2:
+                xy = ax.collections[0].get_offsets()
+                values = [np.asarray(xy[:, 0]), np.asarray(xy[:, 1])]
+            else:
+                values = [ax.lines[0].get_xdata(), ax.lines[0].get_ydata()]
+            return ax.get_title(), [list(v) for v in values]
+
+        with ThreadPoolExecutor(THREADS) as executor:
+            charts = list(executor.map(render, range(CHARTS)))
+
+        assert charts == [
+            (f"chart {n}", [[n, n + 1, n + 2], [n * 2, n * 3, n * 4]])
+            for n in range(CHARTS)
+        ]
+
+    def it_encodes_the_same_images_as_a_single_thread(self):
+        scripts = [_script(n) for n in range(32)]
+
+        with ThreadPoolExecutor(THREADS) as executor:
+            images = list(executor.map(lambda s: Command.image(s, cache=None), scripts))
+
+        assert images == [Command.image(script, cache=None) for script in scripts]
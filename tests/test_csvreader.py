@@ -0,0 +1,340 @@
+import csv
+import gzip
+import threading
+
+import numpy as np
+import pytest
+
+import chickpy.csvreader as csvreader
+from chickpy.csvreader import CsvFollower, read_columns, read_groups, read_xy
+
+from .util import method_mock
+
+
+class DescribeReadXY:
+    def it_reads_the_x_and_y_columns_in_typed_buffers(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("y|other|x\n1|foo|0\n\n2|bar|1.5\n")
+
+        xvalues, yvalues = read_xy(path)
+
+        assert xvalues.dtype == yvalues.dtype == np.float64
+        assert xvalues.tolist() == [0.0, 1.5]
+        assert yvalues.tolist() == [1.0, 2.0]
+
+    def it_reads_categorical_x_values_as_strings(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text('x,y\n1,4\n2.5,5\n"b",6\nc,7\n')
+
+        xvalues, yvalues = read_xy(path)
+
+        assert xvalues.dtype.kind == "U"
+        assert xvalues.tolist() == ["1", "2.5", "b", "c"]
+        assert yvalues.tolist() == [4.0, 5.0, 6.0, 7.0]
+
+    def it_sniffs_only_a_bounded_prefix_of_the_file(
+        self, request, tmp_path, monkeypatch
+    ):
+        path = tmp_path / "data.csv"
+        path.write_text("x;y\n" + "".join(f"{n};{n * 2}\n" for n in range(100)))
+        monkeypatch.setattr(csvreader, "SNIFF_SIZE", 16)
+        sniff_ = method_mock(
+            request, csv.Sniffer, "sniff", side_effect=csv.Sniffer.sniff
+        )
+
+        xvalues, yvalues = read_xy(path)
+
+        assert sniff_.call_args.args[1] == "x;y\n0;0\n1;2\n2;4"
+        assert list(xvalues) == [float(n) for n in range(100)]
+        assert list(yvalues) == [float(n * 2) for n in range(100)]
+
+    def but_it_raises_when_the_columns_are_missing(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b\n1,2\n")
+
+        with pytest.raises(ValueError) as e:
+            read_xy(path)
+
+        assert str(e.value) == f"CSV file {path} must have x and y columns."
+
+
+class DescribeReadColumns:
+    def it_reads_several_y_columns_in_one_pass(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("ts,skip,load,temp,tail\n0,x,1,10,z\n\n1,y,2,20,z\n")
+
+        xvalues, yvalues = read_columns(path, "ts", ["temp", 2])
+
+        assert xvalues.tolist() == [0.0, 1.0]
+        assert yvalues.shape == (2, 2)
+        assert yvalues.tolist() == [[10.0, 1.0], [20.0, 2.0]]
+
+    def it_uses_the_row_numbers_without_x_column(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a;b\n7;8\n9;10\n")
+
+        xvalues, yvalues = read_columns(path, None, ["b"])
+
+        assert (xvalues.tolist(), yvalues.tolist()) == ([0.0, 1.0], [8.0, 10.0])
+
+    def it_reads_quoted_fields_like_the_csv_module(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text('x,note,y\na,"b,c",1\n"d\ne",f,2\ng,h,3\r\n')
+
+        xvalues, yvalues = read_columns(path, "x", ["y"])
+
+        assert xvalues.tolist() == ["a", "d\ne", "g"]
+        assert yvalues.tolist() == [1.0, 2.0, 3.0]
+
+    def but_it_raises_when_a_column_is_missing(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("ts,load\n1,2\n")
+
+        with pytest.raises(ValueError) as e:
+            read_columns(path, "ts", ["load", "temp"])
+
+        assert str(e.value) == f"CSV file {path} must have ts, load and temp columns."
+
+    def and_it_raises_on_rows_missing_columns(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y,z\n" + "1,2,3\n" * 10 + "4,5\n")
+
+        with pytest.raises(ValueError, match="has a row missing columns"):
+            read_columns(path, "x", ["z"])
+
+    @pytest.mark.parametrize("name", ["data.csv.gz", "data.bin"])
+    def it_decompresses_gzip_files(self, name, tmp_path):
+        path = tmp_path / name
+        path.write_bytes(gzip.compress(b"x,y\n0,1\n1,2\n"))
+
+        xvalues, yvalues = read_columns(path, "x", ["y"])
+
+        assert (xvalues.tolist(), yvalues.tolist()) == ([0.0, 1.0], [1.0, 2.0])
+
+    def it_decompresses_zstd_files_as_a_stream(self, tmp_path, monkeypatch):
+        zstandard = pytest.importorskip("zstandard")
+        path = tmp_path / "data.csv.zst"
+        rows = "".join(f"{n};{n * 2}\n" for n in range(100))
+        path.write_bytes(zstandard.ZstdCompressor().compress(f"x;y\n{rows}".encode()))
+        monkeypatch.setattr(csvreader, "SNIFF_SIZE", 16)
+
+        xvalues, yvalues = read_columns(path, "x", ["y"])
+
+        assert xvalues.tolist() == [float(n) for n in range(100)]
+        assert yvalues.tolist() == [float(n * 2) for n in range(100)]
+
+    def it_parses_large_files_on_several_processes_in_order(
+        self, request, tmp_path, monkeypatch, parallel_
+    ):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y,z\n" + "".join(f"{n},{-n},{n * 2}\n" for n in range(500)))
+        monkeypatch.setattr(csvreader, "PARALLEL_CHUNK_SIZE", 1000)
+        open_csv_ = method_mock(request, csvreader, "open_csv")
+
+        xvalues, yvalues = read_columns(path, "x", ["z", "y"], workers=2)
+
+        open_csv_.assert_not_called()
+        assert xvalues.tolist() == [float(n) for n in range(500)]
+        assert yvalues.tolist() == [[n * 2.0, -float(n)] for n in range(500)]
+
+    def and_it_keeps_categorical_x_values_found_in_any_range(
+        self, tmp_path, monkeypatch, parallel_
+    ):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n" + "".join(f"{n},{n}\n" for n in range(200)) + "a,0\n")
+        monkeypatch.setattr(csvreader, "PARALLEL_CHUNK_SIZE", 100)
+
+        xvalues, yvalues = read_columns(path, "x", ["y"], workers=2)
+
+        assert xvalues.tolist() == [str(n) for n in range(200)] + ["a"]
+        assert len(yvalues) == 201
+
+    def it_sniffs_complete_lines_of_multibyte_characters(
+        self, tmp_path, monkeypatch, parallel_
+    ):
+        path = tmp_path / "data.csv"
+        path.write_text(
+            "x,y\n" + "".join(f"ééééé{n},{n}\n" for n in range(100)), "utf-8"
+        )
+        monkeypatch.setattr(csvreader, "SNIFF_SIZE", 65)
+        # The prefix ends with the first of the two bytes of an é.
+        assert path.read_bytes()[64:66] == "é".encode("utf-8")
+
+        xvalues, yvalues = read_columns(path, "x", ["y"], workers=2)
+
+        assert xvalues.tolist() == [f"ééééé{n}" for n in range(100)]
+        assert yvalues.tolist() == [float(n) for n in range(100)]
+
+    def but_it_parses_in_one_process_by_default(self, request, tmp_path, monkeypatch):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n" + "".join(f"{n},{n}\n" for n in range(100)))
+        monkeypatch.setattr(csvreader, "PARALLEL_MIN_SIZE", 0)
+        read_parallel_ = method_mock(request, csvreader, "_read_parallel")
+
+        read_columns(path, "x", ["y"])
+
+        read_parallel_.assert_not_called()
+
+    def and_it_parses_in_one_process_when_other_threads_run(
+        self, request, tmp_path, monkeypatch
+    ):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n" + "".join(f"{n},{n}\n" for n in range(100)))
+        monkeypatch.setattr(csvreader, "PARALLEL_MIN_SIZE", 0)
+        read_parallel_ = method_mock(request, csvreader, "_read_parallel")
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(read_columns(path, "x", ["y"], workers=2))
+        )
+
+        thread.start()
+        thread.join()
+
+        read_parallel_.assert_not_called()
+        assert results[0][1].tolist() == [float(n) for n in range(100)]
+
+    @pytest.mark.parametrize("workers", (3, 5, 7))
+    def and_it_parses_quoted_rows_after_the_prefix_in_one_process(
+        self, tmp_path, monkeypatch, parallel_, workers
+    ):
+        path = tmp_path / "data.csv"
+        plain = "".join(f"{n},{n},note\n" for n in range(100))
+        quoted = "".join(f'{n},{n},"multi\nline note"\n' for n in range(100, 200))
+        path.write_text(f"x,y,z\n{plain}{quoted}")
+        monkeypatch.setattr(csvreader, "SNIFF_SIZE", 64)
+
+        xvalues, yvalues = read_columns(path, "x", ["y"], workers=workers)
+
+        assert xvalues.tolist() == [float(n) for n in range(200)]
+        assert yvalues.tolist() == xvalues.tolist()
+
+    def but_it_parses_files_with_quotes_in_one_process(self, tmp_path, parallel_):
+        path = tmp_path / "data.csv"
+        path.write_text('x,y\n"a\nb",1\nc,2\n')
+
+        xvalues, yvalues = read_columns(path, "x", ["y"], workers=2)
+
+        assert (xvalues.tolist(), yvalues.tolist()) == (["a\nb", "c"], [1.0, 2.0])
+
+    @pytest.fixture
+    def parallel_(self, monkeypatch):
+        """Split files of any size, even when other tests left threads running."""
+        monkeypatch.setattr(csvreader, "PARALLEL_MIN_SIZE", 0)
+        monkeypatch.setattr(csvreader.threading, "active_count", lambda: 1)
+
+
+class DescribeReadGroups:
+    def it_numbers_the_category_labels_while_reading(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text('x,y\n1,1\nb,2\n"1",3\n b,4\n')
+
+        keys, codes, yvalues = read_groups(path, "x", ["y"])
+
+        assert keys.tolist() == ["1", "b", " b"]
+        assert codes.tolist() == [0, 1, 0, 2]
+        assert yvalues.tolist() == [1.0, 2.0, 3.0, 4.0]
+
+    def it_sorts_numeric_x_values(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n2,1\n1,2\n2,3\n")
+
+        keys, codes, yvalues = read_groups(path, "x", ["y"])
+
+        assert (keys.tolist(), codes.tolist()) == ([1.0, 2.0], [1, 0, 1])
+
+
+class DescribeCsvFollower:
+    def it_parses_only_the_appended_rows(self, request, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n0,1\n1,2\n")
+        follower = CsvFollower(path, "x", ["y"])
+        assert follower.poll() == 2
+        offset = follower.offset
+        parse_ = method_mock(
+            request,
+            csvreader._Projection,
+            "parse",
+            side_effect=csvreader._Projection.parse,
+        )
+
+        with open(path, "a") as f:
+            f.write("2,4\n3,8\n")
+
+        assert follower.poll() == 2
+        assert list(parse_.call_args.args[1]) == []  # the lines were all consumed
+        assert follower.offset == offset + len("2,4\n3,8\n")
+        assert follower.poll() == 0
+        assert [v.tolist() for v in follower.values] == [
+            [0.0, 1.0, 2.0, 3.0],
+            [1.0, 2.0, 4.0, 8.0],
+        ]
+
+    def it_leaves_a_partial_row_for_the_next_poll(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n0,1\n1,")
+        follower = CsvFollower(path, "x", ["y"])
+
+        assert follower.poll() == 1
+        with open(path, "a") as f:
+            f.write("5\n")
+        assert follower.poll() == 1
+
+        assert [v.tolist() for v in follower.values] == [[0.0, 1.0], [1.0, 5.0]]
+
+    def it_keeps_the_last_rows_of_the_window(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b,c\n" + "".join(f"{n},{n},{-n}\n" for n in range(5)))
+        follower = CsvFollower(path, None, ["b", "c"], window=3)
+        follower.poll()
+        xvalues, yvalues = follower.values
+
+        with open(path, "a") as f:
+            f.write("".join(f"{n},{n},{-n}\n" for n in range(5, 3000)))
+        follower.poll()
+
+        assert follower.values[0].tolist() == [2997.0, 2998.0, 2999.0]
+        assert follower.values[1].tolist() == [[n, -n] for n in range(2997, 3000)]
+        assert xvalues.tolist() == [2.0, 3.0, 4.0]  # views of earlier polls are kept
+        assert yvalues.tolist() == [[2.0, -2.0], [3.0, -3.0], [4.0, -4.0]]
+
+    def it_keeps_categorical_x_values_in_the_window(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n1,1\n2,2\n")
+        follower = CsvFollower(path, "x", ["y"], window=2)
+        follower.poll()
+
+        with open(path, "a") as f:
+            f.write("c,3\n")
+        follower.poll()
+
+        assert [v.tolist() for v in follower.values] == [["2", "c"], [2.0, 3.0]]
+
+    def it_reads_a_truncated_file_again(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n0,1\n1,2\n")
+        follower = CsvFollower(path, "x", ["y"])
+        follower.poll()
+
+        path.write_text("x;y\n5;6\n")
+
+        assert follower.poll() == 1
+        assert [v.tolist() for v in follower.values] == [[5.0], [6.0]]
+
+    def it_parses_large_appends_by_chunks(self, tmp_path, monkeypatch):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n" + "".join(f"{n},{n * 2}\n" for n in range(100)))
+        monkeypatch.setattr(csvreader, "FOLLOW_CHUNK_SIZE", 16)
+        follower = CsvFollower(path, "x", ["y"])
+
+        assert follower.poll() == 100
+        assert follower.offset == path.stat().st_size
+        assert follower.values[1].tolist() == [n * 2.0 for n in range(100)]
+
+    def but_it_cannot_follow_a_compressed_file(self, tmp_path):
+        path = tmp_path / "data.csv.gz"
+        path.write_bytes(gzip.compress(b"x,y\n0,1\n"))
+
+        with pytest.raises(ValueError) as e:
+            CsvFollower(path, "x", ["y"]).poll()
+
+        assert str(e.value) == f"Compressed CSV file {path} cannot be followed."
@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+from chickpy.datasource import DataSource
+from chickpy.parser import parser
+
+
+def data_source_tree(script):
+    return parser.parse(script).children[0].children[0].children[1]
+
+
+class DescribeDataSourceCsv:
+    @pytest.mark.parametrize(
+        "columns, expected",
+        (
+            ("x=ts, y=load", ([0.0, 1.0], [5.0, 6.0])),
+            ('x=ts, y="cpu temp"', ([0.0, 1.0], [40.0, 41.0])),
+            ("y=load, 3", ([0.0, 1.0], [[5.0, 40.0], [6.0, 41.0]])),
+        ),
+    )
+    def it_reads_the_selected_columns(self, tmp_path, columns, expected):
+        path = tmp_path / "wide.csv"
+        path.write_text("ts,host,load,cpu temp\n0,a,5,40\n1,b,6,41\n")
+        tree = data_source_tree(
+            f'CREATE CHART "foo" FROM CSV "{path}" COLUMNS {columns};'
+        )
+
+        xvalues, yvalues = DataSource.values(tree)
+
+        assert (xvalues.tolist(), yvalues.tolist()) == expected
+
+    def it_names_the_series_after_the_y_columns(self):
+        script = """CREATE CHART "foo" FROM CSV "f.csv" COLUMNS x=ts, y=load, temp;"""
+
+        assert DataSource.series(data_source_tree(script)) == ["load", "temp"]
+        assert (
+            DataSource.series(data_source_tree('CREATE CHART "f" VALUES [1] [2];'))
+            == []
+        )
+
+    @pytest.mark.parametrize(
+        "follow, expected",
+        (
+            (" FOLLOW", ([0.0, 1.0, 2.0], [5.0, 6.0, 7.0])),
+            (" COLUMNS x=ts, y=load FOLLOW WINDOW 2", ([1.0, 2.0], [6.0, 7.0])),
+        ),
+    )
+    def it_follows_the_file_with_follow(self, tmp_path, follow, expected):
+        path = tmp_path / "follow.csv"
+        path.write_text("ts,x,load,y\n0,0,5,5\n1,1,6,6\n2,2,7,7\n")
+        tree = data_source_tree(
+            f'CREATE CHART "foo" FROM CSV "{path}"{follow} TYPE LINE;'
+        )
+
+        follower = DataSource.follower(tree)
+
+        assert follower is not None
+        assert [v.tolist() for v in DataSource.values(tree)] == list(expected)
+        assert (
+            DataSource.follower(
+                data_source_tree(f'CREATE CHART "f" FROM CSV "{path}";')
+            )
+            is None
+        )
+
+
+class DescribeDataSourceNpy:
+    def it_maps_a_1d_file_as_y_values(self, tmp_path):
+        path = tmp_path / "series.npy"
+        np.save(path, np.array([4.0, 5.0, 6.0]))
+        tree = data_source_tree(f'CREATE CHART "foo" FROM NPY "{path}";')
+
+        xvalues, yvalues = DataSource.values(tree)
+
+        assert isinstance(yvalues, np.memmap)
+        assert xvalues.tolist() == [0.0, 1.0, 2.0]
+        assert yvalues.tolist() == [4.0, 5.0, 6.0]
+
+    @pytest.mark.parametrize(
+        "columns, expected",
+        (
+            ("", ([0.0, 1.0], [10.0, 11.0])),
+            (" COLUMNS x=2, y=0", ([20.0, 21.0], [0.0, 1.0])),
+            (" COLUMNS y = 2", ([0.0, 1.0], [20.0, 21.0])),
+        ),
+    )
+    def it_maps_the_selected_columns_of_a_2d_file(self, tmp_path, columns, expected):
+        path = tmp_path / "series.npy"
+        np.save(path, np.array([[0.0, 10.0, 20.0], [1.0, 11.0, 21.0]]))
+        tree = data_source_tree(f'CREATE CHART "foo" FROM NPY "{path}"{columns};')
+
+        xvalues, yvalues = DataSource.values(tree)
+
+        assert isinstance(yvalues, np.memmap)
+        assert (xvalues.tolist(), yvalues.tolist()) == expected
+
+    def it_maps_several_y_columns_as_a_2d_array(self, tmp_path):
+        path = tmp_path / "series.npy"
+        np.save(path, np.array([[0.0, 10.0, 20.0], [1.0, 11.0, 21.0]]))
+        script = f'CREATE CHART "foo" FROM NPY "{path}" COLUMNS x=0, y=2, 1;'
+
+        xvalues, yvalues = DataSource.values(data_source_tree(script))
+
+        assert xvalues.tolist() == [0.0, 1.0]
+        assert yvalues.tolist() == [[20.0, 10.0], [21.0, 11.0]]
+
+    def but_it_raises_when_a_column_is_named(self, tmp_path):
+        path = tmp_path / "series.npy"
+        np.save(path, np.zeros((3, 2)))
+        tree = data_source_tree(f'CREATE CHART "foo" FROM NPY "{path}" COLUMNS y=a;')
+
+        with pytest.raises(ValueError) as e:
+            DataSource.values(tree)
+
+        assert str(e.value) == f"Columns of {path} are picked by index, not by name."
+
+    def but_it_raises_when_a_column_is_out_of_range(self, tmp_path):
+        path = tmp_path / "series.npy"
+        np.save(path, np.zeros((3, 2)))
+        tree = data_source_tree(f'CREATE CHART "foo" FROM NPY "{path}" COLUMNS y=2;')
+
+        with pytest.raises(ValueError) as e:
+            DataSource.values(tree)
+
+        assert str(e.value) == f"Column 2 is out of range, {path} has 2 columns."
+
+
+class DescribeDataSourceBin:
+    def it_maps_raw_float64_values(self, tmp_path):
+        path = tmp_path / "series.bin"
+        np.array([4.0, 5.0], dtype="<f8").tofile(path)
+        tree = data_source_tree(f'CREATE CHART "foo" FROM BIN "{path}" TYPE LINE;')
+
+        xvalues, yvalues = DataSource.values(tree)
+
+        assert isinstance(yvalues, np.memmap)
+        assert (xvalues.tolist(), yvalues.tolist()) == ([0.0, 1.0], [4.0, 5.0])
+
+    def it_splits_the_values_in_fields(self, tmp_path):
+        path = tmp_path / "series.bin"
+        np.array([0.0, 4.0, 40.0, 1.0, 5.0, 50.0], dtype="<f8").tofile(path)
+        script = f'CREATE CHART "foo" FROM BIN "{path}" FIELDS 3 COLUMNS x=0, y=2;'
+
+        xvalues, yvalues = DataSource.values(data_source_tree(script))
+
+        assert (xvalues.tolist(), yvalues.tolist()) == ([0.0, 1.0], [40.0, 50.0])
+
+    def but_it_raises_when_the_size_does_not_match_the_fields(self, tmp_path):
+        path = tmp_path / "series.bin"
+        np.zeros(5, dtype="<f8").tofile(path)
+        script = f'CREATE CHART "foo" FROM BIN "{path}" FIELDS 2;'
+
+        with pytest.raises(ValueError) as e:
+            DataSource.values(data_source_tree(script))
+
+        assert str(e.value) == f"{path} size is not a multiple of 2 fields."
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from chickpy.decimation import decimate, grid_indexes, minmax_indexes
+from chickpy.enums import CHART_TYPE
+
+
+class DescribeDecimate:
+    def it_keeps_the_extremes_of_a_line(self):
+        yvalues = np.zeros(10_000)
+        yvalues[1234], yvalues[8765] = 5.0, -3.0
+        xvalues = np.arange(10_000, dtype=np.float64)
+
+        x, y = decimate(xvalues, yvalues, CHART_TYPE.LINE, 100)
+
+        assert len(x) == len(y) <= 100
+        assert {1234.0, 8765.0, 0.0, 9999.0} <= set(x.tolist())
+        assert y.max() == 5.0 and y.min() == -3.0
+        assert (np.diff(x) > 0).all()
+
+    def it_thins_a_scatter_on_a_grid(self):
+        rng = np.random.default_rng(0)
+        xvalues, yvalues = rng.normal(size=(2, 100_000))
+
+        x, y = decimate(xvalues, yvalues, CHART_TYPE.SCATTER, 400)
+
+        assert 0 < len(x) <= 400
+        assert xvalues.min() in x and xvalues.max() in x
+
+    def it_keeps_the_extremes_of_every_series(self):
+        yvalues = np.zeros((10_000, 2))
+        yvalues[1234, 0], yvalues[8765, 1] = 5.0, -3.0
+        xvalues = np.arange(10_000, dtype=np.float64)
+
+        x, y = decimate(xvalues, yvalues, CHART_TYPE.LINE, 100)
+
+        assert len(x) == len(y) <= 100
+        assert y.shape[1] == 2
+        assert {1234.0, 8765.0} <= set(x.tolist())
+        assert y[:, 0].max() == 5.0 and y[:, 1].min() == -3.0
+
+    @pytest.mark.parametrize(
+        "xvalues, chart_type, max_points",
+        (
+            (np.arange(10.0), CHART_TYPE.LINE, 10),
+            (np.array(list("abcdefghij")), CHART_TYPE.BAR, 2),
+            (np.arange(10.0), CHART_TYPE.BAR, 2),
+        ),
+    )
+    def but_it_leaves_other_series_untouched(self, xvalues, chart_type, max_points):
+        yvalues = np.arange(10.0)
+
+        x, y = decimate(xvalues, yvalues, chart_type, max_points)
+
+        assert x is xvalues and y is yvalues
+
+
+class DescribeMinmaxIndexes:
+    @pytest.mark.parametrize("size, max_points", ((11, 4), (1001, 50), (5, 3)))
+    def it_returns_at_most_max_points_sorted_indexes(self, size, max_points):
+        indexes = minmax_indexes(np.random.default_rng(1).normal(size=size), max_points)
+
+        assert len(indexes) <= max_points
+        assert indexes[0] == 0 and indexes[-1] == size - 1
+        assert (np.diff(indexes) > 0).all()
+
+
+class DescribeGridIndexes:
+    def it_returns_one_point_per_grid_cell(self):
+        xvalues = np.array([0.0, 0.1, 1.0, 1.0, 0.0])
+        yvalues = np.array([0.0, 0.1, 1.0, 0.0, 1.0])
+
+        indexes = grid_indexes(xvalues, yvalues, 4)
+
+        assert indexes.tolist() == [0, 2, 3, 4]
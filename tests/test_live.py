@@ -0,0 +1,61 @@
+import pytest
+
+from chickpy.live import LiveChart
+
+
+def _append(path, rows):
+    with open(path, "a") as f:
+        f.write("".join(f"{x},{y}\n" for x, y in rows))
+
+
+class DescribeLiveChart:
+    def it_updates_the_lines_in_place(self, tmp_path):
+        path = tmp_path / "live.csv"
+        path.write_text("x,y\n0,1\n1,2\n")
+        chart = LiveChart(f'CREATE CHART "live" FROM CSV "{path}" FOLLOW WINDOW 3;')
+        ax = chart.figure.axes[0]
+        (line,) = ax.lines
+
+        _append(path, [(2, 4), (3, 8)])
+
+        assert chart.refresh() == 2
+        assert list(chart.figure.axes[0].lines) == [line]
+        assert [list(v) for v in line.get_data()] == [[1, 2, 3], [2, 4, 8]]
+        assert ax.get_xlim()[1] >= 3 and ax.get_ylim()[1] >= 8
+        assert chart.refresh() == 0
+        assert chart.image()[:4] == b"\x89PNG"
+
+    def it_updates_the_points_of_each_series(self, tmp_path):
+        path = tmp_path / "live.csv"
+        path.write_text("t,a,b\n0,1,2\n")
+        chart = LiveChart(
+            f'CREATE CHART "live" FROM CSV "{path}" COLUMNS x=t, y=a, b FOLLOW '
+            "TYPE SCATTER;"
+        )
+        collections = chart.figure.axes[0].collections
+
+        with open(path, "a") as f:
+            f.write("1,3,4\n")
+        chart.refresh()
+
+        assert [c.get_offsets().tolist() for c in collections] == [
+            [[0, 1], [1, 3]],
+            [[0, 2], [1, 4]],
+        ]
+
+    @pytest.mark.parametrize(
+        "script, message",
+        (
+            ('FROM CSV "{}"', "A live chart must read a CSV file with FOLLOW."),
+            ("VALUES [1] [2]", "A live chart must read a CSV file with FOLLOW."),
+            ('FROM CSV "{}" FOLLOW TYPE BAR', "A live chart cannot be a BAR chart."),
+        ),
+    )
+    def but_it_raises_on_charts_it_cannot_follow(self, tmp_path, script, message):
+        path = tmp_path / "live.csv"
+        path.write_text("x,y\na,1\n")
+
+        with pytest.raises(ValueError) as e:
+            LiveChart(f'CREATE CHART "live" {script.format(path)};')
+
+        assert str(e.value) == message
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from lark import Lark
+from mock import Mock
+
+import chickpy.parser as parser_module
+from chickpy.cache import tree_digest
+from chickpy.parser import cache_dir, cache_file, gen_parser, parser, read_language
+
+SCRIPT = """CREATE CHART "foo" VALUES [-1,2,3,4] [4,5,6,7] TYPE LINE;"""
+
+
+class DescribeGenParser:
+    def it_stores_the_compiled_parser_in_the_cache_dir(self, tmp_path):
+        lang_parser = gen_parser(cache=tmp_path)
+
+        path = cache_file(read_language("language.lark"), tmp_path)
+        assert path.exists()
+        assert isinstance(lang_parser, Lark)
+
+    def it_loads_the_parser_from_the_cache_when_available(self, tmp_path, monkeypatch):
+        expected = tree_digest(gen_parser(cache=tmp_path).parse(SCRIPT))
+        lark_ = Mock(wraps=Lark)
+        monkeypatch.setattr(parser_module, "Lark", lark_)
+
+        lang_parser = gen_parser(cache=tmp_path)
+
+        assert not lark_.called
+        assert tree_digest(lang_parser.parse(SCRIPT)) == expected
+
+    def it_rebuilds_the_parser_when_the_cache_is_corrupted(self, tmp_path):
+        path = cache_file(read_language("language.lark"), tmp_path)
+        path.write_bytes(b"not a pickle")
+
+        lang_parser = gen_parser(cache=tmp_path)
+
+        expected = tree_digest(gen_parser(cache=False).parse(SCRIPT))
+        assert tree_digest(lang_parser.parse(SCRIPT)) == expected
+        assert path.read_bytes() != b"not a pickle"
+
+    def it_keys_the_cache_file_on_the_grammar_content(self, tmp_path):
+        assert cache_file("a: B", tmp_path) != cache_file("a: C", tmp_path)
+
+    def but_it_works_without_a_writable_cache_dir(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+
+        lang_parser = gen_parser(cache=blocker / "cache")
+
+        assert isinstance(lang_parser, Lark)
+
+    @pytest.mark.parametrize(
+        "env, expected",
+        (
+            ({"CHICKPY_CACHE_DIR": "/tmp/foo"}, "/tmp/foo"),
+            ({"CHICKPY_CACHE_DIR": ""}, None),
+            ({"XDG_CACHE_HOME": "/tmp/xdg"}, "/tmp/xdg/chickpy"),
+        ),
+    )
+    def it_knows_where_the_cache_dir_is(self, monkeypatch, env, expected):
+        monkeypatch.delenv("CHICKPY_CACHE_DIR", raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+
+        directory = cache_dir()
+
+        assert (str(directory) if directory else None) == expected
+
+
+class DescribeValuesTransformer:
+    def it_packs_lists_of_numbers_into_arrays(self):
+        tree = parser.parse('CREATE CHART "a" VALUES [ -1, 2.5 ,3e2] [1,\n2,3];')
+
+        x_values = next(tree.find_data("x_values")).children
+        y_values = next(tree.find_data("y_values")).children
+        assert len(x_values) == len(y_values) == 1
+        assert x_values[0].dtype == np.float64
+        assert x_values[0].tolist() == [-1.0, 2.5, 300.0]
+        assert y_values[0].tolist() == [1.0, 2.0, 3.0]
+
+    def but_it_keeps_the_list_items_when_not_all_numbers(self):
+        tree = parser.parse('CREATE CHART "a" VALUES ["a", 2] [1, 2];')
+
+        x_values = next(tree.find_data("x_values")).children
+        assert [str(child.data) for child in x_values] == ["e_list_value"] * 2
+        assert isinstance(next(tree.find_data("y_values")).children[0], np.ndarray)
+
+    def it_raises_on_an_invalid_number(self):
+        with pytest.raises(ValueError, match="Invalid number in the list"):
+            parser.parse('CREATE CHART "a" VALUES [1, 2] [1,,2];')
@@ -1,5 +1,11 @@
 import csv
+import gc
+import io
+import subprocess
+import sys
+import weakref
 
+import numpy as np
 import pytest
 from lark.exceptions import UnexpectedToken
 from matplotlib.figure import Figure
@@ -7,11 +13,13 @@ from mock import patch
 
 import chickpy.backend as backend  # noqa
 from chickpy.backend import MatplotlibBackend
+from chickpy.cache import LRUCache
+from chickpy.datasource import DataSource
 from chickpy.enums import CHART_TYPE
 from chickpy.parser import parser
 from chickpy.processor import Command, _CommandProcessor, _CreateChartProcessor
 
-from .util import class_mock, instance_mock
+from .util import Mock, class_mock, instance_mock
 
 
 class Describe_CreateChartProcessor:
@@ -72,6 +80,42 @@ class Describe_CreateChartProcessor:
                     "options": {"chart_type": CHART_TYPE.BAR},
                 },
             ),
+            (
+                """CREATE CHART "foo" VALUES ["a"] [4] TYPE horizontal  bar;""",
+                {
+                    "label": '"foo"',
+                    "xvalues": ["a"],
+                    "yvalues": [4.0],
+                    "options": {"chart_type": CHART_TYPE.HORIZONTAL_BAR},
+                },
+            ),
+            (
+                """CREATE CHART "foo" VALUES [1,2,3,4,5] [4,9,6,0,7] MAXPOINTS 4;""",
+                {
+                    "label": '"foo"',
+                    "xvalues": [1.0, 2.0, 4.0, 5.0],
+                    "yvalues": [4.0, 9.0, 0.0, 7.0],
+                    "options": {"max_points": 4},
+                },
+            ),
+            (
+                """CREATE CHART "foo" VALUES [1] [4] OUTPUT svg DPI 150 SIZE 6, 2.5;""",
+                {
+                    "label": '"foo"',
+                    "xvalues": [1.0],
+                    "yvalues": [4.0],
+                    "options": {"output_format": "svg", "dpi": 150, "size": (6, 2.5)},
+                },
+            ),
+            (
+                """CREATE CHART "foo" VALUES [1] [4] BACKEND SVG;""",
+                {
+                    "label": '"foo"',
+                    "xvalues": [1.0],
+                    "yvalues": [4.0],
+                    "options": {"backend_name": "svg"},
+                },
+            ),
         ),
     )
     def it_validates_and_build_the_chart_data(self, script, expected_value):
@@ -80,7 +124,8 @@ class Describe_CreateChartProcessor:
         processor = _CreateChartProcessor(tree.children[0].children[0], backend_)
         processor.validate()
 
-        assert processor._chart == expected_value
+        assert _as_lists(processor._chart) == expected_value
+        assert processor._chart["yvalues"].dtype == np.float64
 
     @pytest.mark.parametrize(
         "script, csv_file",
@@ -101,13 +146,70 @@ class Describe_CreateChartProcessor:
         processor = _CreateChartProcessor(tree.children[0].children[0], backend_)
         processor.validate()
 
-        assert processor._chart == {
+        assert _as_lists(processor._chart) == {
             "label": '"foo"',
             "xvalues": [0.0, 1.0, 2.0, 4.0, 8.0],
             "yvalues": [1.0, 2.0, 3.0, 7.0, 9.0],
             "options": {},
         }
 
+    def it_builds_a_series_per_csv_y_column(self, tmp_path):
+        path = tmp_path / "wide.csv"
+        path.write_text("ts,host,load,temp\n0,a,5,40\n1,b,6,41\n")
+        script = f'CREATE CHART "foo" FROM CSV "{path}" COLUMNS x=ts, y=load,temp;'
+        tree = parser.parse(script)
+        processor = _CreateChartProcessor(tree.children[0].children[0], None)
+        processor.validate()
+
+        assert _as_lists(processor._chart) == {
+            "label": '"foo"',
+            "xvalues": [0.0, 1.0],
+            "yvalues": [[5.0, 40.0], [6.0, 41.0]],
+            "options": {},
+            "series": ["load", "temp"],
+        }
+
+    @pytest.mark.parametrize(
+        "options, xvalues, yvalues",
+        (
+            ("AGGREGATE SUM BY x", ["a", "b"], [9.0, 2.0]),
+            ("AGGREGATE count by X", ["a", "b"], [2.0, 1.0]),
+            ("HISTOGRAM BINS 2", ["2 to 4.5", "4.5 to 7"], [2.0, 1.0]),
+        ),
+    )
+    def it_reduces_the_rows_while_loading(self, tmp_path, options, xvalues, yvalues):
+        path = tmp_path / "hosts.csv"
+        path.write_text("x,y\na,7\nb,2\na,2\n")
+        script = f'CREATE CHART "foo" FROM CSV "{path}" TYPE BAR {options};'
+        tree = parser.parse(script)
+        processor = _CreateChartProcessor(tree.children[0].children[0], None)
+        processor.validate()
+
+        assert processor._chart["xvalues"].tolist() == xvalues
+        assert processor._chart["yvalues"].tolist() == yvalues
+
+    def it_reduces_inline_values(self):
+        script = (
+            """CREATE CHART "foo" VALUES ["a","b","a"] [1,2,3] AGGREGATE MEAN BY x;"""
+        )
+        tree = parser.parse(script)
+        processor = _CreateChartProcessor(tree.children[0].children[0], None)
+        processor.validate()
+
+        assert _as_lists(processor._chart)["yvalues"] == [2.0, 2.0]
+
+    def but_it_raises_on_several_series_of_bars(self, tmp_path):
+        path = tmp_path / "wide.csv"
+        path.write_text("host,load,temp\na,5,40\nb,6,41\n")
+        script = f'CREATE CHART "foo" FROM CSV "{path}" COLUMNS x=host, y=load, temp'
+        tree = parser.parse(f"{script} TYPE BAR;")
+        processor = _CreateChartProcessor(tree.children[0].children[0], None)
+
+        with pytest.raises(ValueError) as e:
+            processor.validate()
+
+        assert str(e.value) == "BAR cannot have several y series."
+
     def but_it_raises_an_exception_when_ther_is_a_delimiter_mismatch(self):
         script = """CREATE CHART "foo" FROM CSV "tests/fixtures/csv/base_csv_wrong_sep.csv";"""  # noqa
         tree = parser.parse(script)
@@ -179,12 +281,26 @@ class Describe_CommandProcessor:
 
         assert processor is processor_
         _CreateChartProcessorCls.assert_called_once_with(
-            tree.children[0].children[0], MatplotlibBackend
+            tree.children[0].children[0], "matplotlib"
+        )
+
+    def it_provides_a_processor_for_each_command_of_the_script(self):
+        script = (
+            """CREATE CHART "foo" VALUES [1,2] [4,5];\n"""
+            """CREATE CHART "bar" VALUES ["a", "b"] [6,7] TYPE BAR;"""
         )
+        tree = parser.parse(script)
+
+        processors = list(_CommandProcessor.processors(tree))
+
+        assert [p._tree for p in processors] == [
+            tree.children[0].children[0],
+            tree.children[1].children[0],
+        ]
 
 
 class Describe_Command:
-    @patch("%s.backend.plt" % __name__)
+    @patch("%s.backend.mpl_figure" % __name__)
     @pytest.mark.parametrize(
         "script",
         (
@@ -194,17 +310,20 @@ class Describe_Command:
             ("""CREATE CHART "foo" XVALUES [-1,2,3,4] YVALUES [4,5,6,7];"""),
         ),
     )
-    def it_parses_and_plot_a_line_chart(self, mock_plt, script):
+    def it_parses_and_plot_a_line_chart(self, mock_figure, script):
         Command.run(script, show_output=False)
 
-        assert mock_plt.figure.called
-        assert mock_plt.plot.called
-        mock_plt.title.assert_called_once_with("foo")
-        mock_plt.plot.assert_called_once_with(
-            [-1.0, 2.0, 3.0, 4.0], [4.0, 5.0, 6.0, 7.0]
-        )
-
-    @patch("%s.backend.plt" % __name__)
+        ax = mock_figure.Figure.return_value.subplots.return_value
+        assert mock_figure.Figure.called
+        assert ax.plot.called
+        ax.set_title.assert_called_once_with("foo")
+        ax.plot.assert_called_once()
+        assert _call_values(ax.plot) == [
+            [-1.0, 2.0, 3.0, 4.0],
+            [4.0, 5.0, 6.0, 7.0],
+        ]
+
+    @patch("%s.backend.mpl_figure" % __name__)
     @pytest.mark.parametrize(
         "script",
         (
@@ -212,15 +331,17 @@ class Describe_Command:
             ("""CREATE CHART "foo" XVALUES [-1,2,3] YVALUES [4,5,6] TYPE SCATTER;"""),
         ),
     )
-    def it_parses_and_plot_a_scatter_chart(self, mock_plt, script):
+    def it_parses_and_plot_a_scatter_chart(self, mock_figure, script):
         Command.run(script, show_output=False)
 
-        assert mock_plt.figure.called
-        assert mock_plt.scatter.called
-        mock_plt.title.assert_called_once_with("foo")
-        mock_plt.scatter.assert_called_once_with([-1.0, 2.0, 3.0], [4.0, 5.0, 6.0])
+        ax = mock_figure.Figure.return_value.subplots.return_value
+        assert mock_figure.Figure.called
+        assert ax.scatter.called
+        ax.set_title.assert_called_once_with("foo")
+        ax.scatter.assert_called_once()
+        assert _call_values(ax.scatter) == [[-1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]
 
-    @patch("%s.backend.plt" % __name__)
+    @patch("%s.backend.mpl_figure" % __name__)
     @pytest.mark.parametrize(
         "script",
         (
@@ -228,15 +349,17 @@ class Describe_Command:
             ("""CREATE CHART "foo" YVALUES [4,5] XVALUES ["a", "b"] TYPE BAR;"""),
         ),
     )
-    def it_parses_and_plot_a_bar_chart(self, mock_plt, script):
+    def it_parses_and_plot_a_bar_chart(self, mock_figure, script):
         Command.run(script, show_output=False)
 
-        assert mock_plt.figure.called
-        assert mock_plt.bar.called
-        mock_plt.title.assert_called_once_with("foo")
-        mock_plt.bar.assert_called_once_with(["a", "b"], [4.0, 5.0])
+        ax = mock_figure.Figure.return_value.subplots.return_value
+        assert mock_figure.Figure.called
+        assert ax.bar.called
+        ax.set_title.assert_called_once_with("foo")
+        ax.bar.assert_called_once()
+        assert _call_values(ax.bar) == [["a", "b"], [4.0, 5.0]]
 
-    @patch("%s.backend.plt" % __name__)
+    @patch("%s.backend.mpl_figure" % __name__)
     @pytest.mark.parametrize(
         "script",
         (
@@ -244,15 +367,17 @@ class Describe_Command:
             ("""CREATE CHART "foo" YVALUES [4] XVALUES ["a"] TYPE HORIZONTAL BAR;"""),
         ),
     )
-    def it_parses_and_plot_a_horizondal_bar_chart(self, mock_plt, script):
+    def it_parses_and_plot_a_horizondal_bar_chart(self, mock_figure, script):
         Command.run(script, show_output=False)
 
-        assert mock_plt.figure.called
-        assert mock_plt.barh.called
-        mock_plt.title.assert_called_once_with("foo")
-        mock_plt.barh.assert_called_once_with(["a"], [4.0])
+        ax = mock_figure.Figure.return_value.subplots.return_value
+        assert mock_figure.Figure.called
+        assert ax.barh.called
+        ax.set_title.assert_called_once_with("foo")
+        ax.barh.assert_called_once()
+        assert _call_values(ax.barh) == [["a"], [4.0]]
 
-    @patch("%s.backend.plt" % __name__)
+    @patch("%s.backend.mpl_figure" % __name__)
     @pytest.mark.parametrize(
         "script, plot_type",
         (
@@ -264,21 +389,217 @@ class Describe_Command:
             ),
         ),
     )
-    def it_parses_and_plot_chart_from_csv(self, mock_plt, script, plot_type):
+    def it_parses_and_plot_chart_from_csv(self, mock_figure, script, plot_type):
         script = script.replace(
             "csv_placeholder", '"tests/fixtures/csv/base_csv_comma_separated.csv"'
         )
         Command.run(script, show_output=False)
 
-        assert mock_plt.figure.called
-        assert getattr(mock_plt, plot_type).called
-        mock_plt.title.assert_called_once_with("foo")
-        getattr(mock_plt, plot_type).assert_called_once_with(
-            [0.0, 1.0, 2.0, 4.0, 8.0], [1.0, 2.0, 3.0, 7.0, 9.0]
-        )
+        ax = mock_figure.Figure.return_value.subplots.return_value
+        assert mock_figure.Figure.called
+        assert getattr(ax, plot_type).called
+        ax.set_title.assert_called_once_with("foo")
+        getattr(ax, plot_type).assert_called_once()
+        assert _call_values(getattr(ax, plot_type)) == [
+            [0.0, 1.0, 2.0, 4.0, 8.0],
+            [1.0, 2.0, 3.0, 7.0, 9.0],
+        ]
+
+    def it_returns_the_figure_when_the_output_is_hidden(self):
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] TYPE LINE;"""
+
+        fig = Command.run(script, show_output=False)
+
+        assert isinstance(fig, Figure)
+        assert fig.axes[0].lines[0].get_ydata().tolist() == [4, 5, 6]
 
     def it_returns_a_figure_object_using_the_render_method(self):
         script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] TYPE LINE;"""
         fig = Command.render(script)
 
         assert isinstance(fig, Figure)
+
+    def it_uses_the_backend_chosen_by_the_script(self):
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] BACKEND svg;"""
+
+        data = Command.image(script, "svg", cache=None)
+
+        assert data.startswith(b"<?xml")
+        assert type(Command._parsed(script).processor(0).backend).__name__ == (
+            "SvgBackend"
+        )
+
+    @pytest.mark.parametrize(
+        "render", (Command.render, lambda script: list(Command.render_all(script)))
+    )
+    def but_it_raises_when_asked_a_figure_of_the_svg_backend(self, render):
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] BACKEND svg;"""
+
+        with pytest.raises(ValueError) as e:
+            render(script)
+
+        assert str(e.value) == (
+            "SvgBackend cannot build figures, use Command.image or Command.export."
+        )
+
+    def but_it_raises_on_an_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown backend foo"):
+            Command.validate("""CREATE CHART "foo" VALUES [1] [4] BACKEND foo;""")
+
+    def it_exports_the_chart_in_the_script_output_format(self):
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] OUTPUT PDF DPI 72;"""
+        buffer = io.BytesIO()
+
+        Command.export(script, buffer)
+
+        assert buffer.getvalue().startswith(b"%PDF")
+
+    @pytest.mark.parametrize(
+        "script",
+        (
+            """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] TYPE LINE;""",
+            """CREATE CHART "foo" FROM CSV "tests/fixtures/csv/base_csv_comma_separated.csv";""",  # noqa
+        ),
+    )
+    def it_validates_a_script_without_importing_matplotlib(self, script):
+        code = (
+            "import sys\n"
+            "from chickpy.processor import Command\n"
+            f"Command.validate({script!r})\n"
+            "assert 'matplotlib' not in sys.modules, 'matplotlib was imported'\n"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
+
+    def but_validate_raises_on_invalid_scripts(self):
+        with pytest.raises(ValueError) as e:
+            Command.validate("""CREATE CHART "foo" XVALUES [1] YVALUES [4] TYPE BAR;""")
+
+        assert str(e.value) == "BAR cannot have numeric x values."
+
+    @patch("%s.backend.mpl_figure" % __name__)
+    def it_runs_all_the_commands_of_a_script(self, mock_figure):
+        script = (
+            """CREATE CHART "foo" VALUES [1,2] [4,5];\n"""
+            """CREATE CHART "bar" VALUES [1,2] [6,7] TYPE SCATTER;\n"""
+            """CREATE CHART "baz" VALUES ["a", "b"] [8,9] TYPE BAR;"""
+        )
+
+        figures = Command.run_script(script, show_output=False)
+
+        ax = mock_figure.Figure.return_value.subplots.return_value
+        assert mock_figure.Figure.call_count == 3
+        assert figures == [mock_figure.Figure.return_value] * 3
+        assert ax.set_title.call_args_list == [
+            (("foo",),),
+            (("bar",),),
+            (("baz",),),
+        ]
+        ax.plot.assert_called_once()
+        assert _call_values(ax.plot) == [[1.0, 2.0], [4.0, 5.0]]
+        ax.scatter.assert_called_once()
+        assert _call_values(ax.scatter) == [[1.0, 2.0], [6.0, 7.0]]
+        ax.bar.assert_called_once()
+        assert _call_values(ax.bar) == [["a", "b"], [8.0, 9.0]]
+
+    def it_lazily_renders_a_figure_for_each_command(self):
+        script = (
+            """CREATE CHART "foo" VALUES [1,2] [4,5];\n"""
+            """CREATE CHART "bar" XVALUES [1,2] YVALUES [6,7] TYPE BAR;"""
+        )
+
+        figures = Command.render_all(script)
+        first = next(figures)
+
+        assert isinstance(first, Figure)
+        assert first.axes[0].get_title() == "foo"
+        with pytest.raises(ValueError) as e:
+            next(figures)
+        assert str(e.value) == "BAR cannot have numeric x values."
+
+    def it_frees_the_values_of_the_charts_already_rendered(self, tmp_path, monkeypatch):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n1,2\n2,3\n")
+        script = f"""CREATE CHART "foo" FROM CSV "{path}";\n""" * 3
+        loaded = []
+        values = DataSource.values
+
+        def values_(data_src_tree, reduction=None):
+            xvalues, yvalues = values(data_src_tree, reduction)
+            loaded.append(weakref.ref(yvalues))
+            return xvalues, yvalues
+
+        monkeypatch.setattr(DataSource, "values", values_)
+        figures = Command.render_all(script)
+
+        next(figures)
+        next(figures)
+        gc.collect()
+
+        assert [ref() is None for ref in loaded] == [True, False]
+
+
+class DescribeCommandScriptCache:
+    def it_parses_and_validates_a_script_only_once(self, script_cache_, parse_):
+        script = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] TYPE LINE;"""
+
+        Command.validate(script)
+        figure = Command.render(script)
+        Command.validate(script)
+
+        assert parse_.call_count == 1
+        assert figure.axes[0].get_title() == "foo"
+        assert script_cache_.stats().hits == 2
+
+    def it_keeps_at_most_maxsize_scripts(self, script_cache_, parse_):
+        script_cache_.maxsize = 1
+        scripts = [f"""CREATE CHART "{n}" VALUES [1] [2];""" for n in range(2)]
+
+        for script in scripts + scripts:
+            Command.validate(script)
+
+        assert parse_.call_count == 4
+        assert script_cache_.stats().size == 1
+
+    def it_validates_again_when_a_data_file_changes(
+        self, tmp_path, script_cache_, parse_
+    ):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n1,2\n")
+        script = f"""CREATE CHART "foo" FROM CSV "{path}" TYPE LINE;"""
+        Command.validate(script)
+
+        path.write_text("x,y\n1,2\n2,3\n")
+        figure = Command.render(script)
+
+        assert parse_.call_count == 1
+        assert figure.axes[0].lines[0].get_ydata().tolist() == [2.0, 3.0]
+
+    @pytest.fixture
+    def parse_(self, monkeypatch):
+        parse_ = Mock(wraps=parser.parse)
+        monkeypatch.setattr(parser, "parse", parse_)
+        return parse_
+
+    @pytest.fixture
+    def script_cache_(self, monkeypatch):
+        cache = LRUCache()
+        monkeypatch.setattr("chickpy.processor.script_cache", cache)
+        return cache
+
+
+def _as_lists(chart):
+    """The chart with its arrays converted to lists, for comparisons."""
+    return {
+        key: value.tolist() if isinstance(value, np.ndarray) else value
+        for key, value in chart.items()
+    }
+
+
+def _call_values(method_mock):
+    """The x and y arrays the plotting method was called with, as lists."""
+    return [values.tolist() for values in method_mock.call_args.args]
@@ -0,0 +1,116 @@
+import os
+
+from chickpy import profiling
+from chickpy.processor import Command
+from chickpy.profiling import Profile, StageStats
+from chickpy.shell import ChickPrompt
+
+CSV_FILE = "tests/fixtures/csv/base_csv_comma_separated.csv"
+
+
+class DescribeProfile:
+    def it_collects_the_stages_of_a_command(self):
+        script = f"""CREATE CHART "profiled csv" FROM CSV "{CSV_FILE}";"""
+
+        with profiling.profile() as stats:
+            Command.image(script, cache=None)
+
+        assert [(s.stage, s.command) for s in stats.stages] == [
+            ("parse", None),
+            ("load", 0),
+            ("options", 0),
+            ("validate", 0),
+            ("render", 0),
+        ]
+        load = stats.stages[1]
+        assert load.bytes_read == os.path.getsize(CSV_FILE)
+        assert load.points > 0
+        assert stats.stages[0].bytes_read == len(script)
+        assert all(s.wall >= 0 and s.cpu >= 0 for s in stats.stages)
+
+    def it_records_a_cache_stage_for_a_cached_script(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("x,y\n1,2\n2,3\n")
+        script = f"""CREATE CHART "profiled twice" FROM CSV "{path}";"""
+        Command.image(script, cache=None)
+
+        with profiling.profile() as stats:
+            Command.image(script, cache=None)
+        path.write_text("x,y\n1,2\n2,4\n")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+        with profiling.profile() as changed:
+            Command.image(script, cache=None)
+
+        assert [(s.stage, s.command, s.points) for s in stats.stages] == [
+            ("cache", None, 1),
+            ("render", 0, 2),
+        ]
+        assert [s.stage for s in changed.stages] == [
+            "cache",
+            "load",
+            "options",
+            "validate",
+            "render",
+        ]
+
+    def it_attributes_the_stages_to_each_command(self):
+        script = """CREATE CHART "profiled a" VALUES [1,2] [3,4];
+        CREATE CHART "profiled b" VALUES [1,2,3] [3,4,5];"""
+
+        stats = Command.run_script(script, show_output=False, profile=True)
+
+        renders = [s for s in stats.stages if s.stage == "render"]
+        assert [(s.command, s.points) for s in renders] == [(0, 2), (1, 3)]
+
+    def it_sums_the_stages_in_the_totals(self):
+        stats = Profile(
+            [StageStats("load", 0, 1.0, 0.5, 10, 2), StageStats("load", 1, 2.0, 1.0)]
+        )
+
+        assert stats.totals() == {"load": StageStats("load", None, 3.0, 1.5, 10, 2)}
+        assert stats.format().splitlines()[-1].split() == [
+            "total",
+            "load",
+            "3000.000",
+            "1500.000",
+            "10",
+            "2",
+        ]
+
+    def but_it_measures_nothing_when_disabled(self):
+        assert not profiling.enabled()
+        assert profiling.stage("load").enabled is False
+        assert not isinstance(
+            Command.run("""CREATE CHART "unprofiled" VALUES [1] [2];""", False), Profile
+        )
+
+
+class DescribeHooks:
+    def it_calls_the_hook_for_every_stage(self):
+        calls = []
+        profiling.add_hook(calls.append)
+        try:
+            Command.render("""CREATE CHART "hooked" VALUES [1,2] [3,4];""")
+        finally:
+            profiling.remove_hook(calls.append)
+        Command.render("""CREATE CHART "unhooked" VALUES [1,2] [3,4];""")
+
+        assert [s.stage for s in calls] == [
+            "parse",
+            "load",
+            "options",
+            "validate",
+            "render",
+        ]
+
+
+class DescribeChickPrompt:
+    def it_prints_the_stages_with_profile(self, capsys, monkeypatch):
+        monkeypatch.setattr("chickpy.backend.plt.show", lambda: None)
+        ChickPrompt(profile=True).onecmd(
+            """run CREATE CHART "shell profiled" VALUES [1,2] [3,4];"""
+        )
+
+        output = capsys.readouterr().out
+        assert "render" in output
+        assert "total" in output
@@ -0,0 +1,69 @@
+import socket
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from chickpy.server import RenderServer, ServerError, recv_frame, send, send_frame
+
+SCRIPT = """CREATE CHART "foo" VALUES [1,2,3] [4,5,6] TYPE LINE;"""
+
+
+class DescribeFrames:
+    def it_sends_and_receives_length_prefixed_payloads(self):
+        left, right = socket.socketpair()
+        with left, right:
+            send_frame(left, b"first")
+            send_frame(left, b"")
+            left.close()
+
+            assert recv_frame(right) == b"first"
+            assert recv_frame(right) == b""
+            assert recv_frame(right) is None
+
+
+class DescribeRenderServer:
+    def it_renders_scripts_sent_by_the_client(self, server_path):
+        assert send(SCRIPT, "png", server_path).startswith(b"\x89PNG")
+        assert send(SCRIPT, "svg", server_path).startswith(b"<?xml")
+        assert send(f"{SCRIPT[:-1]} OUTPUT SVG;", path=server_path).startswith(b"<?xml")
+
+    def it_reports_the_errors_to_the_client(self, server_path):
+        with pytest.raises(ServerError, match="UnexpectedToken"):
+            send("CREATE CHART", "png", server_path)
+        with pytest.raises(ServerError, match="Unknown format"):
+            send(SCRIPT, "bmp", server_path)
+
+    def it_replaces_the_socket_of_a_stopped_server(self):
+        with tempfile.TemporaryDirectory() as directory:  # short enough for a socket
+            path = Path(directory) / "stale.sock"
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+                stale.bind(str(path))
+
+            RenderServer(path, workers=1).server_close()
+
+            assert not path.exists()
+
+    def but_it_refuses_a_path_in_use_or_not_a_socket(self, server_path, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("keep me")
+
+        with pytest.raises(FileExistsError, match="is not a socket"):
+            RenderServer(path, workers=1)
+        with pytest.raises(FileExistsError, match="already listening"):
+            RenderServer(server_path, workers=1)
+        assert path.read_text() == "keep me"
+        assert send(SCRIPT, "svg", server_path).startswith(b"<?xml")
+
+
+@pytest.fixture(scope="module")
+def server_path():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "chickpy.sock"
+        server = RenderServer(path, workers=1)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield path
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,138 @@
+import subprocess
+import sys
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from chickpy.enums import CHART_TYPE
+from chickpy.svg import SvgBackend, nice_ticks, tick_labels
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+class DescribeSvgBackend:
+    @pytest.mark.parametrize(
+        "chart_type, xvalues, tag, count",
+        (
+            (CHART_TYPE.LINE, [1.0, 2.0, 3.0], "path", 1),
+            (CHART_TYPE.LINE, [1.0, np.nan, 3.0, 4.0], "path", 2),
+            (CHART_TYPE.SCATTER, [1.0, 2.0, 3.0], "use", 3),
+            (CHART_TYPE.BAR, ["a", "b", "c"], "rect", 3),
+            (CHART_TYPE.HORIZONTAL_BAR, ["a", "b"], "rect", 2),
+        ),
+    )
+    def it_draws_the_chart_as_svg(self, chart_type, xvalues, tag, count):
+        backend = _backend(xvalues, chart_type)
+
+        root = ElementTree.fromstring(backend.image())
+
+        data = root.find(f"{SVG}g/{SVG}g")
+        assert len(data.findall(f"{SVG}{tag}")) == count
+        assert root.findall(f"{SVG}text")[-1].text == "foo <1>"
+
+    @pytest.mark.parametrize(
+        "chart_type, tag", ((CHART_TYPE.LINE, "path"), (CHART_TYPE.SCATTER, "use"))
+    )
+    def it_draws_each_series_in_its_color_with_a_legend(self, chart_type, tag):
+        backend = SvgBackend(
+            {
+                "label": '"foo"',
+                "xvalues": np.array([1.0, 2.0]),
+                "yvalues": np.array([[3.0, 5.0], [4.0, 7.0]]),
+                "options": {"chart_type": chart_type},
+                "series": ["load", "temp"],
+            }
+        )
+
+        svg = backend.image().decode()
+        root = ElementTree.fromstring(svg)
+
+        data = root.find(f"{SVG}g/{SVG}g")
+        assert len(data.findall(f"{SVG}{tag}")) == (2 if tag == "path" else 4)
+        assert "#1f77b4" in svg and "#ff7f0e" in svg
+        legend = [text.text for text in root.findall(f"{SVG}g/{SVG}text")][-2:]
+        assert legend == ["load", "temp"]
+        assert root.findall(f"{SVG}text")[-1].text == "foo"
+
+    def it_labels_the_categories_in_order_of_appearance(self):
+        root = ElementTree.fromstring(_backend(["b", "a", "b"], CHART_TYPE.BAR).image())
+
+        labels = [text.text for text in root.iter(f"{SVG}text")]
+        assert labels[:2] == ["b", "a"]
+
+    def it_uses_the_size_option(self):
+        backend = _backend([1.0, 2.0], CHART_TYPE.LINE, size=(4.0, 2.0))
+
+        root = ElementTree.fromstring(backend.image())
+
+        assert (root.get("width"), root.get("height")) == ("288pt", "144pt")
+
+    def but_it_only_writes_svg(self):
+        with pytest.raises(ValueError, match="cannot write png"):
+            _backend([1.0], CHART_TYPE.LINE).image("png")
+
+    def it_opens_the_chart_in_the_browser_and_removes_it_at_exit(self, monkeypatch):
+        opened, removals = [], []
+        monkeypatch.setattr("chickpy.svg.webbrowser.open", opened.append)
+        monkeypatch.setattr(
+            "chickpy.svg.atexit.register", lambda *call: removals.append(call)
+        )
+
+        _backend([1.0, 2.0], CHART_TYPE.LINE).render()
+
+        ((remove, path),) = removals
+        assert opened == [Path(path).as_uri()]
+        assert Path(path).read_bytes().startswith(b"<?xml")
+        remove(path)
+        assert not Path(path).exists()
+
+    def but_it_writes_no_file_when_hidden(self, monkeypatch):
+        monkeypatch.setattr(
+            "chickpy.svg.tempfile.NamedTemporaryFile", pytest.fail, raising=True
+        )
+
+        assert _backend([1.0, 2.0], CHART_TYPE.LINE).render(show=False) is None
+
+    def and_it_renders_without_importing_matplotlib(self):
+        code = (
+            "import sys\n"
+            "from chickpy.backend import set_default_backend\n"
+            "from chickpy.processor import Command\n"
+            "set_default_backend('svg')\n"
+            "data = Command.image('CREATE CHART \"a\" VALUES [1,2] [3,4];', 'svg')\n"
+            "assert data.startswith(b'<?xml')\n"
+            "assert 'matplotlib' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+
+class DescribeNiceTicks:
+    @pytest.mark.parametrize(
+        "low, high, expected",
+        (
+            (0.8, 5.2, [1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]),
+            (-3.86, 8.46, [-2, 0, 2, 4, 6, 8]),
+            (5.0, 2095.0, [250, 500, 750, 1000, 1250, 1500, 1750, 2000]),
+        ),
+    )
+    def it_picks_round_ticks_like_matplotlib(self, low, high, expected):
+        assert nice_ticks(low, high) == expected
+
+    def it_formats_the_labels_with_the_same_decimals(self):
+        assert tick_labels([-1.0, 0.0, 1.5]) == ["−1.0", "0.0", "1.5"]
+
+
+def _backend(xvalues, chart_type, size=None):
+    options = {"chart_type": chart_type}
+    if size:
+        options["size"] = size
+    return SvgBackend(
+        {
+            "label": '"foo <1>"',
+            "xvalues": np.array(xvalues),
+            "yvalues": np.arange(len(xvalues), dtype=np.float64),
+            "options": options,
+        }
+    )